@@ -3,6 +3,7 @@ import settings from './settings.js';
 import yargs from 'yargs';
 import { hideBin } from 'yargs/helpers';
 import { readFileSync } from 'fs';
+import { loadTask } from './src/utils/task_store.js';
 
 function parseArguments() {
     return yargs(hideBin(process.argv))
@@ -27,9 +28,11 @@ if (args.profiles) {
     settings.profiles = args.profiles;
 }
 if (args.task_path) {
-    let tasks = JSON.parse(readFileSync(args.task_path, 'utf8'));
     if (args.task_id) {
-        settings.task = tasks[args.task_id];
+        settings.task = loadTask(args.task_path, args.task_id);
+        if (!settings.task) {
+            throw new Error(`Task ${args.task_id} not found in ${args.task_path}`);
+        }
         settings.task.task_id = args.task_id;
     }
     else {
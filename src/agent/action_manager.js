@@ -81,7 +81,12 @@ export class ActionManager {
             }
 
             // start the action
-            await actionFn();
+            const action_start = Date.now();
+            try {
+                await actionFn();
+            } finally {
+                this.agent.metrics?.record('action', actionLabel, Date.now() - action_start);
+            }
 
             // mark action as finished + cleanup
             this.executing = false;
@@ -16,11 +16,15 @@ import { serverProxy } from './mindserver_proxy.js';
 import settings from './settings.js';
 import { Task } from './tasks/tasks.js';
 import { say } from './speak.js';
+import { AgentMetrics } from './metrics.js';
+
+const METRICS_INTERVAL = 10000;
 
 export class Agent {
     async start(load_mem=false, init_message=null, count_id=0) {
         this.last_sender = null;
         this.count_id = count_id;
+        this.metrics = new AgentMetrics();
         
         // Initialize components with more detailed error handling
         this.actions = new ActionManager(this);
@@ -459,11 +463,16 @@ export class Agent {
             }
         }, INTERVAL);
 
+        // periodically push a compact metrics snapshot to the mindserver
+        setInterval(() => {
+            serverProxy.sendMetrics(this.metrics.snapshot());
+        }, METRICS_INTERVAL);
+
         this.bot.emit('idle');
     }
 
     async update(delta) {
-        await this.bot.modes.update();
+        await this.metrics.time('modes', 'update', () => this.bot.modes.update());
         this.self_prompter.update(delta);
         await this.checkTaskDone();
     }
@@ -0,0 +1,58 @@
+// keeps a bounded window of recent durations per (group, name) so snapshots stay compact
+const WINDOW_SIZE = 200;
+
+function percentile(sorted, p) {
+    if (sorted.length === 0) return 0;
+    const idx = Math.min(sorted.length - 1, Math.floor(p * sorted.length));
+    return sorted[idx];
+}
+
+export class AgentMetrics {
+    constructor() {
+        this.start_time = Date.now();
+        this.series = {};
+    }
+
+    record(group, name, ms) {
+        if (!this.series[group]) this.series[group] = {};
+        let s = this.series[group][name];
+        if (!s) {
+            s = this.series[group][name] = { count: 0, total: 0, samples: [] };
+        }
+        s.count++;
+        s.total += ms;
+        s.samples.push(ms);
+        if (s.samples.length > WINDOW_SIZE) s.samples.shift();
+    }
+
+    async time(group, name, fn) {
+        const start = Date.now();
+        try {
+            return await fn();
+        } finally {
+            this.record(group, name, Date.now() - start);
+        }
+    }
+
+    snapshot() {
+        const res = { time: Date.now(), uptime_ms: Date.now() - this.start_time };
+        for (const group in this.series) {
+            res[group] = {};
+            for (const name in this.series[group]) {
+                const s = this.series[group][name];
+                const sorted = [...s.samples].sort((a, b) => a - b);
+                res[group][name] = {
+                    count: s.count,
+                    mean_ms: Math.round(s.total / s.count),
+                    p50_ms: percentile(sorted, 0.5),
+                    p90_ms: percentile(sorted, 0.9),
+                    p99_ms: percentile(sorted, 0.99),
+                    max_ms: sorted[sorted.length - 1],
+                };
+            }
+        }
+        const mem = process.memoryUsage();
+        res.memory = { rss_mb: Math.round(mem.rss / 1048576), heap_used_mb: Math.round(mem.heapUsed / 1048576) };
+        return res;
+    }
+}
@@ -102,6 +102,11 @@ class MindServerProxy {
         this.socket.emit('shutdown');
     }
 
+    sendMetrics(metrics) {
+        if (!this.connected) return;
+        this.socket.emit('agent-metrics', this.agent.name, metrics);
+    }
+
     getSocket() {
         return this.socket;
     }
@@ -1,4 +1,28 @@
 import {Vec3} from 'vec3';
+import { readFileSync } from 'fs';
+
+// packed task files reference blueprints by content hash, see tasks/construction_tasks/blueprint_store.py
+const BLUEPRINT_STORE_DIR = './tasks/construction_tasks/blueprints';
+const BLUEPRINT_REF_PREFIX = 'sha256:';
+const blueprintCache = new Map();
+
+/**
+ * Returns the inline blueprint for a "sha256:<hex>" reference, or the blueprint itself if it is already inline.
+ */
+export function resolveBlueprint(blueprint, store_dir = BLUEPRINT_STORE_DIR) {
+    if (typeof blueprint !== 'string' || !blueprint.startsWith(BLUEPRINT_REF_PREFIX)) {
+        return blueprint;
+    }
+    const file = `${store_dir}/${blueprint.slice(BLUEPRINT_REF_PREFIX.length)}.json`;
+    if (!blueprintCache.has(file)) {
+        try {
+            blueprintCache.set(file, JSON.parse(readFileSync(file, 'utf8')));
+        } catch (err) {
+            throw new Error(`Blueprint ${blueprint} could not be loaded from ${file}: ${err.message}`);
+        }
+    }
+    return blueprintCache.get(file);
+}
 
 export class ConstructionTaskValidator {
     constructor(data, agent) {
@@ -72,7 +96,7 @@ export function checkBlueprint(agent) {
 
 export class Blueprint {
     constructor(blueprint) {
-        this.data = blueprint;
+        this.data = resolveBlueprint(blueprint);
     }
     explain() {
         var explanation = "";
@@ -1,7 +1,7 @@
 import { readFileSync , writeFileSync, existsSync} from 'fs';
 import { executeCommand } from '../commands/index.js';
 import { getPosition } from '../library/world.js';
-import { ConstructionTaskValidator, Blueprint } from './construction_tasks.js';
+import { ConstructionTaskValidator, Blueprint, resolveBlueprint } from './construction_tasks.js';
 import { CookingTaskInitiator } from './cooking_tasks.js';
 
 const PROGRESS_FILE = './hells_kitchen_progress.json';
@@ -254,6 +254,7 @@ export class Task {
             this.data = task_data;
             this.task_type = this.data.type;
             if (this.task_type === 'construction' && this.data.blueprint) {
+                this.data.blueprint = resolveBlueprint(this.data.blueprint);
                 this.blueprint = new Blueprint(this.data.blueprint);
                 this.goal = this.data.goal + ' \n' + this.blueprint.explain() + " \n" + "make sure to place the lower levels of the blueprint first";
                 this.conversation = this.data.conversation + ' \n' + this.blueprint.explain();
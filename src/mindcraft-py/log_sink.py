@@ -0,0 +1,163 @@
+import gzip
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+LEVEL_PATTERN = re.compile(r'^\[?(error|warn|warning|info|debug)\]?[:\s]', re.IGNORECASE)
+LEVEL_NAMES = {'warning': 'warn'}
+
+class LogSink:
+    """
+    Captures the output of a spawned Node process without slowing it down.
+    A reader thread only parses lines into a bounded ring buffer; a flusher thread
+    periodically writes them out in batches to rotated gzip files and echoes them to
+    the console, dropping echo lines above echo_rate per second.
+    """
+    def __init__(self, name='mindserver', buffer_size=10000, log_dir=None, max_file_bytes=50 * 1024 * 1024,
+                 backup_count=5, echo=True, echo_rate=50, flush_interval=0.5):
+        self.name = name
+        self.buffer = deque(maxlen=buffer_size)
+        self.log_dir = log_dir
+        self.max_file_bytes = max_file_bytes
+        self.backup_count = backup_count
+        self.echo = echo
+        self.echo_rate = echo_rate
+        self.flush_interval = flush_interval
+        # replaced rather than mutated, so the reader thread can iterate it without the lock
+        self.known_agents = frozenset()
+        self._watches = []
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._file = None
+        self._file_bytes = 0
+        self._reader = None
+        self._flusher = None
+
+    def add_agent(self, agent_name):
+        with self._lock:
+            self.known_agents = self.known_agents | {agent_name}
+
+    def watch(self, text):
+        """Return an Event that is set once a line containing text has been read."""
+        event = threading.Event()
+        self._watches.append((text, event))
+        return event
+
+    def parse(self, line):
+        line = line.rstrip('\n')
+        level = 'info'
+        match = LEVEL_PATTERN.match(line)
+        if match:
+            level = match.group(1).lower()
+            level = LEVEL_NAMES.get(level, level)
+        elif line.startswith(('Error', 'Failed', 'Unhandled')) or 'Error:' in line:
+            level = 'error'
+        agent = None
+        known_agents = self.known_agents
+        first = line.split(' ', 1)[0].rstrip(':,')
+        if first in known_agents:
+            agent = first
+        else:
+            for name in known_agents:
+                if f' {name} ' in line:
+                    agent = name
+                    break
+        return {'time': time.time(), 'agent': agent, 'level': level, 'message': line}
+
+    def start(self, stream):
+        self._stop.clear()
+        self._reader = threading.Thread(target=self._read, args=(stream,), daemon=True)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._reader.start()
+        self._flusher.start()
+
+    def _read(self, stream):
+        for line in iter(stream.readline, ''):
+            record = self.parse(line)
+            for text, event in self._watches:
+                if text in line:
+                    event.set()
+            with self._lock:
+                self.buffer.append(record)
+                self._pending.append(record)
+        self._stop.set()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        if self.log_dir:
+            self._write(batch)
+        if self.echo:
+            self._echo(batch)
+
+    def _echo(self, batch):
+        limit = max(1, int(self.echo_rate * self.flush_interval))
+        shown = batch if len(batch) <= limit else batch[:limit]
+        out = ''.join(f"[Node.js] {r['message']}\n" for r in shown)
+        if len(batch) > limit:
+            out += f"[Node.js] ... {len(batch) - limit} lines not echoed (see logs())\n"
+        sys.stdout.write(out)
+        sys.stdout.flush()
+
+    def _file_path(self, index=0):
+        suffix = '' if index == 0 else f'.{index}'
+        return os.path.join(self.log_dir, f'{self.name}.log{suffix}.gz')
+
+    def _rotate(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        for i in range(self.backup_count - 1, -1, -1):
+            src = self._file_path(i)
+            if os.path.exists(src):
+                if i + 1 >= self.backup_count:
+                    os.remove(src)
+                else:
+                    os.replace(src, self._file_path(i + 1))
+        self._file_bytes = 0
+
+    def _write(self, batch):
+        if self._file is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._file = gzip.open(self._file_path(), 'at', encoding='utf-8')
+        data = ''.join(f"{r['time']:.3f}\t{r['level']}\t{r['agent'] or '-'}\t{r['message']}\n" for r in batch)
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+        if self._file_bytes >= self.max_file_bytes:
+            self._rotate()
+
+    def query(self, agent=None, level=None, contains=None, last=None):
+        """Return buffered records, newest last, filtered by agent, level and substring."""
+        with self._lock:
+            records = list(self.buffer)
+        if agent is not None:
+            records = [r for r in records if r['agent'] == agent]
+        if level is not None:
+            records = [r for r in records if r['level'] == level]
+        if contains is not None:
+            records = [r for r in records if contains in r['message']]
+        if last is not None:
+            records = records[-last:]
+        return records
+
+    def close(self):
+        self._stop.set()
+        if self._flusher:
+            self._flusher.join(timeout=2)
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
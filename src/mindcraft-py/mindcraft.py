@@ -5,73 +5,176 @@ import json
 import os
 import atexit
 import threading
+import socket
 import sys
 import signal
+from log_sink import LogSink
 
 class Mindcraft:
     def __init__(self):
         self.sio = socketio.Client()
         self.process = None
         self.connected = False
-        self.log_thread = None
+        self.log_sink = None
+        self.startup_time = None
+        self.process_exit_code = None
 
-    def _log_reader(self):
-        for line in iter(self.process.stdout.readline, ''):
-            sys.stdout.write(f'[Node.js] {line}')
-            sys.stdout.flush()
-
-    def init(self, port=8080):
-        if self.process:
+    def init(self, port=8080, log_dir=None, echo_rate=50, reuse_existing=False, startup_timeout=30):
+        if self.process or self.connected:
             return
 
         self.port = port
-        
-        node_script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'init-mindcraft.js'))
-        
-        self.process = subprocess.Popen([
-            'node',
-            node_script_path,
-            '--mindserver_port', str(self.port)
-        ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-        
-        self.log_thread = threading.Thread(target=self._log_reader)
-        self.log_thread.daemon = True
-        self.log_thread.start()
-
-        atexit.register(self.shutdown)
-        time.sleep(2) # Give server time to start before connecting
+        started = time.time()
+        deadline = started + startup_timeout
+
+        if reuse_existing and self._port_open():
+            # warm start: attach to a MindServer that is already running on this port
+            print(f"Reusing MindServer already running on port {self.port}")
+        else:
+            node_script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'init-mindcraft.js'))
+
+            self.process = subprocess.Popen([
+                'node',
+                node_script_path,
+                '--mindserver_port', str(self.port)
+            ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+
+            self.log_sink = LogSink(f'mindserver_{self.port}', log_dir=log_dir, echo_rate=echo_rate)
+            ready = self.log_sink.watch(f'MindServer running on port {self.port}')
+            self.log_sink.start(self.process.stdout)
+
+            atexit.register(self.shutdown)
+            self._wait_until_ready(ready, deadline)
 
         try:
-            self.sio.connect(f'http://localhost:{self.port}')
+            self._connect(deadline)
             self.connected = True
-            print("Connected to MindServer. Mindcraft is initialized.")
+            self.startup_time = time.time() - started
+            print(f"Connected to MindServer in {self.startup_time:.2f}s. Mindcraft is initialized.")
         except socketio.exceptions.ConnectionError as e:
             print(f"Failed to connect to MindServer: {e}")
             self.shutdown()
             raise
 
-    def create_agent(self, settings_json):
+    def _port_open(self):
+        try:
+            with socket.create_connection(('localhost', self.port), timeout=0.5):
+                return True
+        except OSError:
+            return False
+
+    def _wait_until_ready(self, ready, deadline):
+        # the startup line is the fast path, the port probe covers a missed or reworded line
+        while not ready.wait(0.05):
+            if self.process.poll() is not None:
+                self.shutdown()
+                raise socketio.exceptions.ConnectionError(f"MindServer exited during startup with code {self.process_exit_code}")
+            if self._port_open():
+                return
+            if time.time() > deadline:
+                self.shutdown()
+                raise socketio.exceptions.ConnectionError(f"MindServer did not start on port {self.port} in time")
+
+    def _connect(self, deadline):
+        delay = 0.05
+        while True:
+            try:
+                self.sio.connect(f'http://localhost:{self.port}')
+                return
+            except socketio.exceptions.ConnectionError:
+                if time.time() + delay > deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 2)
+
+    def create_agent(self, settings_json, on_result=None):
         if not self.connected:
             raise Exception("Not connected to MindServer. Call init() first.")
-        
+
         profile_data = settings_json.get('profile', {})
-        
+        if self.log_sink and profile_data.get('name'):
+            self.log_sink.add_agent(profile_data['name'])
+
         def callback(response):
             if response.get('success'):
                 print(f"Agent '{profile_data.get('name')}' created successfully")
             else:
                 print(f"Error creating agent: {response.get('error', 'Unknown error')}")
+            if on_result:
+                on_result(response)
 
         self.sio.emit('create-agent', settings_json, callback=callback)
 
+    def create_agents(self, settings_list, timeout=60):
+        """Create several agents in one round trip. Returns [{name, success, error?}] in order."""
+        if not self.connected:
+            raise Exception("Not connected to MindServer. Call init() first.")
+        for settings_json in settings_list:
+            name = settings_json.get('profile', {}).get('name')
+            if self.log_sink and name:
+                self.log_sink.add_agent(name)
+        return self.sio.call('create-agents', settings_list, timeout=timeout)
+
+    def _call_batch(self, event, agent_names, timeout=60):
+        if not self.connected:
+            raise Exception("Not connected to MindServer. Call init() first.")
+        return self.sio.call(event, list(agent_names), timeout=timeout)
+
+    def start_agents(self, agent_names, timeout=60):
+        return self._call_batch('start-agents', agent_names, timeout)
+
+    def stop_agents(self, agent_names, timeout=60):
+        return self._call_batch('stop-agents', agent_names, timeout)
+
+    def restart_agents(self, agent_names, timeout=60):
+        return self._call_batch('restart-agents', agent_names, timeout)
+
+    def _emit(self, event, *args):
+        if not self.connected:
+            raise Exception("Not connected to MindServer. Call init() first.")
+        data = args if len(args) > 1 else (args[0] if args else None)
+        self.sio.emit(event, data)
+
+    def start_agent(self, agent_name):
+        self._emit('start-agent', agent_name)
+
+    def stop_agent(self, agent_name):
+        self._emit('stop-agent', agent_name)
+
+    def restart_agent(self, agent_name):
+        self._emit('restart-agent', agent_name)
+
+    def send_message(self, agent_name, message):
+        self._emit('send-message', agent_name, message)
+
+    def stop_all_agents(self):
+        self._emit('stop-all-agents')
+
+    def metrics(self, agent_name=None, timeout=10):
+        """Latest metrics snapshot pushed by each agent (or one agent), keyed by agent name."""
+        if not self.connected:
+            raise Exception("Not connected to MindServer. Call init() first.")
+        response = self.sio.call('get-metrics', agent_name, timeout=timeout)
+        if 'error' in response:
+            raise KeyError(response['error'])
+        return response
+
+    def logs(self, agent=None, level=None, contains=None, last=100):
+        """Recent Node.js output records ({time, agent, level, message}), newest last."""
+        if not self.log_sink:
+            return []
+        return self.log_sink.query(agent=agent, level=level, contains=contains, last=last)
+
     def shutdown(self):
         if self.sio.connected:
             self.sio.disconnect()
             self.connected = False
         if self.process:
             self.process.terminate()
-            self.process.wait()
+            self.process_exit_code = self.process.wait()
             self.process = None
+        if self.log_sink:
+            self.log_sink.close()
         print("Mindcraft shut down.")
 
     def wait(self):
@@ -84,14 +187,229 @@ class Mindcraft:
             print("\nCtrl+C detected. Exiting...")
             self.shutdown()
 
+class MindcraftPool:
+    """
+    Runs several MindServers (one init-mindcraft.js process each, on consecutive ports)
+    and places agents across them, so no single Node event loop serves every agent.
+    Agents only see chat and agent lists from their own MindServer, so agents that must
+    talk to each other should be pinned to the same shard with create_agent(..., shard=i).
+    """
+    POLICIES = ('round_robin', 'least_loaded')
+
+    def __init__(self):
+        self.shards = []
+        self.agent_shards = {}
+        self.policy = 'round_robin'
+        self._next_shard = 0
+        self._lock = threading.Lock()
+
+    def init(self, port=8080, num_servers=2, policy='round_robin', log_dir=None, echo_rate=50,
+             reuse_existing=False, startup_timeout=30):
+        if self.shards:
+            return
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown placement policy '{policy}', expected one of {self.POLICIES}")
+        self.policy = policy
+        for i in range(num_servers):
+            shard = Mindcraft()
+            try:
+                shard.init(port + i, log_dir=log_dir, echo_rate=echo_rate,
+                           reuse_existing=reuse_existing, startup_timeout=startup_timeout)
+            except socketio.exceptions.ConnectionError:
+                self.shutdown()
+                raise
+            self.shards.append(shard)
+        print(f"MindServer pool running on ports {port}-{port + num_servers - 1} ({policy}).")
+
+    def _shard_load(self, index):
+        return sum(1 for shard in self.agent_shards.values() if shard == index)
+
+    def _place(self):
+        if self.policy == 'least_loaded':
+            return min(range(len(self.shards)), key=self._shard_load)
+        index = self._next_shard % len(self.shards)
+        self._next_shard += 1
+        return index
+
+    def _shard_of(self, agent_name):
+        if agent_name not in self.agent_shards:
+            raise KeyError(f"Agent '{agent_name}' is not managed by this pool.")
+        return self.shards[self.agent_shards[agent_name]]
+
+    def create_agent(self, settings_json, shard=None, on_result=None):
+        if not self.shards:
+            raise Exception("MindServer pool is not running. Call init() first.")
+        name = settings_json.get('profile', {}).get('name')
+        with self._lock:
+            if name in self.agent_shards:
+                print(f"Error creating agent: Agent '{name}' already exists on shard {self.agent_shards[name]}")
+                return
+            index = self._place() if shard is None else shard
+            self.agent_shards[name] = index
+
+        def callback(response):
+            # free the slot again if the MindServer rejected the agent
+            if not response.get('success'):
+                with self._lock:
+                    if self.agent_shards.get(name) == index:
+                        del self.agent_shards[name]
+            if on_result:
+                on_result(response)
+
+        self.shards[index].create_agent(settings_json, on_result=callback)
+
+    def _per_shard(self, items, index_of, call):
+        # one batch call per shard, issued in parallel, results merged back into input order
+        groups = {}
+        for position, item in enumerate(items):
+            groups.setdefault(index_of(item), []).append((position, item))
+        results = [None] * len(items)
+
+        def run(index, group):
+            for (position, _), result in zip(group, call(self.shards[index], [item for _, item in group])):
+                results[position] = result
+
+        threads = [threading.Thread(target=run, args=(index, group)) for index, group in groups.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def create_agents(self, settings_list, timeout=60):
+        if not self.shards:
+            raise Exception("MindServer pool is not running. Call init() first.")
+        placements = {}
+        new_names = set()
+        with self._lock:
+            for settings_json in settings_list:
+                name = settings_json.get('profile', {}).get('name')
+                if name not in self.agent_shards:
+                    self.agent_shards[name] = self._place()
+                    new_names.add(name)
+                placements[name] = self.agent_shards[name]
+        results = self._per_shard(settings_list,
+                                  lambda settings_json: placements[settings_json.get('profile', {}).get('name')],
+                                  lambda shard, batch: shard.create_agents(batch, timeout))
+        with self._lock:
+            for result in results:
+                if not result.get('success') and result.get('name') in new_names:
+                    self.agent_shards.pop(result.get('name'), None)
+        return results
+
+    def _batch(self, method, agent_names, timeout):
+        unknown = [name for name in agent_names if name not in self.agent_shards]
+        if unknown:
+            raise KeyError(f"Agents not managed by this pool: {unknown}")
+        return self._per_shard(list(agent_names), lambda name: self.agent_shards[name],
+                               lambda shard, batch: getattr(shard, method)(batch, timeout))
+
+    def start_agents(self, agent_names, timeout=60):
+        return self._batch('start_agents', agent_names, timeout)
+
+    def stop_agents(self, agent_names, timeout=60):
+        return self._batch('stop_agents', agent_names, timeout)
+
+    def restart_agents(self, agent_names, timeout=60):
+        return self._batch('restart_agents', agent_names, timeout)
+
+    def start_agent(self, agent_name):
+        self._shard_of(agent_name).start_agent(agent_name)
+
+    def stop_agent(self, agent_name):
+        self._shard_of(agent_name).stop_agent(agent_name)
+
+    def restart_agent(self, agent_name):
+        self._shard_of(agent_name).restart_agent(agent_name)
+
+    def send_message(self, agent_name, message):
+        self._shard_of(agent_name).send_message(agent_name, message)
+
+    def stop_all_agents(self):
+        for shard in self.shards:
+            shard.stop_all_agents()
+
+    def metrics(self, agent_name=None, timeout=10):
+        if agent_name is not None:
+            return self._shard_of(agent_name).metrics(agent_name, timeout)
+        metrics = {}
+        for shard in self.shards:
+            metrics.update(shard.metrics(timeout=timeout))
+        return metrics
+
+    def logs(self, agent=None, level=None, contains=None, last=100):
+        if agent in self.agent_shards:
+            return self._shard_of(agent).logs(agent, level, contains, last)
+        records = []
+        for shard in self.shards:
+            records.extend(shard.logs(agent, level, contains, last))
+        records.sort(key=lambda r: r['time'])
+        return records[-last:] if last is not None else records
+
+    def agents(self):
+        """Map of agent name to the port of the MindServer hosting it."""
+        return {name: self.shards[index].port for name, index in self.agent_shards.items()}
+
+    def shutdown(self):
+        for shard in self.shards:
+            shard.shutdown()
+        self.shards = []
+        self.agent_shards = {}
+        self._next_shard = 0
+
+    def wait(self):
+        """Block the main thread until Ctrl+C is pressed so the servers stay up."""
+        print("Server pool is running. Press Ctrl+C to exit.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\nCtrl+C detected. Exiting...")
+            self.shutdown()
+
 mindcraft_instance = Mindcraft()
 
-def init(port=8080):
-    mindcraft_instance.init(port)
+def init(port=8080, num_servers=1, policy='round_robin', **kwargs):
+    global mindcraft_instance
+    if num_servers > 1:
+        mindcraft_instance = MindcraftPool()
+        mindcraft_instance.init(port, num_servers, policy, **kwargs)
+    else:
+        mindcraft_instance.init(port, **kwargs)
+
+def create_agent(settings_json, **kwargs):
+    mindcraft_instance.create_agent(settings_json, **kwargs)
+
+def create_agents(settings_list, timeout=60):
+    return mindcraft_instance.create_agents(settings_list, timeout)
+
+def start_agents(agent_names, timeout=60):
+    return mindcraft_instance.start_agents(agent_names, timeout)
+
+def stop_agents(agent_names, timeout=60):
+    return mindcraft_instance.stop_agents(agent_names, timeout)
+
+def restart_agents(agent_names, timeout=60):
+    return mindcraft_instance.restart_agents(agent_names, timeout)
+
+def start_agent(agent_name):
+    mindcraft_instance.start_agent(agent_name)
+
+def stop_agent(agent_name):
+    mindcraft_instance.stop_agent(agent_name)
+
+def restart_agent(agent_name):
+    mindcraft_instance.restart_agent(agent_name)
+
+def send_message(agent_name, message):
+    mindcraft_instance.send_message(agent_name, message)
+
+def metrics(agent_name=None):
+    return mindcraft_instance.metrics(agent_name)
+
+def logs(agent=None, level=None, contains=None, last=100):
+    return mindcraft_instance.logs(agent, level, contains, last)
 
-def create_agent(settings_json):
-    mindcraft_instance.create_agent(settings_json)
-    
 def shutdown():
     mindcraft_instance.shutdown()
 
@@ -8,13 +8,13 @@ let agent_count = 0;
 let host = 'localhost';
 let port = 8080;
 
-export async function init(host_public=false, port=8080) {
+export async function init(host_public=false, mindserver_port=8080) {
     if (connected) {
         console.error('Already initiliazed!');
         return;
     }
-    mindserver = createMindServer(host_public, port);
-    port = port;
+    mindserver = createMindServer(host_public, mindserver_port);
+    port = mindserver_port;
     connected = true;
 }
 
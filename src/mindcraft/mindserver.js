@@ -23,6 +23,7 @@ class AgentConnection {
         this.socket = null;
         this.settings = settings;
         this.in_game = false;
+        this.metrics = null;
     }
     
 }
@@ -58,34 +59,15 @@ export function createMindServer(host_public = false, port = 8080) {
 
         socket.on('create-agent', (settings, callback) => {
             console.log('API create agent...');
-            for (let key in settings_spec) {
-                if (!(key in settings)) {
-                    if (settings_spec[key].required) {
-                        callback({ success: false, error: `Setting ${key} is required` });
-                        return;
-                    }
-                    else {
-                        settings[key] = settings_spec[key].default;
-                    }
-                }
-            }
-            for (let key in settings) {
-                if (!(key in settings_spec)) {
-                    delete settings[key];
-                }
-            }
-            if (settings.profile?.name) {
-                if (settings.profile.name in agent_connections) {
-                    callback({ success: false, error: 'Agent already exists' });
-                    return;
-                }
-                mindcraft.createAgent(settings);
-                callback({ success: true });
-            }
-            else {
-                console.error('Agent name is required in profile');
-                callback({ success: false, error: 'Agent name is required in profile' });
-            }
+            callback(createAgentFromSettings(settings));
+        });
+
+        socket.on('create-agents', (settingsList, callback) => {
+            console.log(`API create ${settingsList.length} agents...`);
+            // agent processes are spawned without waiting on each other
+            callback(settingsList.map((settings) => {
+                return { name: settings.profile?.name, ...createAgentFromSettings(settings) };
+            }));
         });
 
         socket.on('get-settings', (agentName, callback) => {
@@ -125,6 +107,28 @@ export function createMindServer(host_public = false, port = 8080) {
             agent_connections[agentName].socket.emit('chat-message', curAgentName, json);
         });
 
+        socket.on('agent-metrics', (agentName, metrics) => {
+            if (agent_connections[agentName]) {
+                agent_connections[agentName].metrics = metrics;
+            }
+        });
+
+        socket.on('get-metrics', (agentName, callback) => {
+            if (agentName) {
+                if (!agent_connections[agentName]) {
+                    callback({ error: `Agent '${agentName}' not found.` });
+                    return;
+                }
+                callback({ [agentName]: agent_connections[agentName].metrics });
+                return;
+            }
+            let metrics = {};
+            for (let name in agent_connections) {
+                metrics[name] = agent_connections[name].metrics;
+            }
+            callback(metrics);
+        });
+
         socket.on('restart-agent', (agentName) => {
             console.log(`Restarting agent: ${agentName}`);
             agent_connections[agentName].socket.emit('restart-agent');
@@ -145,6 +149,26 @@ export function createMindServer(host_public = false, port = 8080) {
             }
         });
 
+        socket.on('restart-agents', async (agentNames, callback) => {
+            console.log(`Restarting agents: ${agentNames.join(', ')}`);
+            callback(await forEachAgent(agentNames, (agentName) => {
+                if (!agent_connections[agentName].socket) {
+                    throw new Error(`Agent '${agentName}' is not logged in.`);
+                }
+                agent_connections[agentName].socket.emit('restart-agent');
+            }));
+        });
+
+        socket.on('stop-agents', async (agentNames, callback) => {
+            console.log(`Stopping agents: ${agentNames.join(', ')}`);
+            callback(await forEachAgent(agentNames, (agentName) => mindcraft.stopAgent(agentName)));
+        });
+
+        socket.on('start-agents', async (agentNames, callback) => {
+            console.log(`Starting agents: ${agentNames.join(', ')}`);
+            callback(await forEachAgent(agentNames, (agentName) => mindcraft.startAgent(agentName)));
+        });
+
         socket.on('shutdown', () => {
             console.log('Shutting down');
             for (let agentName in agent_connections) {
@@ -180,6 +204,50 @@ export function createMindServer(host_public = false, port = 8080) {
     return server;
 }
 
+function createAgentFromSettings(settings) {
+    for (let key in settings_spec) {
+        if (!(key in settings)) {
+            if (settings_spec[key].required) {
+                return { success: false, error: `Setting ${key} is required` };
+            }
+            else {
+                settings[key] = settings_spec[key].default;
+            }
+        }
+    }
+    for (let key in settings) {
+        if (!(key in settings_spec)) {
+            delete settings[key];
+        }
+    }
+    if (settings.profile?.name) {
+        if (settings.profile.name in agent_connections) {
+            return { success: false, error: 'Agent already exists' };
+        }
+        mindcraft.createAgent(settings);
+        return { success: true };
+    }
+    else {
+        console.error('Agent name is required in profile');
+        return { success: false, error: 'Agent name is required in profile' };
+    }
+}
+
+// run a lifecycle action on every named agent concurrently and collect per-agent results
+async function forEachAgent(agentNames, action) {
+    return Promise.all(agentNames.map(async (agentName) => {
+        if (!agent_connections[agentName]) {
+            return { name: agentName, success: false, error: `Agent '${agentName}' not found.` };
+        }
+        try {
+            await action(agentName);
+            return { name: agentName, success: true };
+        } catch (error) {
+            return { name: agentName, success: false, error: error.message };
+        }
+    }));
+}
+
 function agentsUpdate(socket) {
     if (!socket) {
         socket = io;
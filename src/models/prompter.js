@@ -320,6 +320,12 @@ export class Prompter {
         return prompt;
     }
 
+    async _timedRequest(method, request) {
+        // records LLM latency per prompt method for the metrics snapshot
+        if (!this.agent.metrics) return await request();
+        return await this.agent.metrics.time('llm', method, request);
+    }
+
     async checkCooldown() {
         let elapsed = Date.now() - this.last_prompt_time;
         if (elapsed < this.cooldown && this.cooldown > 0) {
@@ -343,7 +349,7 @@ export class Prompter {
             let generation;
 
             try {
-                generation = await this.chat_model.sendRequest(messages, prompt);
+                generation = await this._timedRequest('promptConvo', () => this.chat_model.sendRequest(messages, prompt));
                 if (typeof generation !== 'string') {
                     console.error('Error: Generated response is not a string', generation);
                     throw new Error('Generated response is not a string');
@@ -388,7 +394,7 @@ export class Prompter {
         let prompt = this.profile.coding;
         prompt = await this.replaceStrings(prompt, messages, this.coding_examples);
 
-        let resp = await this.code_model.sendRequest(messages, prompt);
+        let resp = await this._timedRequest('promptCoding', () => this.code_model.sendRequest(messages, prompt));
         this.awaiting_coding = false;
         await this._saveLog(prompt, messages, resp, 'coding');
         return resp;
@@ -398,7 +404,7 @@ export class Prompter {
         await this.checkCooldown();
         let prompt = this.profile.saving_memory;
         prompt = await this.replaceStrings(prompt, null, null, to_summarize);
-        let resp = await this.chat_model.sendRequest([], prompt);
+        let resp = await this._timedRequest('promptMemSaving', () => this.chat_model.sendRequest([], prompt));
         await this._saveLog(prompt, to_summarize, resp, 'memSaving');
         if (resp?.includes('</think>')) {
             const [_, afterThink] = resp.split('</think>')
@@ -413,7 +419,7 @@ export class Prompter {
         let messages = this.agent.history.getHistory();
         messages.push({role: 'user', content: new_message});
         prompt = await this.replaceStrings(prompt, null, null, messages);
-        let res = await this.chat_model.sendRequest([], prompt);
+        let res = await this._timedRequest('promptShouldRespondToBot', () => this.chat_model.sendRequest([], prompt));
         return res.trim().toLowerCase() === 'respond';
     }
 
@@ -421,7 +427,7 @@ export class Prompter {
         await this.checkCooldown();
         let prompt = this.profile.image_analysis;
         prompt = await this.replaceStrings(prompt, messages, null, null, null);
-        return await this.vision_model.sendVisionRequest(messages, prompt, imageBuffer);
+        return await this._timedRequest('promptVision', () => this.vision_model.sendVisionRequest(messages, prompt, imageBuffer));
     }
 
     async promptGoalSetting(messages, last_goals) {
@@ -434,7 +440,7 @@ export class Prompter {
         user_message = await this.replaceStrings(user_message, messages, null, null, last_goals);
         let user_messages = [{role: 'user', content: user_message}];
 
-        let res = await this.chat_model.sendRequest(user_messages, system_message);
+        let res = await this._timedRequest('promptGoalSetting', () => this.chat_model.sendRequest(user_messages, system_message));
 
         let goal = null;
         try {
@@ -0,0 +1,45 @@
+import { readFileSync, existsSync, statSync, openSync, readSync, closeSync } from 'fs';
+
+// Reads single tasks from a compiled task store (see tasks/task_store.py):
+// foo.json -> foo.tasks.jsonl (one task per line) + foo.tasks.idx ({task_id: [offset, length]}).
+// Falls back to parsing the whole task file when there is no store or it is out of date.
+
+const DATA_SUFFIX = '.tasks.jsonl';
+const INDEX_SUFFIX = '.tasks.idx';
+
+function storePaths(task_path) {
+    let base = task_path.endsWith(DATA_SUFFIX) ? task_path.slice(0, -DATA_SUFFIX.length) : task_path.replace(/\.[^/.]+$/, '');
+    return { data: base + DATA_SUFFIX, index: base + INDEX_SUFFIX };
+}
+
+function loadIndex(task_path) {
+    const { data, index } = storePaths(task_path);
+    if (!existsSync(data) || !existsSync(index)) return null;
+    const idx = JSON.parse(readFileSync(index, 'utf8'));
+    if (task_path !== data && existsSync(task_path)) {
+        const stat = statSync(task_path, { bigint: true });
+        if (Number(stat.size) !== idx.source_size || stat.mtimeNs.toString() !== idx.source_mtime_ns) {
+            return null;
+        }
+    }
+    return idx.tasks;
+}
+
+export function loadTask(task_path, task_id) {
+    const index = loadIndex(task_path);
+    if (!index) {
+        const tasks = JSON.parse(readFileSync(task_path, 'utf8'));
+        return tasks[task_id];
+    }
+    const entry = index[task_id];
+    if (!entry) return undefined;
+    const [offset, length] = entry;
+    const buffer = Buffer.alloc(length);
+    const fd = openSync(storePaths(task_path).data, 'r');
+    try {
+        readSync(fd, buffer, 0, length, offset);
+    } finally {
+        closeSync(fd);
+    }
+    return JSON.parse(buffer.toString('utf8'));
+}
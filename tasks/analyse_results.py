@@ -6,7 +6,7 @@ from botocore.exceptions import ClientError
 import json
 import argparse
 from tqdm import tqdm
-import glob
+from experiment_archive import read_task_file, task_folders, task_json_files
 
 # Calculate project root directory
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -82,13 +82,12 @@ def analyze_json_file(file_path):
         str or None: The task outcome string if found, otherwise None.
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            if 'turns' in data and isinstance(data['turns'], list):
-                for turn in reversed(data['turns']):  # Check turns from the end
-                    if turn.get('role') == 'system' and isinstance(turn.get('content'), str):
-                        if "Task successful ended with code : 2" in turn['content'] or "Task ended with score : 1" in turn["content"] or "Task ended in score: 1" in turn["content"]:
-                            return True
+        data = json.loads(read_task_file(file_path))
+        if 'turns' in data and isinstance(data['turns'], list):
+            for turn in reversed(data['turns']):  # Check turns from the end
+                if turn.get('role') == 'system' and isinstance(turn.get('content'), str):
+                    if "Task successful ended with code : 2" in turn['content'] or "Task ended with score : 1" in turn["content"] or "Task ended in score: 1" in turn["content"]:
+                        return True
         return False
     except FileNotFoundError:
         print(f"Error: File not found: {file_path}")
@@ -102,7 +101,7 @@ def analyze_json_file(file_path):
 
 def extract_result(folder_path):
     folder_name = os.path.basename(folder_path)
-    json_files = glob.glob(os.path.join(folder_path, "*.json"))
+    json_files = task_json_files(folder_path)
     assert len(json_files) == 2, f"Expected 2 json files in {folder_name}, found {len(json_files)}"
 
     if not json_files:
@@ -221,8 +220,8 @@ def get_immediate_subdirectories(a_dir):
     # Ensure a_dir is relative to project root if not absolute
     if not os.path.isabs(a_dir):
         a_dir = os.path.join(project_root, a_dir)
-    return [os.path.join(a_dir, name) for name in os.listdir(a_dir)
-            if os.path.isdir(os.path.join(a_dir, name))]
+    # task folders of a plain folder, or <archive>/<task_id> of an experiment archive
+    return task_folders(a_dir)
 
 
 # --- Main Execution ---
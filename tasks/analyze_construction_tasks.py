@@ -7,6 +7,8 @@ import argparse
 import pandas as pd
 import glob
 
+from experiment_archive import read_task_file, task_folders, task_json_files
+
 # Calculate project root directory
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Define output directory for analysis results
@@ -28,44 +30,41 @@ def extract_success_scores(folders, model_names):
     pattern = re.compile(r"materials_(\d+)_rooms_(\d+)")
     
     for root_dir, model_name in zip(folders, model_names):
-        for task_folder in os.listdir(root_dir):
-            task_path = os.path.join(root_dir, task_folder)
-            if os.path.isdir(task_path):
-                logs_found = False
-                score_found = False
-                
-                for file_name in os.listdir(task_path):
-                    if file_name.endswith(".json"): 
-                        logs_found = True
-                        file_path = os.path.join(task_path, file_name)
-                        
-                        try:
-                            with open(file_path, 'r') as file:
-                                data = json.load(file)
-                                
-                                for turn in reversed(data.get("turns", [])):
-                                    if turn["role"] == "system" and "Task ended with score" in turn["content"]:
-                                        score = float(turn["content"].split(":")[-1].strip())
-                                        all_task_scores[task_folder][model_name] = score
-                                        overall_scores[model_name].append(score)  # Add to overall scores
-                                        score_found = True
-                                        
-                                        if score == 0:
-                                            zero_score_tasks[model_name].append(task_folder)
-                                        break 
-                                
-                            if score_found:
-                                break 
-                        except Exception as e:
-                            print(f"Error reading {file_path}: {e}")
-                
-                if logs_found and not score_found:
-                    # Score not found but logs exist - skip this task
-                    skipped_tasks[model_name].append(task_folder)
-                    print(f"Error: No score message found for task '{task_folder}' with model '{model_name}'. Skipping this task.")
+        # task folders of a plain folder, or <archive>/<task_id> of an experiment archive
+        for task_path in task_folders(root_dir):
+            task_folder = os.path.basename(task_path)
+            logs_found = False
+            score_found = False
+            
+            for file_path in task_json_files(task_path):
+                logs_found = True
                 
-                if not logs_found:
-                    print(f"No log files found in {task_folder}")
+                try:
+                    data = json.loads(read_task_file(file_path))
+                    
+                    for turn in reversed(data.get("turns", [])):
+                        if turn["role"] == "system" and "Task ended with score" in turn["content"]:
+                            score = float(turn["content"].split(":")[-1].strip())
+                            all_task_scores[task_folder][model_name] = score
+                            overall_scores[model_name].append(score)  # Add to overall scores
+                            score_found = True
+                            
+                            if score == 0:
+                                zero_score_tasks[model_name].append(task_folder)
+                            break 
+                    
+                    if score_found:
+                        break 
+                except Exception as e:
+                    print(f"Error reading {file_path}: {e}")
+            
+            if logs_found and not score_found:
+                # Score not found but logs exist - skip this task
+                skipped_tasks[model_name].append(task_folder)
+                print(f"Error: No score message found for task '{task_folder}' with model '{model_name}'. Skipping this task.")
+            
+            if not logs_found:
+                print(f"No log files found in {task_folder}")
     
     # Calculate model completion rates (only consider tasks with scores)
     model_completion_rates = {}
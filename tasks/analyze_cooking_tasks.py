@@ -3,10 +3,10 @@ import json
 import re
 from collections import defaultdict
 from prettytable import PrettyTable
-import pandas as pd
-import glob
 import argparse
 
+from experiment_archive import read_task_file, task_folders, task_json_files
+
 # Calculate project root directory
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Define output directory for analysis results
@@ -31,7 +31,74 @@ def extract_cooking_items(exp_dir):
     
     return items
 
+def blocked_key_for(exp_dir):
+    """Return the blocked-access group of a task folder, e.g. "2 agent(s)"."""
+    blocked_access_match = re.search(r'blocked_access_([0-9_]+)$', exp_dir)
+    
+    if blocked_access_match:
+        blocked_access_str = blocked_access_match.group(1)
+        # Count how many agents have blocked access
+        num_blocked_agents = len(blocked_access_str.split('_'))
+        return f"{num_blocked_agents} agent(s)"
+    # No agents blocked
+    return "0 agent(s)"
+
+def task_outcome(full_exp_path, verbose=True):
+    """
+    Check the agent files of a task folder for a score.
+
+    Returns:
+        tuple: (score_found, is_successful)
+    """
+    is_successful = False
+    score_found = False
+    
+    # Get all JSON files in the experiment directory (or in the task of an experiment archive)
+    agent_files = task_json_files(full_exp_path)
+    
+    # Check each agent file for success information
+    for agent_file_path in agent_files:
+        try:
+            agent_data = json.loads(read_task_file(agent_file_path))
+                
+            # Check for score information in the turns data
+            if "turns" in agent_data:
+                for turn in agent_data["turns"]:
+                    if turn.get("role") == "system" and "content" in turn:
+                        if isinstance(turn["content"], str) and "Task ended with score : " in turn["content"]:
+                            score_found = True
+                            if "Task ended with score : 1" in turn["content"]:
+                                is_successful = True
+                                break
+            
+            # If we found success, no need to check other files
+            if is_successful:
+                break
+                
+        except (json.JSONDecodeError, IOError) as e:
+            if verbose:
+                print(f"Error reading {agent_file_path}: {e}")
+            # Continue to check other agent files instead of failing
+            continue
+    
+    return score_found, is_successful
+
 def analyze_experiments(root_dir, model_name):
+    # Get a list of all experiment directories
+    experiment_dirs = [os.path.basename(d) for d in task_folders(root_dir)
+                       if os.path.basename(d).startswith("multiagent_cooking_")]
+    
+    outcomes = {exp_dir: task_outcome(os.path.join(root_dir, exp_dir)) for exp_dir in experiment_dirs}
+    return aggregate_outcomes(outcomes, model_name)
+
+def aggregate_outcomes(outcomes, model_name):
+    """
+    Aggregate task outcomes by number of blocked agents and by cooking item.
+
+    Args:
+        outcomes (dict): Task folder name -> (score_found, is_successful) from task_outcome.
+        model_name (str): Name used when reporting ignored tasks.
+    """
     # Store results by number of blocked agents
     blocked_access_results = defaultdict(lambda: {
         "success": 0, 
@@ -50,63 +117,14 @@ def analyze_experiments(root_dir, model_name):
     # Keep track of ignored tasks
     ignored_tasks = []
     
-    # Get a list of all experiment directories
-    experiment_dirs = [d for d in os.listdir(root_dir) if os.path.isdir(os.path.join(root_dir, d)) 
-                      and d.startswith("multiagent_cooking_")]
-    
-    for exp_dir in experiment_dirs:
+    for exp_dir, (score_found, is_successful) in outcomes.items():
         # Extract cooking items
         cooking_items = extract_cooking_items(exp_dir)
         
         # Add to unique items set
         all_cooking_items.update(cooking_items)
         
-        # Extract blocked access information from directory name
-        blocked_access_match = re.search(r'blocked_access_([0-9_]+)$', exp_dir)
-        
-        if blocked_access_match:
-            blocked_access_str = blocked_access_match.group(1)
-            # Count how many agents have blocked access
-            num_blocked_agents = len(blocked_access_str.split('_'))
-            blocked_key = f"{num_blocked_agents} agent(s)"
-        else:
-            # No agents blocked
-            blocked_key = "0 agent(s)"
-        
-        # Check if the task was successful
-        is_successful = False
-        score_found = False
-        full_exp_path = os.path.join(root_dir, exp_dir)
-        
-        # Get all JSON files in the experiment directory
-        agent_files = [f for f in os.listdir(full_exp_path) if f.endswith(".json")]
-        
-        # Check each agent file for success information
-        for agent_file in agent_files:
-            agent_file_path = os.path.join(full_exp_path, agent_file)
-            
-            try:
-                with open(agent_file_path, 'r') as f:
-                    agent_data = json.load(f)
-                    
-                # Check for score information in the turns data
-                if "turns" in agent_data:
-                    for turn in agent_data["turns"]:
-                        if turn.get("role") == "system" and "content" in turn:
-                            if isinstance(turn["content"], str) and "Task ended with score : " in turn["content"]:
-                                score_found = True
-                                if "Task ended with score : 1" in turn["content"]:
-                                    is_successful = True
-                                    break
-                
-                # If we found success, no need to check other files
-                if is_successful:
-                    break
-                    
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Error reading {agent_file_path}: {e}")
-                # Continue to check other agent files instead of failing
-                continue
+        blocked_key = blocked_key_for(exp_dir)
         
         # If no score information was found in any agent file, ignore this task
         if not score_found:
@@ -308,6 +326,15 @@ def print_model_comparison_items_by_blocked(models_data, all_cooking_items):
         print(table)
 
 def generate_item_blocked_data(experiments_root):
+    outcomes = {}
+    for exp_dir in map(os.path.basename, task_folders(experiments_root)):
+        if not exp_dir.startswith("multiagent_cooking_"):
+            continue
+        outcomes[exp_dir] = task_outcome(os.path.join(experiments_root, exp_dir), verbose=False)
+    return aggregate_item_blocked(outcomes)
+
+def aggregate_item_blocked(outcomes):
+    """Aggregate task outcomes (see aggregate_outcomes) by cooking item and number of blocked agents."""
     # Organize data by item and blocked agent count
     item_blocked_data = defaultdict(lambda: defaultdict(lambda: {"success": 0, "total": 0}))
     
@@ -315,46 +342,10 @@ def generate_item_blocked_data(experiments_root):
     ignored_tasks = []
     
     # Populate the data structure
-    for exp_dir in os.listdir(experiments_root):
-        if not os.path.isdir(os.path.join(experiments_root, exp_dir)) or not exp_dir.startswith("multiagent_cooking_"):
-            continue
-        
+    for exp_dir, (score_found, is_successful) in outcomes.items():
         # Extract cooking items
         cooking_items = extract_cooking_items(exp_dir)
-        
-        # Extract blocked access information
-        blocked_access_match = re.search(r'blocked_access_([0-9_]+)$', exp_dir)
-        if blocked_access_match:
-            blocked_access_str = blocked_access_match.group(1)
-            num_blocked_agents = len(blocked_access_str.split('_'))
-            blocked_key = f"{num_blocked_agents} agent(s)"
-        else:
-            blocked_key = "0 agent(s)"
-        
-        # Check if the task was successful and if score information exists
-        is_successful = False
-        score_found = False
-        full_exp_path = os.path.join(experiments_root, exp_dir)
-        agent_files = [f for f in os.listdir(full_exp_path) if f.endswith(".json")]
-        
-        for agent_file in agent_files:
-            try:
-                with open(os.path.join(full_exp_path, agent_file), 'r') as f:
-                    agent_data = json.load(f)
-                    
-                if "turns" in agent_data:
-                    for turn in agent_data["turns"]:
-                        if turn.get("role") == "system" and "content" in turn:
-                            if isinstance(turn["content"], str) and "Task ended with score : " in turn["content"]:
-                                score_found = True
-                                if "Task ended with score : 1" in turn["content"]:
-                                    is_successful = True
-                                    break
-                
-                if is_successful:
-                    break
-            except:
-                continue
+        blocked_key = blocked_key_for(exp_dir)
         
         # If no score information was found, skip this task
         if not score_found:
@@ -369,52 +360,23 @@ def generate_item_blocked_data(experiments_root):
     
     return item_blocked_data, ignored_tasks
 
-def analyze_cooking_log(log_file):
-    # Placeholder for the actual analysis logic if it exists
-    # This function needs to be implemented based on the script's purpose
-    print(f"Analyzing {log_file}...") # Example print
-    # Example: return a dictionary of results
-    return {"file": os.path.basename(log_file), "score": 1} # Dummy result
-
 def main():
     parser = argparse.ArgumentParser(description='Analyze cooking task logs.')
     # Change default input dir to 'experiments' relative to project root
     parser.add_argument('--log_dir', type=str, default='experiments', 
-                        help='Directory containing the log files (relative to project root)')
-    # Removed --output_file argument
-    # parser.add_argument('--output_file', type=str, default='cooking_analysis_results.csv', 
-    #                     help='Output CSV file name (relative to project root)')
+                        help='Directory containing the experiment folders (relative to project root)')
     args = parser.parse_args()
 
     # Resolve log_dir path relative to project root
     log_dir_abs = args.log_dir
     if not os.path.isabs(log_dir_abs):
         log_dir_abs = os.path.join(project_root, log_dir_abs)
-        
-    # Hardcode output file path
-    output_file_abs = os.path.join(analysis_output_dir, "cooking_analysis.csv")
-
-    all_results = []
-    # Use absolute log directory path
-    log_pattern = os.path.join(log_dir_abs, '*.json')
-    print(f"Searching for logs in: {log_pattern}")
-    log_files_found = glob.glob(log_pattern)
-    print(f"Found {len(log_files_found)} log files.")
-    
-    for log_file in log_files_found:
-        results = analyze_cooking_log(log_file)
-        if results:
-            all_results.append(results) # Append the results dictionary
-    
-    if all_results:
-        df = pd.DataFrame(all_results)
-        # Ensure the output directory exists
-        os.makedirs(os.path.dirname(output_file_abs), exist_ok=True)
-        # Save to hardcoded absolute output file path
-        df.to_csv(output_file_abs, index=False)
-        print(f"Analysis complete. Results saved to {output_file_abs}")
-    else:
-        print("No results generated from log files.")
+
+    # cooking_analysis.csv is written by the report builder, which only re-reads changed task folders
+    from report_builder import ReportBuilder
+    stats = ReportBuilder(log_dir_abs, analysis_output_dir).build()
+    print(f"Analyzed {stats['folders_analyzed']} task folders ({stats['folders_cached']} unchanged). "
+          f"Results saved to {os.path.join(analysis_output_dir, 'cooking_analysis.csv')}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
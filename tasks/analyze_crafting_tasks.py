@@ -6,7 +6,7 @@ from botocore.exceptions import ClientError
 import json
 import argparse
 from tqdm import tqdm
-import glob
+from experiment_archive import read_task_file, task_folders, task_json_files
 from prettytable import PrettyTable
 import pandas as pd
 
@@ -84,14 +84,13 @@ def analyze_json_file(file_path):
         bool: True if task was successful, False otherwise.
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            if 'turns' in data and isinstance(data['turns'], list):
-                for turn in data['turns']:  # Check all turns, not just from the end
-                    if turn.get('role') == 'system' and isinstance(turn.get('content'), str):
-                        if "Task successful ended with code : 2" in turn['content'] or "Task ended with score : 1" in turn["content"] or "Task ended in score: 1" in turn["content"]:
-                            # print(f"Success found in {file_path}")
-                            return True
+        data = json.loads(read_task_file(file_path))
+        if 'turns' in data and isinstance(data['turns'], list):
+            for turn in data['turns']:  # Check all turns, not just from the end
+                if turn.get('role') == 'system' and isinstance(turn.get('content'), str):
+                    if "Task successful ended with code : 2" in turn['content'] or "Task ended with score : 1" in turn["content"] or "Task ended in score: 1" in turn["content"]:
+                        # print(f"Success found in {file_path}")
+                        return True
         return False
     except FileNotFoundError:
         print(f"Error: File not found: {file_path}")
@@ -105,7 +104,7 @@ def analyze_json_file(file_path):
 
 def extract_result(folder_path):
     folder_name = os.path.basename(folder_path)
-    json_files = glob.glob(os.path.join(folder_path, "*.json"))
+    json_files = task_json_files(folder_path)
     
     if not json_files:
         print(f"No JSON files found in {folder_name}")
@@ -134,8 +133,23 @@ def aggregate_results(local_folders):
     Returns:
         dict: A dictionary where keys are folder names and values are the aggregated outcomes.
     """
-    aggregated_data = {}
+    outcomes = {}
+    for folder_path in tqdm(local_folders):
+        outcomes[folder_path] = extract_result(folder_path)
+        if outcomes[folder_path] is not None:
+            print(f"Folder: {os.path.basename(folder_path)} -> {int(outcomes[folder_path])}")
+    return aggregate_outcomes(outcomes)
+
+def aggregate_outcomes(outcomes):
+    """
+    Aggregates per-folder outcomes into the overall, depth and plan metrics.
+
+    Args:
+        outcomes (dict): Folder path -> outcome of extract_result (None if the folder has no results).
 
+    Returns:
+        dict: A dictionary with the aggregated metrics.
+    """
     total = 0
     successful = 0
 
@@ -168,17 +182,14 @@ def aggregate_results(local_folders):
     depth_2_successful = 0
     depth_2_total = 0
     
-    for folder_path in tqdm(local_folders):
+    for folder_path, outcome in outcomes.items():
         folder_name = os.path.basename(folder_path)
 
         try: 
             total += 1
-            result = extract_result(folder_path)
-            success = int(extract_result(folder_path))
+            success = int(outcome)
             successful += success
 
-            print(f"Folder: {folder_name} -> {success}")
-
             if "missing" in folder_path:
                 missing_successful += success
                 missing_total += 1
@@ -255,8 +266,8 @@ def get_immediate_subdirectories(a_dir):
     # Ensure a_dir is relative to project root if not absolute
     if not os.path.isabs(a_dir):
         a_dir = os.path.join(project_root, a_dir)
-    return [os.path.join(a_dir, name) for name in os.listdir(a_dir)
-            if os.path.isdir(os.path.join(a_dir, name))]
+    # task folders of a plain folder, or <archive>/<task_id> of an experiment archive
+    return task_folders(a_dir)
 
 def format_percentage(value):
     """Format a decimal value as a percentage with 2 decimal places"""
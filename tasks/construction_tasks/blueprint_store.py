@@ -0,0 +1,143 @@
+"""
+Content-addressed store for construction blueprints.
+
+Construction task files repeat the whole blueprint in every task, even when tasks only
+differ in agent count or inventory. A packed task file instead references its blueprint
+by the hash of the normalized blueprint (sorted keys, compact JSON; "blueprint":
+"sha256:<hex>"), so blueprints that only differ in key order share one entry. The
+blueprint itself is stored once as blueprints/<hex>.json with the keys in the order it was
+first packed with. Tasks with an inline blueprint are left untouched by the resolvers, so
+packed and unpacked files can be mixed freely.
+construction_tasks.js resolves references the same way on the Node side.
+
+Example usage:
+python tasks/construction_tasks/blueprint_store.py pack tasks/construction_tasks/custom/*.json
+python tasks/construction_tasks/blueprint_store.py unpack tasks/construction_tasks/custom/*.json
+"""
+import argparse
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+BLUEPRINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blueprints")
+REF_PREFIX = "sha256:"
+
+
+def normalize_blueprint(blueprint):
+    """Return the canonical JSON bytes of a blueprint (sorted keys, no whitespace), which refs hash."""
+    return json.dumps(blueprint, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def serialize_blueprint(blueprint):
+    """Return the compact JSON bytes of a blueprint (keys kept in their original order), which is stored."""
+    return json.dumps(blueprint, separators=(",", ":")).encode("utf-8")
+
+
+def blueprint_ref(blueprint):
+    """Return the reference of an inline blueprint."""
+    return REF_PREFIX + hashlib.sha256(normalize_blueprint(blueprint)).hexdigest()
+
+
+def is_ref(value):
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+def _blueprint_path(ref, store_dir):
+    return os.path.join(store_dir, ref[len(REF_PREFIX):] + ".json")
+
+
+def put_blueprint(blueprint, store_dir=BLUEPRINT_DIR):
+    """Store a blueprint (if not already stored) and return its reference."""
+    ref = blueprint_ref(blueprint)
+    path = _blueprint_path(ref, store_dir)
+    if not os.path.exists(path):
+        os.makedirs(store_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(serialize_blueprint(blueprint))
+        os.replace(tmp_path, path)
+    return ref
+
+
+@lru_cache(maxsize=256)
+def _read_blueprint(ref, store_dir):
+    path = _blueprint_path(ref, store_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Blueprint {ref} not found in {store_dir}")
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def get_blueprint(value, store_dir=BLUEPRINT_DIR):
+    """
+    Return the inline blueprint for a reference, or value itself if it is already inline.
+    Only the file contents are cached, so every call returns a blueprint of its own.
+    """
+    if not is_ref(value):
+        return value
+    return json.loads(_read_blueprint(value, store_dir))
+
+
+def resolve_task(task, store_dir=BLUEPRINT_DIR):
+    """Return task with its blueprint inlined (the task itself if nothing needs resolving)."""
+    if not isinstance(task, dict) or not is_ref(task.get("blueprint")):
+        return task
+    return {**task, "blueprint": get_blueprint(task["blueprint"], store_dir)}
+
+
+def pack_tasks(tasks, store_dir=BLUEPRINT_DIR):
+    """Move the inline blueprints of {task_id: task} into the store and reference them by hash."""
+    packed = {}
+    for task_id, task in tasks.items():
+        blueprint = task.get("blueprint") if isinstance(task, dict) else None
+        if isinstance(blueprint, dict):
+            task = {**task, "blueprint": put_blueprint(blueprint, store_dir)}
+        packed[task_id] = task
+    return packed
+
+
+def unpack_tasks(tasks, store_dir=BLUEPRINT_DIR):
+    """Inline every referenced blueprint of {task_id: task}, restoring the original format."""
+    return {task_id: resolve_task(task, store_dir) for task_id, task in tasks.items()}
+
+
+def _convert_file(task_path, convert, output_path=None, store_dir=BLUEPRINT_DIR):
+    with open(task_path, "r") as f:
+        tasks = json.load(f)
+    converted = convert(tasks, store_dir)
+    output_path = output_path or task_path
+    with open(output_path, "w") as f:
+        json.dump(converted, f, indent=4)
+    return output_path
+
+
+def pack_file(task_path, output_path=None, store_dir=BLUEPRINT_DIR):
+    return _convert_file(task_path, pack_tasks, output_path, store_dir)
+
+
+def unpack_file(task_path, output_path=None, store_dir=BLUEPRINT_DIR):
+    return _convert_file(task_path, unpack_tasks, output_path, store_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack construction task blueprints into a content-addressed store, or inline them again")
+    parser.add_argument("command", choices=["pack", "unpack"])
+    parser.add_argument("task_files", nargs="+", help="Task files to convert in place")
+    parser.add_argument("--store", default=BLUEPRINT_DIR, help="Blueprint store directory")
+    parser.add_argument("--output_dir", default=None, help="Write converted files here instead of in place")
+    args = parser.parse_args()
+
+    convert = pack_file if args.command == "pack" else unpack_file
+    for task_path in args.task_files:
+        output_path = None
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            output_path = os.path.join(args.output_dir, os.path.basename(task_path))
+        before = os.path.getsize(task_path)
+        output_path = convert(task_path, output_path, args.store)
+        print(f"{args.command}ed {task_path} -> {output_path} ({before} -> {os.path.getsize(output_path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
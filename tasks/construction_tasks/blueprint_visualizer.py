@@ -1,76 +1,169 @@
+"""
+Render construction blueprints to PNG/PDF, one subplot per level.
+
+Each level's placement grid is mapped through a block palette to an RGB array with NumPy
+and drawn with a single imshow, so rendering cost no longer grows with one patch and one
+text artist per cell. Labels are optional and only drawn on non-air cells. Figures are
+rendered headless (Agg), and whole task files or directories are rendered in parallel
+across processes.
+
+Example usage:
+python tasks/construction_tasks/blueprint_visualizer.py tasks/construction_tasks/custom --output_dir thumbnails
+python tasks/construction_tasks/blueprint_visualizer.py custom/church_three_agents.json --format pdf --labels coords
+"""
+import argparse
+import glob
 import json
-import matplotlib.pyplot as plt
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
 
-def display_3d_blocks(data):
-    """Displays a 3D array of blocks with different types in a single figure with subplots for each level,
-    including block coordinates. Dynamically adjusts the height of the figure.
+from blueprint_store import get_blueprint
+from task_sampler import scan_tasks
 
-    Args:
-        data: A dictionary containing the block data, structured like the JSON example.
+BLOCK_COLORS = {
+    "air": "#FFFFFF",          # White
+    "oak_planks": "#8B4513",   # Saddle Brown
+    "stone_bricks": "#808080", # Gray
+    "oak_door": "#A0522D",      # Sienna
+    "oak_stairs": "#D2691E",    # Chocolate
+    "quartz_block": "#FFFFF0",  # Ivory
+    "glass_pane": "#00CED1",    # Dark Turquoise
+    "torch": "#FF8C00"          # Dark Orange
+}
+DEFAULT_COLOR = "#808080"  # Gray, for blocks without a palette entry
+LABEL_MODES = ("none", "blocks", "coords")
+
+
+def _hex_to_rgb(color):
+    return [int(color[i:i + 2], 16) / 255.0 for i in (1, 3, 5)]
+
+
+def level_to_rgb(placement, palette=BLOCK_COLORS):
     """
+    Map a level's placement grid (rows of block names) to an RGB array.
 
-    block_types = {
-        "air": "#FFFFFF",          # White
-        "oak_planks": "#8B4513",   # Saddle Brown
-        "stone_bricks": "#808080", # Gray
-        "oak_door": "#A0522D",      # Sienna
-        "oak_stairs": "#D2691E",    # Chocolate
-        "quartz_block": "#FFFFF0",  # Ivory
-        "glass_pane": "#00CED1",    # Dark Turquoise
-        "torch": "#FF8C00"          # Dark Orange
-    }
-
-    # Extract data from the JSON
-    levels = data["levels"]
+    Returns:
+        (rgb array of shape (rows, cols, 3), grid of block names as a NumPy array)
+    """
+    grid = np.array(placement)
+    names, inverse = np.unique(grid, return_inverse=True)
+    colors = np.array([_hex_to_rgb(palette.get(name, DEFAULT_COLOR)) for name in names])
+    return colors[inverse.reshape(grid.shape)], grid
+
+
+def render_blueprint(blueprint, output_path, labels="none", max_labels=400, dpi=100, palette=BLOCK_COLORS):
+    """
+    Render a blueprint (inline or a blueprint store reference) to output_path; the format
+    follows the file extension.
+
+    Args:
+        labels: "none", "blocks" (block names) or "coords" (world coordinates) on non-air cells.
+        max_labels: Upper bound on labels per level; denser levels are labelled with a stride.
+    """
+    blueprint = get_blueprint(blueprint)
+    levels = blueprint["levels"]
     num_levels = len(levels)
 
-    # Create a figure and subplots grid
-    fig, axes = plt.subplots(num_levels, 1, figsize=(10, 5 * num_levels))  # One column, dynamic height
-    axes[0].legend(handles=[plt.Rectangle((0, 0), 1, 1, color=color) for color in block_types.values()], 
-           labels=block_types.keys(), loc='upper right')
-    starting_coords = levels[0]["coordinates"]
+    fig = Figure(figsize=(10, 5 * num_levels))  # One column, dynamic height
+    axes = fig.subplots(num_levels, 1, squeeze=False)[:, 0]
+    used_blocks = set()
 
-    # Iterate over each level and corresponding subplot
-    for i, level in enumerate(levels):
-        ax = axes[i]
+    for ax, level in zip(axes, levels):
         ax.set_title(f"Level {level['level']}")
-        placement = level["placement"]
-
-        # Convert placement data to NumPy array
-        block_array = np.array([
-            [block_types.get(block, 'gray') for block in row] for row in placement
-        ])
-
-        # Iterate over each block in the level
-        for x in range(block_array.shape[1]):
-            for y in range(block_array.shape[0]):
-                block_type = block_array[y, x]
-
-                # Plot the block as a rectangle
-                rect = plt.Rectangle((x, y), 1, 1, color=block_type)
-                ax.add_patch(rect)
-
-                # Add coordinate text to the center of the block
-                real_x = x + starting_coords[0]
-                real_y = level['level'] + starting_coords[1]
-                real_z = y + starting_coords[2]
-                ax.text(x + 0.5, y + 0.5, f"({real_x},{real_y},{real_z})", ha='center', va='center', fontsize=8)
-
-        # Set axis limits and labels
-        ax.set_xlim([0, block_array.shape[1]])
-        ax.set_ylim([0, block_array.shape[0]])
+        rgb, grid = level_to_rgb(level["placement"], palette)
+        used_blocks.update(np.unique(grid).tolist())
+        rows, cols = grid.shape
+        ax.imshow(rgb, origin="lower", extent=(0, cols, 0, rows), interpolation="nearest")
+
+        if labels != "none":
+            ys, xs = np.nonzero(grid != "air")
+            stride = max(1, -(-len(xs) // max_labels))
+            x0, y0, z0 = level["coordinates"]
+            for x, y in zip(xs[::stride], ys[::stride]):
+                text = grid[y, x] if labels == "blocks" else f"({x0 + x},{y0},{z0 + y})"
+                ax.text(x + 0.5, y + 0.5, text, ha="center", va="center", fontsize=6)
+
+        ax.set_xlim([0, cols])
+        ax.set_ylim([0, rows])
         ax.set_xlabel("X")
-        ax.set_ylabel("Y")
+        ax.set_ylabel("Z")
+
+    legend_blocks = sorted(used_blocks, key=lambda name: (name not in palette, name))
+    axes[0].legend(handles=[Patch(color=palette.get(name, DEFAULT_COLOR)) for name in legend_blocks],
+                   labels=legend_blocks, loc="upper right")
+    fig.tight_layout()
+    fig.savefig(output_path, bbox_inches="tight", dpi=dpi)
+    return output_path
+
+
+def display_3d_blocks(data, output_path="church_three_agents.pdf", labels="coords"):
+    """Displays a blueprint with a subplot for each level, including block coordinates."""
+    return render_blueprint(data, output_path, labels=labels)
+
+
+def _render_task(task_path, task_id, start, end, output_path, labels, dpi):
+    with open(task_path, "rb") as f:
+        f.seek(start)
+        task = json.loads(f.read(end - start))
+    return render_blueprint(task["blueprint"], output_path, labels=labels, dpi=dpi)
+
+
+def collect_task_files(paths):
+    """Expand directories into the task JSON files they contain."""
+    task_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            task_files.extend(sorted(glob.glob(os.path.join(path, "*.json"))))
+        else:
+            task_files.append(path)
+    return task_files
+
+
+def render_task_files(paths, output_dir, fmt="png", labels="none", dpi=100, workers=None):
+    """Render the blueprint of every construction task in the given files or directories."""
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    for task_path in collect_task_files(paths):
+        try:
+            tasks = list(scan_tasks(task_path))
+        except (ValueError, IndexError, TypeError) as e:
+            print(f"Skipping {task_path}: not a task file ({e})")
+            continue
+        for task_id, start, end, num_levels in tasks:
+            if num_levels == 0:
+                continue
+            output_path = os.path.join(output_dir, f"{task_id}.{fmt}")
+            jobs.append((task_path, task_id, start, end, output_path, labels, dpi))
+
+    rendered = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_render_task, *job): job for job in jobs}
+        for future in as_completed(futures):
+            task_path, task_id = futures[future][:2]
+            try:
+                rendered.append(future.result())
+            except Exception as e:
+                print(f"Error rendering {task_id} from {task_path}: {e}")
+    print(f"Rendered {len(rendered)} of {len(jobs)} blueprints to {output_dir}")
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render construction task blueprints to images")
+    parser.add_argument("paths", nargs="+", help="Task files or directories of task files")
+    parser.add_argument("--output_dir", default="blueprint_renders", help="Directory for the rendered images")
+    parser.add_argument("--format", choices=["png", "pdf"], default="png")
+    parser.add_argument("--labels", choices=LABEL_MODES, default="none", help="Labels drawn on non-air cells")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="Number of rendering processes (default: CPU count)")
+    args = parser.parse_args()
 
-    
-    plt.tight_layout()  # Adjust spacing between subplots
-    # plt.show()
-    plt.savefig("construction_tasks/church_three_agents.pdf", bbox_inches='tight')
+    render_task_files(args.paths, args.output_dir, args.format, args.labels, args.dpi, args.workers)
 
-# Example usage:
-with open("construction_tasks/custom/church_three_agents.json", "r") as f:
-    data = json.load(f)
-    data = data["church_three_agents"]["blueprint"]
 
-display_3d_blocks(data)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
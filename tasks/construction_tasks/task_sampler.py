@@ -0,0 +1,190 @@
+"""
+Streaming index and sampler for large construction task files.
+
+A construction task file maps task names to tasks that each carry a full blueprint, so
+json.load-ing it just to count levels and parse difficulty out of the names does not scale
+to the pools we generate. scan_tasks tokenizes the memory-mapped file incrementally and
+yields each task's name, byte span and number of blueprint levels without building any
+Python objects for the blueprints. Samplers work on the resulting index and copy_tasks
+writes out only the chosen tasks, byte for byte.
+
+Example usage:
+python tasks/construction_tasks/task_sampler.py train/2agents.json --mode sequential --seed 0
+"""
+import argparse
+import json
+import mmap
+import random
+import re
+from collections import defaultdict
+
+from blueprint_store import get_blueprint, is_ref
+
+DIFFICULTY_PATTERN = re.compile(r'materials_(\d+)_rooms_(\d+)_window_(\d+)_carpet_(\d+)_variant_\d+')
+# strings, structural characters and bare literals (numbers, true, false, null)
+TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]:,]|[^\s{}\[\]:,"]+')
+
+
+def extract_difficulty(task_name):
+    """Extract difficulty parameters (m, r, w, c) from the task name."""
+    match = DIFFICULTY_PATTERN.search(task_name)
+    if match:
+        return tuple(map(int, match.groups()))
+    return (0, 0, 0, 0)
+
+
+def scan_tasks(file_path):
+    """
+    Yield (task_name, start, end, num_levels) for every task in a task file, where
+    start:end is the byte span of the task's JSON value and num_levels is the length of
+    its blueprint's "levels" array. Blueprints packed into the blueprint store are looked
+    up by reference.
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # one frame per open container: [kind, current key, expecting a key, is the levels array]
+        stack = []
+        task_name, start, num_levels = None, 0, 0
+        for match in TOKEN_PATTERN.finditer(mm):
+            token = match.group()
+            head = token[:1]
+            if head in b':,':
+                if head == b',' and stack[-1][0] == b'{':
+                    stack[-1][2] = True
+                continue
+            if head in b'}]':
+                stack.pop()
+                if len(stack) == 1:
+                    yield task_name, start, match.end(), num_levels
+                continue
+
+            frame = stack[-1] if stack else None
+            if frame is not None and frame[0] == b'{' and frame[2]:
+                frame[1] = token
+                frame[2] = False
+                continue
+
+            # a value starts here
+            if len(stack) == 1:
+                task_name, start, num_levels = json.loads(frame[1]), match.start(), 0
+            elif frame is not None and frame[3]:
+                num_levels += 1
+            if head in b'{[':
+                is_levels = (head == b'[' and len(stack) == 3
+                             and stack[1][1] == b'"blueprint"' and stack[2][1] == b'"levels"')
+                stack.append([head, None, head == b'{', is_levels])
+            elif len(stack) == 1:
+                yield task_name, start, match.end(), num_levels
+            elif len(stack) == 2 and frame[1] == b'"blueprint"' and head == b'"':
+                ref = json.loads(token)
+                if is_ref(ref):
+                    num_levels = len(get_blueprint(ref).get("levels", []))
+
+
+def build_index(file_path, min_levels=3):
+    """
+    Group the tasks of a file by difficulty.
+
+    Returns:
+        ({(m, r, w, c): [(task_name, start, end), ...]}, total number of tasks), keeping
+        only tasks with at least min_levels blueprint levels, in file order.
+    """
+    index = defaultdict(list)
+    total = 0
+    for task_name, start, end, num_levels in scan_tasks(file_path):
+        total += 1
+        if num_levels >= min_levels:
+            index[extract_difficulty(task_name)].append((task_name, start, end))
+    return dict(index), total
+
+
+def sample_sequential(index, limit=500, seed=None):
+    """Take tasks in increasing (m, r, w, c) order until limit are collected, then shuffle them."""
+    sampled = []
+    for key in sorted(index):
+        if len(sampled) >= limit:
+            break
+        sampled.extend(index[key][:limit - len(sampled)])
+    random.Random(seed).shuffle(sampled)
+    return sampled
+
+
+def sample_with_distribution(index, seed=None, per_mr=3, extra=((0, 0, 0, 0, 2), (1, 0, 0, 0, 1))):
+    """
+    Sample per_mr tasks for each (m, r) with 0 <= m, r <= 2 and w, c <= 1, then the extra
+    (m, r, w, c, count) tasks, never picking a task twice. Sampling is stratified by
+    (m, r) and reproducible for a given seed.
+    """
+    rng = random.Random(seed)
+    sampled = []
+    already_sampled = set()
+
+    def take(candidates, count, label):
+        candidates = [t for t in candidates if t[0] not in already_sampled]
+        if len(candidates) < count:
+            print(f"Warning: Not enough tasks for {label}. Found {len(candidates)}.")
+            chosen = candidates
+        else:
+            chosen = rng.sample(candidates, count)
+        for task in chosen:
+            sampled.append(task)
+            already_sampled.add(task[0])
+
+    for m in range(3):
+        for r in range(3):
+            candidates = []
+            for key in sorted(index):
+                if key[0] == m and key[1] == r and key[2] <= 1 and key[3] <= 1:
+                    candidates.extend(index[key])
+            take(candidates, per_mr, f"(m={m}, r={r}) with w,c <= 1")
+    for *key, count in extra:
+        take(index.get(tuple(key), []), count, tuple(key))
+    return sampled
+
+
+def copy_tasks(file_path, tasks, output_path):
+    """Write the given (task_name, start, end) tasks of file_path to output_path as a JSON object."""
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            open(output_path, 'wb') as out:
+        out.write(b'{')
+        for i, (task_name, start, end) in enumerate(tasks):
+            out.write(b',\n    ' if i else b'\n    ')
+            out.write(json.dumps(task_name).encode('utf-8') + b': ')
+            out.write(mm[start:end])
+        out.write(b'\n}\n')
+
+
+def print_distribution(tasks):
+    counts = defaultdict(int)
+    for task_name, _, _ in tasks:
+        counts[extract_difficulty(task_name)] += 1
+    print("\nTask count per (m, r, w, c):")
+    for key, count in sorted(counts.items()):
+        print(f"{key}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample construction tasks without loading whole task files")
+    parser.add_argument("input", help="Construction task file")
+    parser.add_argument("--output", help="Output file (default: <input>_<mode>_sampled.json)")
+    parser.add_argument("--mode", choices=["sequential", "distribution"], default="sequential")
+    parser.add_argument("--limit", type=int, default=500, help="Number of tasks for sequential sampling")
+    parser.add_argument("--min_levels", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    index, total = build_index(args.input, args.min_levels)
+    print(f"Total available tasks: {total}")
+    print(f"Tasks with at least {args.min_levels} levels: {sum(len(v) for v in index.values())}")
+    if args.mode == "sequential":
+        tasks = sample_sequential(index, args.limit, args.seed)
+    else:
+        tasks = sample_with_distribution(index, args.seed)
+    print_distribution(tasks)
+
+    output = args.output or args.input.replace('.json', f'_{args.mode}_sampled.json')
+    copy_tasks(args.input, tasks, output)
+    print(f"\nSaved {len(tasks)} tasks to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Dense voxel representation of construction blueprints for offline scoring and analysis.
+
+A blueprint's levels[].placement lists become one uint16 array indexed [level, z, x],
+plus a palette of block names (index 0 is always "air"). Each level keeps its own start
+coordinates and extent, exactly as in the blueprint, so conversion round-trips and
+comparisons match Blueprint.checkLevel in construction_tasks.js. Comparing against a
+world snapshot (a blueprint-format dict, e.g. from worldToBlueprint, or another
+VoxelBlueprint) is a handful of array operations per level: cells that are air in both
+are ignored, every other cell is a match or a mismatch.
+
+Example usage:
+voxels = VoxelBlueprint.from_blueprint(task["blueprint"])
+diff = voxels.diff(world_snapshot)
+diff.score(), diff.level_completion(), diff.missing_counts()
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from blueprint_store import get_blueprint
+
+AIR = "air"
+MAGIC = b"VXBP"
+VERSION = 1
+# magic, version, header length
+HEADER_FORMAT = "<4sHI"
+
+
+class VoxelBlueprint:
+    """
+    A blueprint as a uint16 voxel array [level, z, x] plus a palette of block names.
+
+    All levels share one (z, x) frame starting at frame_origin = (min x, min z) over the
+    levels; coordinates[i] is level i's start [x, y, z] and shapes[i] its (rows, cols).
+    """
+
+    def __init__(self, voxels, palette, coordinates, shapes, levels=None, materials=None):
+        if not palette or palette[0] != AIR:
+            raise ValueError('palette must start with "air"')
+        self.voxels = np.asarray(voxels, dtype=np.uint16)
+        self.palette = list(palette)
+        self.coordinates = np.asarray(coordinates, dtype=np.int64).reshape(-1, 3)
+        self.shapes = np.asarray(shapes, dtype=np.int64).reshape(-1, 2)
+        self.levels = list(levels) if levels is not None else list(range(len(self.coordinates)))
+        self.materials = materials
+        self.frame_origin = (self.coordinates[:, [0, 2]].min(axis=0) if len(self.coordinates)
+                             else np.zeros(2, dtype=np.int64))
+        # (z, x) offset of each level in the shared frame
+        self.offsets = self.coordinates[:, [2, 0]] - self.frame_origin[::-1]
+        self.extent_mask = np.zeros(self.voxels.shape, dtype=bool)
+        for i, ((z0, x0), (rows, cols)) in enumerate(zip(self.offsets, self.shapes)):
+            self.extent_mask[i, z0:z0 + rows, x0:x0 + cols] = True
+
+    @classmethod
+    def from_blueprint(cls, blueprint):
+        """Build from a blueprint dict (or a blueprint store reference)."""
+        blueprint = get_blueprint(blueprint)
+        levels = blueprint["levels"]
+        coordinates = np.array([level["coordinates"] for level in levels], dtype=np.int64).reshape(-1, 3)
+        grids = [np.array(level["placement"], dtype=str).reshape(len(level["placement"]), -1) for level in levels]
+        shapes = [grid.shape for grid in grids]
+
+        frame_origin = coordinates[:, [0, 2]].min(axis=0) if len(levels) else np.zeros(2, dtype=np.int64)
+        offsets = coordinates[:, [2, 0]] - frame_origin[::-1]
+        depth = max((int(z0) + rows for (z0, _), (rows, _) in zip(offsets, shapes)), default=0)
+        width = max((int(x0) + cols for (_, x0), (_, cols) in zip(offsets, shapes)), default=0)
+
+        lookup = {AIR: 0}
+        voxels = np.zeros((len(levels), depth, width), dtype=np.uint16)
+        for i, ((z0, x0), grid) in enumerate(zip(offsets, grids)):
+            if grid.size == 0:
+                continue
+            names, inverse = np.unique(grid, return_inverse=True)
+            ids = np.array([lookup.setdefault(str(name), len(lookup)) for name in names], dtype=np.uint16)
+            voxels[i, z0:z0 + grid.shape[0], x0:x0 + grid.shape[1]] = ids[inverse.reshape(grid.shape)]
+        palette = sorted(lookup, key=lookup.get)
+        level_numbers = [level.get("level", i) for i, level in enumerate(levels)]
+        return cls(voxels, palette, coordinates, shapes, level_numbers, blueprint.get("materials"))
+
+    def to_blueprint(self):
+        """Convert back to the blueprint dict format used in task files."""
+        names = np.array(self.palette, dtype=object)
+        levels = []
+        for i, level in enumerate(self.levels):
+            (z0, x0), (rows, cols) = self.offsets[i], self.shapes[i]
+            levels.append({
+                "level": level,
+                "coordinates": self.coordinates[i].tolist(),
+                "placement": names[self.voxels[i, z0:z0 + rows, x0:x0 + cols]].tolist(),
+            })
+        materials = self.materials if self.materials is not None else self.material_counts()
+        return {"materials": materials, "levels": levels}
+
+    def material_counts(self):
+        """Return {block: count} over all non-air voxels."""
+        counts = np.bincount(self.voxels.ravel(), minlength=len(self.palette))
+        return {self.palette[i]: int(counts[i]) for i in np.nonzero(counts)[0] if i != 0}
+
+    def _aligned(self, other):
+        """
+        Return other's blocks at this blueprint's cells, in a palette extending this one.
+        Each level is matched to the snapshot level with the same y coordinate (or by index
+        when both list the same y coordinates, as hand-written blueprints may repeat one y
+        for every level); cells the snapshot does not cover read as air.
+        """
+        palette = list(self.palette)
+        lookup = {name: i for i, name in enumerate(palette)}
+        for name in other.palette:
+            if name not in lookup:
+                lookup[name] = len(palette)
+                palette.append(name)
+        remap = np.array([lookup[name] for name in other.palette], dtype=np.uint16)
+
+        aligned = np.zeros(self.voxels.shape, dtype=np.uint16)
+        if np.array_equal(self.coordinates[:, 1], other.coordinates[:, 1]):
+            other_levels = None
+        else:
+            other_levels = {int(y): j for j, y in enumerate(other.coordinates[:, 1])}
+        # position of other's frame in this frame, as (z, x)
+        dz, dx = (other.frame_origin - self.frame_origin)[::-1]
+        depth, width = self.voxels.shape[1:]
+        other_depth, other_width = other.voxels.shape[1:]
+        z_start, z_stop = max(0, dz), min(depth, dz + other_depth)
+        x_start, x_stop = max(0, dx), min(width, dx + other_width)
+        if z_start >= z_stop or x_start >= x_stop:
+            return aligned, palette
+        for i, y in enumerate(self.coordinates[:, 1]):
+            j = i if other_levels is None else other_levels.get(int(y))
+            if j is None:
+                continue
+            source = other.voxels[j, z_start - dz:z_stop - dz, x_start - dx:x_stop - dx]
+            aligned[i, z_start:z_stop, x_start:x_stop] = remap[source]
+        return aligned, palette
+
+    def diff(self, snapshot):
+        """Compare against a world snapshot (blueprint dict or VoxelBlueprint)."""
+        if not isinstance(snapshot, VoxelBlueprint):
+            snapshot = VoxelBlueprint.from_blueprint(snapshot)
+        actual, palette = self._aligned(snapshot)
+        return BlueprintDiff(self, actual, palette)
+
+    def to_bytes(self):
+        """Serialize to a compact binary form: a small JSON header and zlib-compressed voxels."""
+        header = json.dumps({
+            "shape": list(self.voxels.shape),
+            "palette": self.palette,
+            "coordinates": self.coordinates.tolist(),
+            "shapes": self.shapes.tolist(),
+            "levels": self.levels,
+            "materials": self.materials,
+        }, separators=(",", ":")).encode("utf-8")
+        body = zlib.compress(self.voxels.astype("<u2").tobytes(), 6)
+        return struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(header)) + header + body
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, header_len = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a voxel blueprint (magic {magic!r}, version {version})")
+        offset = struct.calcsize(HEADER_FORMAT)
+        header = json.loads(data[offset:offset + header_len])
+        voxels = np.frombuffer(zlib.decompress(data[offset + header_len:]), dtype="<u2")
+        voxels = voxels.reshape(header["shape"]).astype(np.uint16)
+        return cls(voxels, header["palette"], header["coordinates"], header["shapes"],
+                   header["levels"], header["materials"])
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class BlueprintDiff:
+    """Result of VoxelBlueprint.diff: boolean masks over the blueprint's [level, z, x] grid."""
+
+    def __init__(self, blueprint, actual, palette):
+        self.blueprint = blueprint
+        self.expected = blueprint.voxels
+        self.actual = actual
+        self.palette = palette
+        relevant = blueprint.extent_mask & ((self.expected != 0) | (actual != 0))
+        self.mismatch_mask = relevant & (self.expected != actual)
+        self.match_mask = relevant & ~self.mismatch_mask
+
+    def score(self):
+        """Percentage of matching cells, as in ConstructionTaskValidator."""
+        matches = int(self.match_mask.sum())
+        total = matches + int(self.mismatch_mask.sum())
+        return 100.0 * matches / total if total else 100.0
+
+    def is_complete(self):
+        return not self.mismatch_mask.any()
+
+    def level_completion(self):
+        """Return {level: fraction of relevant cells that match} per level."""
+        matches = self.match_mask.sum(axis=(1, 2))
+        totals = matches + self.mismatch_mask.sum(axis=(1, 2))
+        fractions = np.divide(matches, totals, out=np.ones(len(totals)), where=totals > 0)
+        return {level: float(f) for level, f in zip(self.blueprint.levels, fractions)}
+
+    def _counts(self, voxels, mask):
+        counts = np.bincount(voxels[mask], minlength=len(self.palette))
+        return {self.palette[i]: int(counts[i]) for i in np.nonzero(counts)[0] if i != 0}
+
+    def missing_counts(self):
+        """Return {block: count} of expected blocks that are not in place."""
+        return self._counts(self.expected, self.mismatch_mask)
+
+    def extra_counts(self):
+        """Return {block: count} of blocks in the world where something else is expected."""
+        return self._counts(self.actual, self.mismatch_mask)
+
+    def mismatches(self, limit=None):
+        """List mismatches in the format of Blueprint.checkLevel."""
+        levels, zs, xs = np.nonzero(self.mismatch_mask)
+        if limit is not None:
+            levels, zs, xs = levels[:limit], zs[:limit], xs[:limit]
+        frame_x, frame_z = self.blueprint.frame_origin
+        return [{
+            "level": self.blueprint.levels[i],
+            "coordinates": [int(frame_x + x), int(self.blueprint.coordinates[i, 1]), int(frame_z + z)],
+            "expected": self.palette[self.expected[i, z, x]],
+            "actual": self.palette[self.actual[i, z, x]],
+        } for i, z, x in zip(levels, zs, xs)]
@@ -0,0 +1,359 @@
+"""
+Structured recipe graph for the cooking tasks.
+
+Every item is a node with a source (farm, mob, chest, crafted, smelted), the station
+it is made at, the ingredients (with counts) consumed per craft and how many items a
+craft yields. Target dishes additionally carry the natural-language recipe steps that
+are shown to the agents and the chest items handed out for them (the quantities the
+generated task sets were built with, which are not always what expand() derives). The
+task generators take chest requirements and recipe text from here instead of keeping
+their own copies of COOKING_ITEMS.
+"""
+import math
+from collections import Counter
+from typing import Dict, List, Any, Iterable
+
+FARM = "farm"
+MOB = "mob"
+CHEST = "chest"
+CRAFTED = "crafted"
+SMELTED = "smelted"
+
+CRAFTING_TABLE = "crafting_table"
+FURNACE = "furnace"
+
+# one piece of coal smelts this many items
+SMELTS_PER_COAL = 8
+
+ITEMS = {
+    # Raw ingredients
+    "wheat": {"source": FARM},
+    "beetroot": {"source": FARM},
+    "carrot": {"source": FARM},
+    "potato": {"source": FARM},
+    "pumpkin": {"source": FARM},
+    "sugar_cane": {"source": FARM},
+    "red_mushroom": {"source": FARM},
+    "brown_mushroom": {"source": FARM},
+    "mutton": {"source": MOB, "mob": "sheep"},
+    "beef": {"source": MOB, "mob": "cow"},
+    "porkchop": {"source": MOB, "mob": "pig"},
+    "chicken": {"source": MOB, "mob": "chicken"},
+    "rabbit": {"source": MOB, "mob": "rabbit"},
+    "coal": {"source": CHEST},
+    "bowl": {"source": CHEST},
+    "milk_bucket": {"source": CHEST},
+    "egg": {"source": CHEST},
+    "dandelion": {"source": CHEST},
+    "cocoa_beans": {"source": CHEST},
+    "apple": {"source": CHEST},
+    "gold_ingot": {"source": CHEST},
+
+    # Intermediates
+    "sugar": {"source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"sugar_cane": 1}},
+    "gold_nugget": {"source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"gold_ingot": 1}, "yield": 9},
+
+    # Cooked Meats
+    "cooked_mutton": {
+        "source": SMELTED, "station": FURNACE, "ingredients": {"mutton": 1},
+        "recipe": [
+            "Step 1: Kill a sheep and pick up 1 mutton that is dropped.",
+            "Step 2: Get coal from your inventory or other agents.",
+            "Step 3: Put coal in the furnace",
+            "Step 4: Go to furnace and use it to cook the mutton."
+        ],
+        "description": "Cooked mutton meat",
+        "complexity": "easy",
+        "required_chest_items": {"coal": 1},
+    },
+    "cooked_beef": {
+        "source": SMELTED, "station": FURNACE, "ingredients": {"beef": 1},
+        "recipe": [
+            "Step 1: Kill a cow and pick up 1 beef that is dropped.",
+            "Step 2: Get coal from your inventory or other agents.",
+            "Step 3: Put coal in the furnace",
+            "Step 4: Go to furnace and use it to cook the beef."
+        ],
+        "description": "Cooked beef meat",
+        "complexity": "easy",
+        "required_chest_items": {"coal": 1},
+    },
+    "cooked_porkchop": {
+        "source": SMELTED, "station": FURNACE, "ingredients": {"porkchop": 1},
+        "recipe": [
+            "Step 1: Kill a pig and pick up 1 porkchop that is dropped.",
+            "Step 2: Get coal from your inventory or other agents.",
+            "Step 3: Put coal in the furnace",
+            "Step 4: Go to furnace and use it to cook the porkchop."
+        ],
+        "description": "Cooked porkchop",
+        "complexity": "easy",
+        "required_chest_items": {"coal": 1},
+    },
+    "cooked_chicken": {
+        "source": SMELTED, "station": FURNACE, "ingredients": {"chicken": 1},
+        "recipe": [
+            "Step 1: Kill a chicken and pick up 1 raw chicken that is dropped.",
+            "Step 2: Get coal from your inventory or other agents.",
+            "Step 3: Put coal in the furnace",
+            "Step 4: Go to furnace and use it to cook the raw chicken."
+        ],
+        "description": "Cooked chicken meat",
+        "complexity": "easy",
+        "required_chest_items": {"coal": 1},
+    },
+    "cooked_rabbit": {
+        "source": SMELTED, "station": FURNACE, "ingredients": {"rabbit": 1},
+        "recipe": [
+            "Step 1: Kill a rabbit and pick up 1 raw rabbit that is dropped.",
+            "Step 2: Get coal from your inventory or other agents.",
+            "Step 3: Put coal in the furnace",
+            "Step 2: Go to furnace and use it to cook the raw rabbit."
+        ],
+        "description": "Cooked rabbit meat",
+        "complexity": "easy",
+        "required_chest_items": {"coal": 1},
+    },
+
+    # Soups and Stews
+    "beetroot_soup": {
+        "source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"beetroot": 6, "bowl": 1},
+        "recipe": [
+            "Step 1: Go to the farm and collect 6 beetroot.",
+            "Step 2: From your inventory or other agents get a bowl.",
+            "Step 3: Go to the crafting table and combine the 6 beetroot and 1 bowl to make beetroot soup."
+        ],
+        "description": "A hearty beetroot soup",
+        "complexity": "medium",
+        "required_chest_items": {"bowl": 1},
+    },
+    "mushroom_stew": {
+        "source": CRAFTED, "station": CRAFTING_TABLE,
+        "ingredients": {"red_mushroom": 1, "brown_mushroom": 1, "bowl": 1},
+        "recipe": [
+            "Step 1: Go to the farm and collect 1 red mushroom and 1 brown mushroom.",
+            "Step 2: From your inventory or other agents get a bowl.",
+            "Step 3: Go to the crafting table and combine both the mushrooms and bowl to make mushroom stew."
+        ],
+        "description": "A warm mushroom stew",
+        "complexity": "medium",
+        "required_chest_items": {"bowl": 1},
+    },
+    "rabbit_stew": {
+        "source": CRAFTED, "station": CRAFTING_TABLE,
+        "ingredients": {"cooked_rabbit": 1, "carrot": 1, "baked_potato": 1, "brown_mushroom": 1, "bowl": 1},
+        "recipe": [
+            "Step 1: Go to the farm and collect 1 carrot, 1 potato, and 1 brown mushroom (search for 'potatoes' (not 'potato').",
+            "Step 2: Get coal from your inventory or other agents.",
+            "Step 3: Put coal in the furnace",
+            "Step 4: Go to the furnace and bake the potato.",
+            "Step 5: From your inventory or other agents get a bowl",
+            "Step 6: Kill a rabbit and pick up 1 raw rabbit that is dropped.",
+            "Step 7: Go to the furnace and cook the raw rabbit.",
+            "Step 8: Go to the crafting table and combine the cooked rabbit, baked potato, carrot, brown mushroom, and bowl to make rabbit stew."
+        ],
+        "description": "A hearty rabbit stew",
+        "complexity": "hard",
+        "required_chest_items": {"bowl": 1},
+    },
+    "suspicious_stew": {
+        "source": CRAFTED, "station": CRAFTING_TABLE,
+        "ingredients": {"red_mushroom": 1, "brown_mushroom": 1, "bowl": 1, "dandelion": 1},
+        "recipe": [
+            "Step 1: Go to the farm and collect 1 red mushroom, 1 brown mushroom.",
+            "Step 2: From your inventory or other agents get a bowl and 1 dandelion",
+            "Step 3: Go to the crafting table and combine the mushrooms, dandelion, and bowl to make suspicious stew."
+        ],
+        "description": "A mysterious stew with special effects",
+        "complexity": "medium",
+        "required_chest_items": {"bowl": 1, "dandelion": 1},
+    },
+
+    # Baked Goods
+    "baked_potato": {
+        "source": SMELTED, "station": FURNACE, "ingredients": {"potato": 1},
+        "recipe": [
+            "Step 1: Go to the farm and collect 1 potato (search for 'potatoes' (not 'potato')).",
+            "Step 2: Get coal from your inventory or other agents.",
+            "Step 3: Put coal in the furnace",
+            "Step 2: Go to the furnace and bake the potato."
+        ],
+        "description": "A simple baked potato",
+        "complexity": "easy",
+        "required_chest_items": {"coal": 1},
+    },
+    "bread": {
+        "source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"wheat": 3},
+        "recipe": [
+            "Step 1: Go to the farm and collect 3 wheat.",
+            "Step 2: Go to the crafting table and use the wheat to craft bread."
+        ],
+        "description": "Fresh bread",
+        "complexity": "medium",
+        "required_chest_items": {},
+    },
+    "cake": {
+        "source": CRAFTED, "station": CRAFTING_TABLE,
+        "ingredients": {"wheat": 3, "sugar": 2, "egg": 1, "milk_bucket": 3},
+        "recipe": [
+            "Step 1: Go to the farm and collect 3 wheat, 2 sugar cane.",
+            "Step 2: From your inventory or other agents get 3 milk buckets (already filled with milk).",
+            "Step 3: Get an egg from your inventory or other agents.",
+            "Step 4: Go to the crafting table and craft the sugarcane into sugar.",
+            "Step 5: Go to the crafting table and combine all ingredients (3 wheat, 2 sugar, 1 egg, and milk bucket) to make a cake."
+        ],
+        "description": "A delicious cake",
+        "complexity": "hard",
+        "required_chest_items": {"milk_bucket": 3, "egg": 1},
+    },
+    "cookie": {
+        "source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"wheat": 2, "cocoa_beans": 1}, "yield": 8,
+        "recipe": [
+            "Step 1: Go to the farm and collect 2 wheat.",
+            "Step 2: Get 1 cocoa bean from your inventory or other agents.",
+            "Step 3: Go to the crafting table and combine the wheat and cocoa bean to craft a cookie."
+        ],
+        "description": "Sweet cookies",
+        "complexity": "medium",
+        "required_chest_items": {"cocoa_beans": 1},
+    },
+    "pumpkin_pie": {
+        "source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"pumpkin": 1, "sugar": 1, "egg": 1},
+        "recipe": [
+            "Step 1: Go to the farm and collect 1 pumpkin and 1 sugar cane.",
+            "Step 2: Get 1 egg from your inventory or other bots",
+            "Step 3: Go to the crafting table and craft the sugar cane into sugar.",
+            "Step 4: Go to the crafting table and combine the pumpkin, egg, and sugar to make a pumpkin pie."
+        ],
+        "description": "Delicious pumpkin pie",
+        "complexity": "hard",
+        "required_chest_items": {"egg": 1},
+    },
+
+    # Sweet Foods
+    "golden_apple": {
+        "source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"apple": 1, "gold_ingot": 8},
+        "recipe": [
+            "Step 1: Get 1 apple and 8 gold ingots from your inventory or other bots.",
+            "Step 2: Go to the crafting table and surround the apple with the gold ingots to create a golden apple."
+        ],
+        "description": "A magical golden apple",
+        "complexity": "hard",
+        "required_chest_items": {"gold_ingot": 8, "apple": 1},
+    },
+
+    # Special Foods
+    "golden_carrot": {
+        "source": CRAFTED, "station": CRAFTING_TABLE, "ingredients": {"carrot": 1, "gold_nugget": 8},
+        "recipe": [
+            "Step 1: Go to the farm and collect 1 carrot.",
+            "Step 2: Go to the chest and collect gold ingots and convert them to gold nuggets.",
+            "Step 3: Go to the crafting table and surround the carrot with gold nuggets to create a golden carrot."
+        ],
+        "description": "A magical golden carrot",
+        "complexity": "hard",
+        "required_chest_items": {"gold_ingot": 8},
+    },
+}
+
+
+class RecipeGraph:
+    """
+    Recipe DAG with precomputed topological order and per-item transitive closures.
+    expand() aggregates requirements over the whole graph, so shared intermediates
+    (sugar, coal for several smelts, ...) are only counted once.
+    """
+
+    def __init__(self, items: Dict[str, Dict[str, Any]]):
+        self.items = items
+        for item, node in items.items():
+            for ingredient in node.get("ingredients", {}):
+                if ingredient not in items:
+                    raise ValueError(f"{item} uses unknown ingredient {ingredient}")
+        self.order = self._topological_order()
+        self.rank = {item: i for i, item in enumerate(self.order)}
+        self.closures = {item: self.expand({item: 1}) for item in self.order}
+
+    def _topological_order(self) -> List[str]:
+        """Items ordered so that every product comes before its ingredients."""
+        order, state = [], {}
+
+        def visit(item):
+            if state.get(item) == "done":
+                return
+            if state.get(item) == "visiting":
+                raise ValueError(f"Recipe cycle through {item}")
+            state[item] = "visiting"
+            for ingredient in self.items[item].get("ingredients", {}):
+                visit(ingredient)
+            state[item] = "done"
+            order.append(item)
+
+        for item in self.items:
+            visit(item)
+        order.reverse()
+        return order
+
+    def targets(self) -> List[str]:
+        """Items that have recipe steps for the agents, i.e. valid task targets."""
+        return [item for item, node in self.items.items() if "recipe" in node]
+
+    def is_leaf(self, item) -> bool:
+        return not self.items[item].get("ingredients")
+
+    def expand(self, targets: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Expand target counts into the raw ingredients, intermediate products, station
+        uses and coal needed to make all of them.
+        """
+        demand = Counter(targets)
+        crafts = Counter()
+        for item in self.order:
+            if demand[item] <= 0 or self.is_leaf(item):
+                continue
+            node = self.items[item]
+            n = math.ceil(demand[item] / node.get("yield", 1))
+            crafts[item] = n
+            for ingredient, count in node["ingredients"].items():
+                demand[ingredient] += n * count
+        raw = Counter({item: count for item, count in demand.items() if count > 0 and self.is_leaf(item)})
+        smelts = sum(n for item, n in crafts.items() if self.items[item].get("station") == FURNACE)
+        if smelts:
+            raw["coal"] += math.ceil(smelts / SMELTS_PER_COAL)
+        stations = {self.items[item]["station"] for item in crafts}
+        return {
+            "raw": dict(raw),
+            "crafts": dict(crafts),
+            "smelts": smelts,
+            "stations": sorted(stations),
+            "sources": sorted({self.items[item]["source"] for item in raw}),
+        }
+
+    def required_chest_items(self, items: Iterable) -> Dict[str, int]:
+        """
+        Chest items to hand out for the given dishes (a list of names or a {name: count} dict):
+        the sum of each dish's declared required_chest_items, as the generators always did.
+        """
+        targets = items if isinstance(items, dict) else Counter(items)
+        chest = Counter()
+        for item, count in targets.items():
+            for chest_item, quantity in self.items[item].get("required_chest_items", {}).items():
+                chest[chest_item] += quantity * count
+        return dict(chest)
+
+    def recipe(self, item) -> List[str]:
+        return self.items[item]["recipe"]
+
+
+RECIPE_GRAPH = RecipeGraph(ITEMS)
+
+# legacy view used by the task generators: recipe text plus per-dish chest requirements
+COOKING_ITEMS = {
+    item: {
+        "recipe": RECIPE_GRAPH.recipe(item),
+        "description": ITEMS[item]["description"],
+        "complexity": ITEMS[item]["complexity"],
+        "required_chest_items": RECIPE_GRAPH.required_chest_items([item]),
+    }
+    for item in RECIPE_GRAPH.targets()
+}
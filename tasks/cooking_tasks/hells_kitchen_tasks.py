@@ -4,222 +4,7 @@ from typing import Dict, List, Any, Tuple, Set
 from collections import Counter, defaultdict
 import itertools
 
-# Define your COOKING_ITEMS dictionary here
-# This is where you should put your complete COOKING_ITEMS dictionary
-COOKING_ITEMS = {
-# Cooked Meats
-"cooked_mutton": {
-    "recipe": [
-        "Step 1: Kill a sheep and pick up 1 mutton that is dropped.", 
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the mutton."
-    ],
-    "description": "Cooked mutton meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 8,
-    }
-},
-"cooked_beef": {
-    "recipe": [
-        "Step 1: Kill a cow and pick up 1 beef that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the beef."
-    ],
-    "description": "Cooked beef meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 8,
-    }
-},
-"cooked_porkchop": {
-    "recipe": [
-        "Step 1: Kill a pig and pick up 1 porkchop that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the porkchop."
-    ],
-    "description": "Cooked porkchop",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 8,
-    }
-},
-"cooked_chicken": {
-    "recipe": [
-        "Step 1: Kill a chicken and pick up 1 raw chicken that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the raw chicken."
-    ],
-    "description": "Cooked chicken meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 8,
-    }
-},
-"cooked_rabbit": {
-    "recipe": [
-        "Step 1: Kill a rabbit and pick up 1 raw rabbit that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 2: Go to furnace and use it to cook the raw rabbit."
-    ],
-    "description": "Cooked rabbit meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 8,
-    }
-},
-
-# Soups and Stews
-"beetroot_soup": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 6 beetroot.",
-        "Step 2: From your inventory or other agents get a bowl.",
-        "Step 3: Go to the crafting table and combine the 6 beetroot and 1 bowl to make beetroot soup."
-    ],
-    "description": "A hearty beetroot soup",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "bowl": 1,
-    }
-},
-"mushroom_stew": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 red mushroom and 1 brown mushroom.",
-        "Step 2: From your inventory or other agents get a bowl.",
-        "Step 3: Go to the crafting table and combine both the mushrooms and bowl to make mushroom stew."
-    ],
-    "description": "A warm mushroom stew",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "bowl": 1,
-    }
-},
-"rabbit_stew": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 carrot, 1 potato, and 1 brown mushroom (search for 'potatoes' (not 'potato').",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to the furnace and bake the potato.",
-        "Step 5: From your inventory or other agents get a bowl",
-        "Step 6: Kill a rabbit and pick up 1 raw rabbit that is dropped.",
-        "Step 7: Go to the furnace and cook the raw rabbit.",
-        "Step 8: Go to the crafting table and combine the cooked rabbit, baked potato, carrot, brown mushroom, and bowl to make rabbit stew."
-    ],
-    "description": "A hearty rabbit stew",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "bowl": 1,
-    }
-},
-"suspicious_stew": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 red mushroom, 1 brown mushroom.",
-        "Step 2: From your inventory or other agents get a bowl and 1 dandelion",
-        "Step 3: Go to the crafting table and combine the mushrooms, dandelion, and bowl to make suspicious stew."
-    ],
-    "description": "A mysterious stew with special effects",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "bowl": 1,
-        "dandelion": 1,
-    }
-},
-
-# Baked Goods
-"baked_potato": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 potato (search for 'potatoes' (not 'potato')).",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 2: Go to the furnace and bake the potato."
-    ],
-    "description": "A simple baked potato",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 8,
-    }
-},
-"bread": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 3 wheat.",
-        "Step 2: Go to the crafting table and use the wheat to craft bread."
-    ],
-    "description": "Fresh bread",
-    "complexity": "medium", 
-},
-"cake": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 3 wheat, 2 sugar cane.",
-        "Step 2: From your inventory or other agents get 3 milk buckets (already filled with milk).",
-        "Step 3: Get an egg from your inventory or other agents.",
-        "Step 4: Go to the crafting table and craft the sugarcane into sugar.",
-        "Step 5: Go to the crafting table and combine all ingredients (3 wheat, 2 sugar, 1 egg, and milk bucket) to make a cake."
-    ],
-    "description": "A delicious cake",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "milk_bucket": 3,
-        "egg": 1,
-    }
-},
-"cookie": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 2 wheat.",
-        "Step 2: Get 1 cocoa bean from your inventory or other agents.",
-        "Step 3: Go to the crafting table and combine the wheat and cocoa bean to craft a cookie."
-    ],
-    "description": "Sweet cookies",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "cocoa_beans": 1,
-    }
-},
-"pumpkin_pie": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 pumpkin and 1 sugar cane.",
-        "Step 2: Get 1 egg from your inventory or other bots",
-        "Step 3: Go to the crafting table and craft the sugar cane into sugar.",
-        "Step 4: Go to the crafting table and combine the pumpkin, egg, and sugar to make a pumpkin pie."
-    ],
-    "description": "Delicious pumpkin pie",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "egg": 1,
-    }
-},
-
-# Sweet Foods
-"golden_apple": {
-    "recipe": [
-        "Step 1: Get 1 apple and 8 gold ingots from your inventory or other bots.",
-        "Step 2: Go to the crafting table and surround the apple with the gold ingots to create a golden apple."
-    ],
-    "description": "A magical golden apple",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "gold_ingots": 8,
-        "apple": 1
-    }
-},
-
-# Special Foods
-"golden_carrot": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 carrot.",
-        "Step 2: Go to the chest and collect gold ingots and convert them to gold nuggets.",
-        "Step 3: Go to the crafting table and surround the carrot with gold nuggets to create a golden carrot."
-    ],
-    "description": "A magical golden carrot",
-    "complexity": "hard", 
-    "required_chest_items": ["gold_ingots"]
-},
-
-}
+from cooking_recipes import COOKING_ITEMS, RECIPE_GRAPH
 
 chest_items = {
     "milk_bucket": 3,
@@ -341,7 +126,7 @@ def generate_hells_kitchen_task(selected_items) -> Dict[str, Any]:
     # Get recipes for both items
     recipes = {}
     for item in selected_items:
-        recipes[item] = COOKING_ITEMS[item]["recipe"]
+        recipes[item] = RECIPE_GRAPH.recipe(item)
 
     # Create different goal strings for each agent
     goals = {}
@@ -456,7 +241,7 @@ def generate_maximum_hells_kitchen_tasks(
         Tuple of (train_tasks, test_tasks)
     """
     # Get all available cooking items
-    all_items = list(COOKING_ITEMS.keys())
+    all_items = RECIPE_GRAPH.targets()
     
     # Fixed test items as specified in your original code
     hk_test_items = {"cooked_beef", "baked_potato", "cake", "golden_apple", "rabbit_stew", "bread"}
@@ -0,0 +1,73 @@
+"""
+Split the chest items a cooking task needs across agents.
+
+Agent loads live in a min-heap, so placing an item costs O(log agents) instead of
+re-summing every inventory. Items with more units than agents are spread evenly; the
+leftover units and single items go to the currently least-loaded agents. Splits that
+cannot make collaboration necessary are rejected up front rather than after the task
+has been written.
+"""
+import heapq
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+def partition_inventory(inventory: Dict[str, int],
+                        num_agents: int,
+                        require_all_agents: bool = True,
+                        require_collaboration: bool = True) -> Optional[Dict[int, Dict[str, int]]]:
+    """
+    Partition inventory ({item: count}) across num_agents agents.
+
+    Args:
+        inventory: Items the task needs, e.g. RECIPE_GRAPH.required_chest_items(targets).
+        num_agents: Number of agents (and humans) that receive an inventory.
+        require_all_agents: Every agent must hold at least one essential item.
+        require_collaboration: No single agent may hold everything the task needs.
+
+    Returns:
+        {agent_index: {item: count}}, or None if the constraints cannot be met.
+    """
+    total_units = sum(inventory.values())
+    if require_all_agents and total_units < num_agents:
+        return None
+    if require_collaboration and (num_agents < 2 or total_units < 2):
+        return None
+
+    initial_inventory = {i: {} for i in range(num_agents)}
+    heap = [(0, i) for i in range(num_agents)]
+
+    for item, count in sorted(inventory.items(), key=lambda kv: (-kv[1], kv[0])):
+        if count <= 0:
+            continue
+        div, rem = divmod(count, num_agents)
+        if div > 0:
+            for agent in range(num_agents):
+                initial_inventory[agent][item] = div
+        for _ in range(rem):
+            load, agent = heapq.heappop(heap)
+            initial_inventory[agent][item] = initial_inventory[agent].get(item, 0) + 1
+            heapq.heappush(heap, (load + 1, agent))
+
+    if check_partition(initial_inventory, inventory, require_all_agents, require_collaboration):
+        return None
+    return initial_inventory
+
+
+def check_partition(initial_inventory: Dict, requirements: Dict[str, int],
+                    require_all_agents: bool = True, require_collaboration: bool = True) -> List[str]:
+    """Return the problems with a partition given the task's required items (empty if valid)."""
+    problems = []
+    combined = Counter()
+    for agent_inventory in initial_inventory.values():
+        combined.update(agent_inventory)
+    for item, count in requirements.items():
+        if combined[item] < count:
+            problems.append(f"agents hold {combined[item]} {item}, task needs {count}")
+    for agent, agent_inventory in initial_inventory.items():
+        held = {item: n for item, n in agent_inventory.items() if n > 0 and item in requirements}
+        if require_all_agents and not held:
+            problems.append(f"agent {agent} holds no required item")
+        if require_collaboration and requirements and all(held.get(item, 0) >= count for item, count in requirements.items()):
+            problems.append(f"agent {agent} can finish the task alone")
+    return problems
@@ -3,227 +3,10 @@ import json
 from typing import Dict, List, Any, Tuple, Set
 from collections import Counter, defaultdict
 import os
-import numpy as np
 import itertools
 
-# Define your COOKING_ITEMS dictionary here
-# This is where you should put your complete COOKING_ITEMS dictionary
-COOKING_ITEMS = {
-# Cooked Meats
-"cooked_mutton": {
-    "recipe": [
-        "Step 1: Kill a sheep and pick up 1 mutton that is dropped.", 
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the mutton."
-    ],
-    "description": "Cooked mutton meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 1,
-    }
-},
-"cooked_beef": {
-    "recipe": [
-        "Step 1: Kill a cow and pick up 1 beef that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the beef."
-    ],
-    "description": "Cooked beef meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 1,
-    }
-},
-"cooked_porkchop": {
-    "recipe": [
-        "Step 1: Kill a pig and pick up 1 porkchop that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the porkchop."
-    ],
-    "description": "Cooked porkchop",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 1,
-    }
-},
-"cooked_chicken": {
-    "recipe": [
-        "Step 1: Kill a chicken and pick up 1 raw chicken that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to furnace and use it to cook the raw chicken."
-    ],
-    "description": "Cooked chicken meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 1,
-    }
-},
-"cooked_rabbit": {
-    "recipe": [
-        "Step 1: Kill a rabbit and pick up 1 raw rabbit that is dropped.",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 2: Go to furnace and use it to cook the raw rabbit."
-    ],
-    "description": "Cooked rabbit meat",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 1,
-    }
-},
-
-# Soups and Stews
-"beetroot_soup": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 6 beetroot.",
-        "Step 2: From your inventory or other agents get a bowl.",
-        "Step 3: Go to the crafting table and combine the 6 beetroot and 1 bowl to make beetroot soup."
-    ],
-    "description": "A hearty beetroot soup",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "bowl": 1,
-    }
-},
-"mushroom_stew": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 red mushroom and 1 brown mushroom.",
-        "Step 2: From your inventory or other agents get a bowl.",
-        "Step 3: Go to the crafting table and combine both the mushrooms and bowl to make mushroom stew."
-    ],
-    "description": "A warm mushroom stew",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "bowl": 1,
-    }
-},
-"rabbit_stew": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 carrot, 1 potato, and 1 brown mushroom (search for 'potatoes' (not 'potato').",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 4: Go to the furnace and bake the potato.",
-        "Step 5: From your inventory or other agents get a bowl",
-        "Step 6: Kill a rabbit and pick up 1 raw rabbit that is dropped.",
-        "Step 7: Go to the furnace and cook the raw rabbit.",
-        "Step 8: Go to the crafting table and combine the cooked rabbit, baked potato, carrot, brown mushroom, and bowl to make rabbit stew."
-    ],
-    "description": "A hearty rabbit stew",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "bowl": 1,
-    }
-},
-"suspicious_stew": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 red mushroom, 1 brown mushroom.",
-        "Step 2: From your inventory or other agents get a bowl and 1 dandelion",
-        "Step 3: Go to the crafting table and combine the mushrooms, dandelion, and bowl to make suspicious stew."
-    ],
-    "description": "A mysterious stew with special effects",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "bowl": 1,
-        "dandelion": 1,
-    }
-},
-
-# Baked Goods
-"baked_potato": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 potato (search for 'potatoes' (not 'potato')).",
-        "Step 2: Get coal from your inventory or other agents.",
-        "Step 3: Put coal in the furnace",
-        "Step 2: Go to the furnace and bake the potato."
-    ],
-    "description": "A simple baked potato",
-    "complexity": "easy", 
-    "required_chest_items": {
-        "coal": 1,
-    }
-},
-"bread": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 3 wheat.",
-        "Step 2: Go to the crafting table and use the wheat to craft bread."
-    ],
-    "description": "Fresh bread",
-    "complexity": "medium"
-},
-"cake": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 3 wheat, 2 sugar cane.",
-        "Step 2: From your inventory or other agents get 3 milk buckets (already filled with milk).",
-        "Step 3: Get an egg from your inventory or other agents.",
-        "Step 4: Go to the crafting table and craft the sugarcane into sugar.",
-        "Step 5: Go to the crafting table and combine all ingredients (3 wheat, 2 sugar, 1 egg, and milk bucket) to make a cake."
-    ],
-    "description": "A delicious cake",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "milk_bucket": 3,
-        "egg": 1,
-    }
-},
-"cookie": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 2 wheat.",
-        "Step 2: Get 1 cocoa bean from your inventory or other agents.",
-        "Step 3: Go to the crafting table and combine the wheat and cocoa bean to craft a cookie."
-    ],
-    "description": "Sweet cookies",
-    "complexity": "medium", 
-    "required_chest_items": {
-        "cocoa_beans": 1,
-    }
-},
-"pumpkin_pie": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 pumpkin and 1 sugar cane.",
-        "Step 2: Get 1 egg from your inventory or other bots",
-        "Step 3: Go to the crafting table and craft the sugar cane into sugar.",
-        "Step 4: Go to the crafting table and combine the pumpkin, egg, and sugar to make a pumpkin pie."
-    ],
-    "description": "Delicious pumpkin pie",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "egg": 1,
-    }
-},
-
-# Sweet Foods
-"golden_apple": {
-    "recipe": [
-        "Step 1: Get 1 apple and 8 gold ingots from your inventory or other bots.",
-        "Step 2: Go to the crafting table and surround the apple with the gold ingots to create a golden apple."
-    ],
-    "description": "A magical golden apple",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "gold_ingot": 8,
-        "apple": 1
-    }
-},
-
-# Special Foods
-"golden_carrot": {
-    "recipe": [
-        "Step 1: Go to the farm and collect 1 carrot.",
-        "Step 2: Go to the chest and collect gold ingots and convert them to gold nuggets.",
-        "Step 3: Go to the crafting table and surround the carrot with gold nuggets to create a golden carrot."
-    ],
-    "description": "A magical golden carrot",
-    "complexity": "hard", 
-    "required_chest_items": {
-        "gold_ingot": 8,
-    }
-},
-
-}
+from cooking_recipes import COOKING_ITEMS, RECIPE_GRAPH
+from inventory_partitioner import partition_inventory
 
 chest_items = {
     "milk_bucket": 3,
@@ -246,47 +29,17 @@ chest_items = {
     "iron_ingot": 64,
 }
 
-def make_initial_inventory(items, num_agents):
+def make_initial_inventory(items, num_agents, require_collaboration=False):
     """
     Evenly split inventory between the agents for a given set of items and number of agents
     """
-    inventory = {}
-    for item in items:
-        if item in COOKING_ITEMS:
-            cooking_info = COOKING_ITEMS[item]
-            for chest_item, quantity in cooking_info.get("required_chest_items", {}).items():
-                inventory[chest_item] = inventory.get(chest_item, 0) + quantity
-        else:
-            print(f"item {item} not found in COOKING_ITEMS.")
-    initial_inventory = {}
-    for i in range(num_agents):
-        initial_inventory[i] = {}
-    items_lst = list(inventory.keys())
-    for i in range(len(items_lst)):
-        item_counts = count_items_in_inventory(initial_inventory)
-        agent_num = np.argmin(item_counts)
-        if inventory[items_lst[i]] == 1:
-            initial_inventory[agent_num][items_lst[i]] = 1
-        elif inventory[items_lst[i]] > 1:
-            div = inventory[items_lst[i]] // num_agents
-            rem = inventory[items_lst[i]] % num_agents
-            for j in range(num_agents):
-                initial_inventory[j][items_lst[i]] = div
-            j = 0
-            while j < rem:
-                initial_inventory[j][items_lst[i]] += 1
-                j += 1
-    return initial_inventory
-
-def count_items_in_inventory(inventory):
-    item_counts = []
-    for key in inventory.keys():
-        agent_inventory = inventory[key]
-        total_items = 0
-        for item in agent_inventory.keys():
-            total_items += agent_inventory[item]
-        item_counts.append(total_items)
-    return item_counts
+    unknown = [item for item in items if item not in COOKING_ITEMS]
+    for item in unknown:
+        print(f"item {item} not found in COOKING_ITEMS.")
+    inventory = RECIPE_GRAPH.required_chest_items([item for item in items if item not in unknown])
+    return partition_inventory(inventory, num_agents,
+                               require_all_agents=require_collaboration,
+                               require_collaboration=require_collaboration)
 
 def make_all_possible_tasks(items: List[str], num_items:int, num_agents: int, output_file) -> List[Dict[str, Any]]:
     combinations = itertools.combinations(items, num_items)
@@ -303,7 +56,7 @@ def make_all_possible_tasks(items: List[str], num_items:int, num_agents: int, ou
             task["target"][item] = 1
         for item in combination:
             if item in COOKING_ITEMS:
-                task["recipes"][item] = COOKING_ITEMS[item]["recipe"]
+                task["recipes"][item] = RECIPE_GRAPH.recipe(item)
             else:
                 print(f"item {item} not found in COOKING_ITEMS.")
         initial_inventory = make_initial_inventory(combination, num_agents)
@@ -316,7 +69,7 @@ def make_all_possible_tasks(items: List[str], num_items:int, num_agents: int, ou
             conversation_str += item + ", "
         recipe_goal_str = goal_str + "The recipes are as follows:\n"
         for item in combination:
-            recipe_goal_str += f"Recipe for {item}:\n{COOKING_ITEMS[item]['recipe']}\n"
+            recipe_goal_str += f"Recipe for {item}:\n{RECIPE_GRAPH.recipe(item)}\n"
         for i in range(num_agents):
             task["goal"][i] = recipe_goal_str
         task["conversation"] = conversation_str
@@ -345,47 +98,21 @@ def reconfigure_tasks(task_path, new_task_path, num_agents=None, hells_kitchen=F
         if task["type"] == "cooking":
             items = task["recipes"].keys()
             new_recipes = {}
-            inventory = {}
             for item in items:
                 if item in COOKING_ITEMS:
-                    cooking_info = COOKING_ITEMS[item]
-                    new_recipes[item] = cooking_info["recipe"]
-                    for chest_item, quantity in cooking_info.get("required_chest_items", {}).items():
-                        inventory[chest_item] = inventory.get(chest_item, 0) + quantity
+                    new_recipes[item] = RECIPE_GRAPH.recipe(item)
                 else:
                     print(f"item {item} not found in COOKING_ITEMS.")
+            inventory = RECIPE_GRAPH.required_chest_items(list(new_recipes))
             task["recipes"] = new_recipes
             # assign inventory to the agents
             if num_agents is None:
                 num_agents = task.get("agent_count", 0) + task.get("human_count", 0)
             else:
                 task["agent_count"] = num_agents
-            initial_inventory = {}
-            for i in range(num_agents):
-                initial_inventory[i] = {}
-            items_lst = list(inventory.keys())
-            for i in range(len(items_lst)):
-                item_counts = count_items_in_inventory(initial_inventory)
-                agent_num = np.argmin(item_counts)
-                if inventory[items_lst[i]] == 1:
-                    initial_inventory[agent_num][items_lst[i]] = 1
-                elif inventory[items_lst[i]] > 1:
-                    div = inventory[items_lst[i]] // num_agents
-                    rem = inventory[items_lst[i]] % num_agents
-                    for j in range(num_agents):
-                        initial_inventory[j][items_lst[i]] = div
-                    j = 0
-                    while j < rem:
-                        initial_inventory[j][items_lst[i]] += 1
-                        j += 1
-                # initial_inventory[agent_num][items_lst[i]] = inventory[items_lst[i]]
-            item_counts = count_items_in_inventory(initial_inventory)
-            required_collab = True
-            for i in range(len(item_counts)):
-                if item_counts[i] == 0:
-                    # don't add the task if collaboration isn't required
-                    required_collab = False
-            if not required_collab:
+            initial_inventory = partition_inventory(inventory, num_agents)
+            if initial_inventory is None:
+                # don't add the task if collaboration isn't required
                 print(f"task {task_id} doesn't require collaboration.")
                 continue
             task["initial_inventory"] = initial_inventory
@@ -440,7 +167,8 @@ test_items = ["bread", "golden_apple", "rabbit_stew", "cake", "baked_potato", "c
 # block_recipe_in_tasks("mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent.json", "mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_block_recipe.json", 2)
 # make_all_possible_tasks(test_items, 2, 2, "mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_blocked_action_remaining.json")
 
-reconfigure_tasks("mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_hells_kitchen_full.json", "mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_hells_kitchen_full_inventory.json", 2)
+if __name__ == "__main__":
+    reconfigure_tasks("mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_hells_kitchen_full.json", "mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_hells_kitchen_full_inventory.json", 2)
 
 # reconfigure_tasks("mindcraft/tasks/cooking_tasks/test_tasks/test_tasks.json", "mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_block_recipe.json", 2)
 # reconfigure_tasks("mindcraft/tasks/cooking_tasks/test_tasks/hells_kitchen_test_tasks.json", "mindcraft/tasks/cooking_tasks/require_collab_test_2_items/2_agent_hells_kitchen.json", 2, True)
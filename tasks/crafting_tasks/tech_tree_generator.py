@@ -0,0 +1,274 @@
+"""
+Offline generator for crafting (techtree) tasks.
+
+Recipes are read straight from the minecraft-data package files (node_modules/minecraft-data)
+and expanded the same way getDetailedCraftingPlan does in src/utils/mcdata.js: the first
+recipe after preferring common ingredients, base items are never expanded, and leftovers
+from batch crafts are reused. Recipe lookups, tree depths and expansions are memoized, so
+generating every craftable item at depth <= 2 takes seconds.
+
+For every target and depth the initial inventory holds the ingredients `depth` crafting
+levels below the target, split across the agents, with a crafting table for agent 0 when
+any recipe on the way needs one. Each inventory becomes a full_plan, partial_plan and
+no_plan task (agents blocked from !getCraftingPlan), optionally with missing-item
+variants, in the schema of filtered_train_tasks.json.
+
+Example usage:
+python tasks/crafting_tasks/tech_tree_generator.py --output tasks/crafting_tasks/generated_tasks.json --depths 0 1 2
+"""
+import argparse
+import json
+import os
+import random
+from collections import Counter
+from functools import lru_cache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DATA_DIR = os.path.join(REPO_ROOT, "node_modules", "minecraft-data", "minecraft-data", "data")
+DEFAULT_VERSION = "1.21.1"
+
+PLANS = ("full_plan", "partial_plan", "no_plan")
+PLAN_ACTION = "!getCraftingPlan"
+# same preference and base items as getItemCraftingRecipes / initializeLoopingItems in mcdata.js
+COMMON_ITEMS = ("oak_planks", "oak_log", "coal", "cobblestone")
+LOOPING_ITEMS = frozenset([
+    "coal", "wheat", "bone_meal", "diamond", "emerald", "raw_iron", "raw_gold", "redstone",
+    "blue_wool", "packed_mud", "raw_copper", "iron_ingot", "dried_kelp", "gold_ingot",
+    "slime_ball", "black_wool", "quartz_slab", "copper_ingot", "lapis_lazuli", "honey_bottle",
+    "rib_armor_trim_smithing_template", "eye_armor_trim_smithing_template",
+    "vex_armor_trim_smithing_template", "dune_armor_trim_smithing_template",
+    "host_armor_trim_smithing_template", "tide_armor_trim_smithing_template",
+    "wild_armor_trim_smithing_template", "ward_armor_trim_smithing_template",
+    "coast_armor_trim_smithing_template", "spire_armor_trim_smithing_template",
+    "snout_armor_trim_smithing_template", "shaper_armor_trim_smithing_template",
+    "netherite_upgrade_smithing_template", "raiser_armor_trim_smithing_template",
+    "sentry_armor_trim_smithing_template", "silence_armor_trim_smithing_template",
+    "wayfinder_armor_trim_smithing_template",
+])
+
+
+def load_minecraft_data(version=DEFAULT_VERSION, data_dir=DEFAULT_DATA_DIR):
+    """Return (items, recipes) for a Java edition version from a minecraft-data checkout."""
+    with open(os.path.join(data_dir, "dataPaths.json"), "r") as f:
+        data_paths = json.load(f)["pc"]
+    if version not in data_paths:
+        raise ValueError(f"minecraft-data in {data_dir} has no data for version {version}")
+    paths = data_paths[version]
+    with open(os.path.join(data_dir, paths["items"], "items.json"), "r") as f:
+        items = json.load(f)
+    with open(os.path.join(data_dir, paths["recipes"], "recipes.json"), "r") as f:
+        recipes = json.load(f)
+    return items, recipes
+
+
+class RecipeBook:
+    """Memoized crafting recipe lookups and expansions for one minecraft-data version."""
+
+    def __init__(self, items, recipes):
+        self.item_names = {item["id"]: item["name"] for item in items}
+        self.item_ids = {item["name"]: item["id"] for item in items}
+        self.raw_recipes = recipes
+        # lru_cache on methods would be shared across instances, so cache per book
+        self.recipes = lru_cache(maxsize=None)(self._recipes)
+        self.tree_depth = lru_cache(maxsize=None)(self._tree_depth)
+        self.expand = lru_cache(maxsize=None)(self._expand)
+
+    @classmethod
+    def load(cls, version=DEFAULT_VERSION, data_dir=DEFAULT_DATA_DIR):
+        return cls(*load_minecraft_data(version, data_dir))
+
+    def _ingredient_name(self, ingredient):
+        if isinstance(ingredient, dict):
+            ingredient = ingredient.get("id")
+        if ingredient is None or ingredient < 0:
+            return None
+        return self.item_names.get(ingredient)
+
+    def _recipes(self, item):
+        """Return [(ingredients {name: count}, crafted count, needs a crafting table)], preferred first."""
+        item_id = self.item_ids.get(item)
+        raw = self.raw_recipes.get(str(item_id)) if item_id is not None else None
+        if not raw:
+            return ()
+        recipes = []
+        for r in raw:
+            if r.get("ingredients"):
+                slots = r["ingredients"]
+                needs_table = len(slots) > 4
+            else:
+                shape = r.get("inShape") or []
+                slots = [slot for row in shape for slot in row]
+                needs_table = len(shape) > 2 or any(len(row) > 2 for row in shape)
+            ingredients = Counter(name for name in map(self._ingredient_name, slots) if name is not None)
+            recipes.append((dict(ingredients), r["result"]["count"], needs_table))
+        recipes.sort(key=lambda r: -sum(count for name, count in r[0].items() if name in COMMON_ITEMS))
+        return tuple(recipes)
+
+    def recipe(self, item):
+        recipes = self.recipes(item)
+        return recipes[0] if recipes else None
+
+    def is_base(self, item):
+        return item in LOOPING_ITEMS or not self.recipes(item)
+
+    def craftable_items(self):
+        return sorted(name for name in self.item_ids if not self.is_base(name))
+
+    def _tree_depth(self, item, visiting=frozenset()):
+        """Number of crafting levels between item and base items (0 for base items)."""
+        if self.is_base(item) or item in visiting:
+            return 0
+        ingredients = self.recipe(item)[0]
+        visiting = visiting | {item}
+        return 1 + max((self.tree_depth(name, visiting) for name in ingredients), default=0)
+
+    def _expand(self, item, count=1, depth=0):
+        """
+        Return (ingredients, requires_crafting_table) to craft count of item when the
+        inventory holds the items `depth` crafting levels below it. Ingredients are a
+        sorted tuple of (name, count); base items are kept as they are.
+        """
+        required = Counter()
+        leftovers = Counter()
+        needs_table = self._craft(item, count, depth, required, leftovers, frozenset())
+        return tuple(sorted(required.items())), needs_table
+
+    def _craft(self, item, count, depth, required, leftovers, visiting):
+        from_leftovers = min(leftovers[item], count)
+        leftovers[item] -= from_leftovers
+        count -= from_leftovers
+        if count <= 0:
+            return False
+        if depth < 0 or self.is_base(item) or item in visiting:
+            required[item] += count
+            return False
+        ingredients, crafted_count, needs_table = self.recipe(item)
+        batches = -(-count // crafted_count)
+        leftovers[item] += batches * crafted_count - count
+        for name, per_batch in ingredients.items():
+            needs_table |= self._craft(name, per_batch * batches, depth - 1, required, leftovers, visiting | {item})
+        return needs_table
+
+
+def split_inventory(inventory, num_agents):
+    """Split {item: count} across agents as evenly as possible; lower agents get the remainder."""
+    initial_inventory = {str(i): {} for i in range(num_agents)}
+    for item, count in inventory.items():
+        div, rem = divmod(count, num_agents)
+        for i in range(num_agents):
+            share = div + (1 if i < rem else 0)
+            if share > 0:
+                initial_inventory[str(i)][item] = share
+    return initial_inventory
+
+
+def blocked_actions(plan, num_agents):
+    """full_plan blocks nobody, no_plan blocks every agent, partial_plan all but the last agent."""
+    blocked = {str(i): [] for i in range(num_agents)}
+    if plan == "no_plan":
+        for i in range(num_agents):
+            blocked[str(i)] = [PLAN_ACTION]
+    elif plan == "partial_plan":
+        for i in range(num_agents - 1):
+            blocked[str(i)] = [PLAN_ACTION]
+    return blocked
+
+
+def task_name(target, plan, depth, num_agents, requires_crafting_table, missing_item=None):
+    name = f"multiagent_crafting_{target}"
+    if requires_crafting_table:
+        name += "_requires_ctable"
+    name += f"_{plan}"
+    if missing_item:
+        name += f"_missing_{missing_item}"
+    name += f"__depth_{depth}"
+    if num_agents != 2:
+        name += f"_num_agents_{num_agents}"
+    return name
+
+
+def make_task(target, inventory, plan, depth, max_depth, num_agents, requires_crafting_table,
+              missing_items=(), number_of_target=1, timeout=300):
+    initial_inventory = split_inventory(inventory, num_agents)
+    if requires_crafting_table:
+        initial_inventory["0"]["crafting_table"] = 1
+    return {
+        "goal": f"Collaborate with other agents to craft an {target}",
+        "conversation": f"Let's work together to craft an {target}.",
+        "initial_inventory": initial_inventory,
+        "agent_count": num_agents,
+        "target": target,
+        "number_of_target": number_of_target,
+        "type": "techtree",
+        "max_depth": max_depth,
+        "depth": depth,
+        "timeout": timeout,
+        "blocked_actions": blocked_actions(plan, num_agents),
+        "missing_items": list(missing_items),
+        "requires_crafting_table": requires_crafting_table,
+    }
+
+
+def generate_tasks(book, targets=None, depths=(0, 1, 2), num_agents=2, plans=PLANS,
+                   missing_items=False, number_of_target=1, timeout=300):
+    """
+    Generate {task_name: task} for every target and depth. A depth is skipped when it
+    would not expand the inventory any further than the previous depth.
+    """
+    tasks = {}
+    for target in targets or book.craftable_items():
+        if book.is_base(target):
+            continue
+        max_depth = book.tree_depth(target)
+        previous = None
+        for depth in sorted(depths):
+            ingredients, requires_table = book.expand(target, number_of_target, depth)
+            if ingredients == previous:
+                break
+            previous = ingredients
+            inventory = dict(ingredients)
+            if sum(inventory.values()) < num_agents:
+                continue
+            variants = [(inventory, ())]
+            if missing_items:
+                for item in inventory:
+                    variants.append(({k: v for k, v in inventory.items() if k != item}, (item,)))
+            for variant_inventory, missing in variants:
+                for plan in plans:
+                    if plan == "partial_plan" and num_agents == 1:
+                        continue
+                    name = task_name(target, plan, depth, num_agents, requires_table, missing[0] if missing else None)
+                    tasks[name] = make_task(target, variant_inventory, plan, depth, max_depth, num_agents,
+                                            requires_table, missing, number_of_target, timeout)
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate crafting tech-tree tasks from minecraft-data recipes")
+    parser.add_argument("--output", required=True, help="Output task file")
+    parser.add_argument("--version", default=DEFAULT_VERSION, help="Minecraft version to read recipes for")
+    parser.add_argument("--data_dir", default=DEFAULT_DATA_DIR, help="minecraft-data data directory (with dataPaths.json)")
+    parser.add_argument("--targets", nargs="*", default=None, help="Target items (default: every craftable item)")
+    parser.add_argument("--depths", nargs="+", type=int, default=[0, 1, 2])
+    parser.add_argument("--num_agents", type=int, default=2)
+    parser.add_argument("--plans", nargs="+", choices=PLANS, default=list(PLANS))
+    parser.add_argument("--missing_items", action="store_true", help="Also emit one task per missing ingredient")
+    parser.add_argument("--timeout", type=int, default=300)
+    parser.add_argument("--max_tasks", type=int, default=None, help="Randomly keep at most this many tasks")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    book = RecipeBook.load(args.version, args.data_dir)
+    tasks = generate_tasks(book, args.targets, args.depths, args.num_agents, args.plans,
+                           args.missing_items, timeout=args.timeout)
+    if args.max_tasks is not None and len(tasks) > args.max_tasks:
+        keep = random.Random(args.seed).sample(sorted(tasks), args.max_tasks)
+        tasks = {name: tasks[name] for name in sorted(keep)}
+
+    with open(args.output, "w") as f:
+        json.dump(tasks, f, indent=4)
+    print(f"Saved {len(tasks)} tasks to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
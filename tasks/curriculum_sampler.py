@@ -0,0 +1,219 @@
+"""
+Difficulty-calibrated curriculum sampler.
+
+Instead of hand-weighted difficulty scores, tasks are described by a few numeric features
+(agents, inventory size, crafting depth, construction size, recipe steps, ...) and a
+logistic regression fitted on the outcomes of past experiments predicts each task's
+success probability. Train and eval sets are then sampled from chosen probability bands
+with a fixed seed, so data collection can focus on tasks near the frontier of what the
+agents can do rather than trivially easy or impossible ones.
+
+Past outcomes are read from experiment folders as written by launch_parallel_experiments:
+experiments/<exp>/<task_id>/*.json, scored like check_folder_results.
+
+Example usage:
+python tasks/curriculum_sampler.py --tasks tasks/crafting_tasks/filtered_train_tasks.json \\
+    --experiments experiments/crafting_* --band 0.2 0.8 200 --eval_size 50 --seed 0 \\
+    --output_train train_curriculum.json --output_eval eval_curriculum.json
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+
+import numpy as np
+
+from task_outcomes import collect_outcomes
+
+DIFFICULTY_PATTERN = re.compile(r'materials_(\d+)_rooms_(\d+)_window_(\d+)_carpet_(\d+)_variant_\d+')
+TASK_TYPES = ("techtree", "cooking", "construction")
+
+
+def task_features(task_id, task):
+    """Return {feature: value} for a task; features that do not apply are left out (treated as 0)."""
+    features = {}
+    task_type = task.get("type")
+    for t in TASK_TYPES:
+        features[f"type_{t}"] = float(task_type == t)
+    features["agent_count"] = task.get("agent_count", 1)
+    features["human_count"] = task.get("human_count", 0)
+    inventory = task.get("initial_inventory") or {}
+    items = [inv for inv in inventory.values() if isinstance(inv, dict)]
+    features["log_inventory_items"] = np.log1p(sum(sum(inv.values()) for inv in items))
+    features["distinct_inventory_items"] = len({item for inv in items for item in inv})
+    blocked = task.get("blocked_actions") or {}
+    if blocked:
+        features["blocked_plan_fraction"] = (sum("!getCraftingPlan" in actions for actions in blocked.values())
+                                             / len(blocked))
+
+    if task_type == "techtree":
+        features["depth"] = task.get("depth", 0)
+        features["max_depth"] = task.get("max_depth", 0)
+        features["missing_items"] = len(task.get("missing_items", []))
+        features["requires_crafting_table"] = float(bool(task.get("requires_crafting_table", task.get("requires_ctable"))))
+        features["number_of_target"] = task.get("number_of_target", 1)
+    elif task_type == "cooking":
+        recipes = task.get("recipes") or {}
+        steps = [len(s) for s in recipes.values()]
+        features["num_targets"] = len(task.get("target") or {})
+        features["total_recipe_steps"] = sum(steps)
+        features["max_recipe_steps"] = max(steps, default=0)
+        features["blocked_recipes"] = len(task.get("blocked_access_to_recipe") or [])
+    elif task_type == "construction":
+        match = DIFFICULTY_PATTERN.search(task_id)
+        if match:
+            for name, value in zip(("materials", "rooms", "windows", "carpets"), map(int, match.groups())):
+                features[name] = value
+        blueprint = task.get("blueprint")
+        if isinstance(blueprint, dict):
+            features["levels"] = len(blueprint.get("levels", []))
+            features["log_blocks"] = np.log1p(sum((blueprint.get("materials") or {}).values()))
+    return features
+
+
+def feature_matrix(task_features_list, feature_names=None):
+    """Stack feature dicts into an array; returns (X, feature_names)."""
+    if feature_names is None:
+        feature_names = sorted({name for features in task_features_list for name in features})
+    index = {name: i for i, name in enumerate(feature_names)}
+    X = np.zeros((len(task_features_list), len(feature_names)))
+    for row, features in enumerate(task_features_list):
+        for name, value in features.items():
+            if name in index:
+                X[row, index[name]] = value
+    return X, feature_names
+
+
+def success_rate(task, scores):
+    """Mean success in [0, 1]; construction scores are percentages of the blueprint, other tasks score 0 or 1."""
+    scale = 100.0 if task.get("type") == "construction" else 1.0
+    return float(np.clip(np.mean(scores) / scale, 0.0, 1.0))
+
+
+class DifficultyModel:
+    """L2-regularized logistic regression of success on standardized task features, fitted with Newton steps."""
+
+    def __init__(self, l2=1.0, iterations=25):
+        self.l2 = l2
+        self.iterations = iterations
+        self.feature_names = None
+        self.mean = None
+        self.scale = None
+        self.coef = None
+
+    def _design(self, X):
+        Z = (X - self.mean) / self.scale
+        return np.hstack([np.ones((len(Z), 1)), Z])
+
+    def fit(self, X, y, weights=None):
+        """Fit success rates y (in [0, 1]) with per-row weights (e.g. number of runs)."""
+        weights = np.ones(len(y)) if weights is None else np.asarray(weights, dtype=float)
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        A = self._design(X)
+        penalty = np.full(A.shape[1], self.l2)
+        penalty[0] = 0.0  # no penalty on the intercept
+        coef = np.zeros(A.shape[1])
+        for _ in range(self.iterations):
+            p = 1.0 / (1.0 + np.exp(-A @ coef))
+            gradient = A.T @ (weights * (p - y)) + penalty * coef
+            hessian = (A * (weights * p * (1 - p))[:, None]).T @ A + np.diag(penalty) + 1e-9 * np.eye(A.shape[1])
+            step = np.linalg.solve(hessian, gradient)
+            coef -= step
+            if np.abs(step).max() < 1e-6:
+                break
+        self.coef = coef
+        return self
+
+    def predict(self, X):
+        """Return predicted success probabilities."""
+        return 1.0 / (1.0 + np.exp(-self._design(X) @ self.coef))
+
+    def describe(self):
+        """Return (feature, coefficient) pairs, most difficulty-increasing first."""
+        pairs = zip(["intercept"] + list(self.feature_names or []), self.coef)
+        return sorted(pairs, key=lambda pair: pair[1])
+
+
+def fit_difficulty_model(tasks, outcomes, l2=1.0):
+    """Fit a DifficultyModel on the tasks that have outcomes; returns (model, success probability per task id)."""
+    task_ids = list(tasks)
+    X, feature_names = feature_matrix([task_features(task_id, tasks[task_id]) for task_id in task_ids])
+    observed = [i for i, task_id in enumerate(task_ids) if outcomes.get(task_id)]
+    if not observed:
+        raise ValueError("No past outcomes found for any of the tasks")
+    y = np.array([success_rate(tasks[task_ids[i]], outcomes[task_ids[i]]) for i in observed])
+    weights = np.array([len(outcomes[task_ids[i]]) for i in observed])
+    model = DifficultyModel(l2=l2).fit(X[observed], y, weights)
+    model.feature_names = feature_names
+    return model, dict(zip(task_ids, model.predict(X)))
+
+
+def sample_bands(probabilities, bands, seed=0, exclude=()):
+    """
+    Sample task ids per band. bands is a list of (low, high, count); a task is in a band
+    when low <= predicted success probability < high. Returns a sorted list of task ids.
+    """
+    rng = random.Random(seed)
+    taken = set(exclude)
+    for low, high, count in bands:
+        candidates = sorted(task_id for task_id, p in probabilities.items()
+                            if low <= p < high and task_id not in taken)
+        if len(candidates) < count:
+            print(f"Warning: only {len(candidates)} tasks with success probability in [{low}, {high}), wanted {count}")
+            chosen = candidates
+        else:
+            chosen = rng.sample(candidates, count)
+        taken.update(chosen)
+    return sorted(taken - set(exclude))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample tasks at target difficulty from past experiment results")
+    parser.add_argument("--tasks", nargs="+", required=True, help="Task files forming the pool")
+    parser.add_argument("--experiments", nargs="+", required=True, help="Experiment folders with past results")
+    parser.add_argument("--band", nargs=3, action="append", metavar=("LOW", "HIGH", "COUNT"),
+                        help="Success probability band and number of training tasks; may be repeated (default: 0.2 0.8 100)")
+    parser.add_argument("--eval_size", type=int, default=0, help="Number of eval tasks, sampled from the same bands first")
+    parser.add_argument("--l2", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output_train", default="curriculum_train_tasks.json")
+    parser.add_argument("--output_eval", default="curriculum_eval_tasks.json")
+    args = parser.parse_args()
+
+    tasks = {}
+    for task_path in args.tasks:
+        with open(task_path, "r") as f:
+            tasks.update(json.load(f))
+    experiment_dirs = [d for pattern in args.experiments for d in sorted(glob.glob(pattern))]
+    outcomes = collect_outcomes(experiment_dirs)
+    print(f"{len(tasks)} tasks, {sum(task_id in tasks for task_id in outcomes)} with past outcomes "
+          f"from {len(experiment_dirs)} experiment folders")
+
+    model, probabilities = fit_difficulty_model(tasks, outcomes, args.l2)
+    print("\nFeature coefficients (negative = harder):")
+    for name, coef in model.describe():
+        print(f"  {name}: {coef:+.3f}")
+
+    bands = [(float(low), float(high), int(count)) for low, high, count in (args.band or [(0.2, 0.8, 100)])]
+    eval_ids = []
+    if args.eval_size:
+        total = sum(count for _, _, count in bands)
+        eval_bands = [(low, high, round(args.eval_size * count / total)) for low, high, count in bands]
+        eval_ids = sample_bands(probabilities, eval_bands, seed=args.seed + 1)
+    train_ids = sample_bands(probabilities, bands, seed=args.seed, exclude=eval_ids)
+
+    for path, ids in ((args.output_train, train_ids), (args.output_eval, eval_ids)):
+        if not ids:
+            continue
+        with open(path, "w") as f:
+            json.dump({task_id: tasks[task_id] for task_id in ids}, f, indent=4)
+        mean_p = np.mean([probabilities[task_id] for task_id in ids])
+        print(f"Saved {len(ids)} tasks (mean predicted success {mean_p:.2f}) to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Write chat-format training records into token-length buckets.
+
+Records (from prompt_log_converter.py or dedup_training_data.py) are measured with a
+pluggable local tokenizer, assigned to the smallest length bucket that fits them and
+written into per-bucket JSONL shards of a fixed number of examples. index.npy holds one
+(shard, offset, length, tokens) row per example and index.json the bucket and shard
+layout, so DatasetIndex can read any example without scanning the shards. With --pack_to,
+short examples are packed together into sequences of up to that many tokens.
+
+Tokenizers:
+    whitespace          words and punctuation, no dependencies (the default)
+    tiktoken:<encoding> e.g. tiktoken:cl100k_base (needs tiktoken)
+    hf:<name or path>   a locally available Hugging Face tokenizer (needs transformers)
+
+Example usage:
+python tasks/dataset_writer.py training_data_dedup/*.jsonl.gz --output_dir dataset \\
+    --tokenizer hf:meta-llama/Meta-Llama-3-8B-Instruct --buckets 1024 2048 4096 8192 16384 --pack_to 4096
+"""
+import argparse
+import bisect
+import glob
+import json
+import os
+import re
+
+import numpy as np
+
+from record_io import iter_records
+
+DEFAULT_BUCKETS = (1024, 2048, 4096, 8192, 16384)
+# role markers and separators added by chat templates
+MESSAGE_OVERHEAD = 4
+INDEX_DTYPE = np.dtype([("shard", "<u4"), ("offset", "<u8"), ("length", "<u4"), ("tokens", "<u4")])
+WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def load_tokenizer(spec="whitespace"):
+    """Return a function str -> number of tokens for a tokenizer spec (see the module docstring)."""
+    kind, _, name = spec.partition(":")
+    if kind == "whitespace":
+        return lambda text: len(WORD_PATTERN.findall(text))
+    if kind == "tiktoken":
+        try:
+            import tiktoken
+        except ImportError:
+            raise ImportError("The tiktoken tokenizer needs `pip install tiktoken`")
+        encoding = tiktoken.get_encoding(name or "cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    if kind == "hf":
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImportError("Hugging Face tokenizers need `pip install transformers`")
+        tokenizer = AutoTokenizer.from_pretrained(name, local_files_only=True)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    raise ValueError(f"Unknown tokenizer {spec!r}; use whitespace, tiktoken:<encoding> or hf:<name>")
+
+
+def count_tokens(record, tokenize):
+    if "packed" in record:
+        return sum(count_tokens(r, tokenize) for r in record["packed"])
+    return sum(tokenize(str(m.get("content", ""))) + MESSAGE_OVERHEAD for m in record.get("messages", []))
+
+
+def bucket_name(limit):
+    return f"le_{limit}" if limit is not None else "overflow"
+
+
+class BucketedShardWriter:
+    """Per-bucket JSONL shards of shard_size examples, plus a random access index."""
+
+    def __init__(self, output_dir, buckets=DEFAULT_BUCKETS, shard_size=10000, keep_overflow=False):
+        self.output_dir = output_dir
+        self.buckets = sorted(buckets)
+        self.shard_size = shard_size
+        self.keep_overflow = keep_overflow
+        self.shards = []  # {"path", "bucket", "examples"}
+        self._open = {}  # bucket name -> (shard id, file)
+        self._index = []
+        self.dropped = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def bucket_for(self, tokens):
+        i = bisect.bisect_left(self.buckets, tokens)
+        return self.buckets[i] if i < len(self.buckets) else None
+
+    def write(self, record, tokens):
+        limit = self.bucket_for(tokens)
+        if limit is None and not self.keep_overflow:
+            self.dropped += 1
+            return
+        name = bucket_name(limit)
+        shard_id, f = self._open.get(name, (None, None))
+        if f is None or self.shards[shard_id]["examples"] >= self.shard_size:
+            if f is not None:
+                f.close()
+            shard_id = len(self.shards)
+            bucket_shards = sum(1 for s in self.shards if s["bucket"] == name)
+            path = os.path.join(name, f"{name}-{bucket_shards:05d}.jsonl")
+            os.makedirs(os.path.join(self.output_dir, name), exist_ok=True)
+            f = open(os.path.join(self.output_dir, path), "wb")
+            self.shards.append({"path": path, "bucket": name, "examples": 0})
+            self._open[name] = (shard_id, f)
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self._index.append((shard_id, f.tell(), len(line), tokens))
+        f.write(line)
+        self.shards[shard_id]["examples"] += 1
+
+    def close(self, metadata=None):
+        for _, f in self._open.values():
+            f.close()
+        self._open = {}
+        np.save(os.path.join(self.output_dir, "index.npy"), np.array(self._index, dtype=INDEX_DTYPE))
+        counts = {}
+        for shard in self.shards:
+            counts[shard["bucket"]] = counts.get(shard["bucket"], 0) + shard["examples"]
+        layout = {"buckets": self.buckets, "examples_per_bucket": counts, "shards": self.shards,
+                  "dropped": self.dropped, **(metadata or {})}
+        with open(os.path.join(self.output_dir, "index.json"), "w") as f:
+            json.dump(layout, f, indent=2)
+        return layout
+
+
+class Packer:
+    """Greedily packs short examples of one stream into records of at most capacity tokens."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.records = []
+        self.tokens = 0
+
+    def add(self, record, tokens):
+        """Add an example; returns a full pack (record, tokens) to write, or None."""
+        full = None
+        if self.records and self.tokens + tokens > self.capacity:
+            full = self.flush()
+        self.records.append(record)
+        self.tokens += tokens
+        return full
+
+    def flush(self):
+        if not self.records:
+            return None
+        pack = ({"packed": self.records, "task_ids": [r.get("task_id") for r in self.records]}, self.tokens)
+        self.records, self.tokens = [], 0
+        return pack
+
+
+def write_dataset(records, output_dir, tokenize, buckets=DEFAULT_BUCKETS, shard_size=10000,
+                  pack_to=None, keep_overflow=False, metadata=None):
+    """Bucket and shard records; examples of at most pack_to / 2 tokens are packed when pack_to is set."""
+    if pack_to and pack_to > max(buckets):
+        # every full pack would land past the largest bucket and be dropped
+        raise ValueError(f"pack_to ({pack_to}) is larger than the largest bucket ({max(buckets)})")
+    writer = BucketedShardWriter(output_dir, buckets, shard_size, keep_overflow)
+    packer = Packer(pack_to) if pack_to else None
+    for record in records:
+        tokens = count_tokens(record, tokenize)
+        if packer is not None and tokens <= pack_to // 2:
+            full = packer.add(record, tokens)
+            if full is not None:
+                writer.write(*full)
+        else:
+            writer.write(record, tokens)
+    if packer is not None:
+        last = packer.flush()
+        if last is not None:
+            writer.write(*last)
+    return writer.close({"pack_to": pack_to, **(metadata or {})})
+
+
+class DatasetIndex:
+    """Random access to a dataset written by write_dataset."""
+
+    def __init__(self, dataset_dir):
+        self.dataset_dir = dataset_dir
+        with open(os.path.join(dataset_dir, "index.json"), "r") as f:
+            self.layout = json.load(f)
+        self.index = np.load(os.path.join(dataset_dir, "index.npy"))
+        self.shard_buckets = np.array([s["bucket"] for s in self.layout["shards"]])
+
+    def __len__(self):
+        return len(self.index)
+
+    def bucket_indices(self, bucket):
+        """Example indices of one bucket, e.g. "le_4096"."""
+        return np.nonzero(self.shard_buckets[self.index["shard"]] == bucket)[0]
+
+    def __getitem__(self, i):
+        row = self.index[i]
+        path = os.path.join(self.dataset_dir, self.layout["shards"][row["shard"]]["path"])
+        with open(path, "rb") as f:
+            f.seek(int(row["offset"]))
+            return json.loads(f.read(int(row["length"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write training records into token-length bucketed shards")
+    parser.add_argument("inputs", nargs="+", help="JSONL or JSONL.gz record files (or glob patterns)")
+    parser.add_argument("--output_dir", required=True)
+    parser.add_argument("--tokenizer", default="whitespace", help="whitespace, tiktoken:<encoding> or hf:<name or path>")
+    parser.add_argument("--buckets", nargs="+", type=int, default=list(DEFAULT_BUCKETS), help="Bucket upper bounds in tokens")
+    parser.add_argument("--shard_size", type=int, default=10000, help="Examples per shard")
+    parser.add_argument("--pack_to", type=int, default=None, help="Pack examples of at most half this length into sequences of this length")
+    parser.add_argument("--keep_overflow", action="store_true", help="Keep examples longer than the largest bucket")
+    args = parser.parse_args()
+    if args.pack_to and args.pack_to > max(args.buckets):
+        parser.error(f"--pack_to ({args.pack_to}) must not exceed the largest bucket ({max(args.buckets)})")
+
+    paths = [p for pattern in args.inputs for p in (sorted(glob.glob(pattern)) or [pattern])]
+    layout = write_dataset(iter_records(paths), args.output_dir, load_tokenizer(args.tokenizer), args.buckets,
+                           args.shard_size, args.pack_to, args.keep_overflow, {"tokenizer": args.tokenizer})
+    for bucket, count in layout["examples_per_bucket"].items():
+        print(f"{bucket}: {count} examples")
+    print(f"{len(layout['shards'])} shards in {args.output_dir} ({layout['dropped']} examples over the largest bucket dropped)")
+
+
+if __name__ == "__main__":
+    main()
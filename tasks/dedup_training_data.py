@@ -0,0 +1,183 @@
+"""
+Near-duplicate removal for chat-format training data.
+
+Successful runs of the same task often produce near-identical prompt/response pairs
+(repeated !craftRecipe loops, the same recipe text in every turn), which over-weights easy
+tasks. This stage streams the shards written by prompt_log_converter.py and keeps a record
+only if no earlier record is similar in both its response and its recent conversation, as
+estimated by MinHash signatures over token shingles and LSH banding. Kept records can also
+be capped per task_id.
+
+LSH buckets live in fixed-size NumPy tables (one per band), so memory is set by
+--memory_mb rather than by the number of records: when the tables fill up, older entries
+are overwritten, which can only let a duplicate through, never drop a unique record.
+
+Example usage:
+python tasks/dedup_training_data.py training_data/*.jsonl.gz --output_dir training_data_dedup \\
+    --response_threshold 0.9 --conversation_threshold 0.8 --max_per_task 200
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from record_io import DEFAULT_SHARD_BYTES, ShardWriter, iter_records
+
+PRIME = (1 << 31) - 1
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+EMPTY_SLOT = -1
+
+
+def shingles(text, k=3):
+    """Return the crc32 hashes of the k-token shingles of a text (the whole text if it is shorter)."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= k:
+        return np.array([zlib.crc32(" ".join(tokens).encode("utf-8"))], dtype=np.uint64)
+    return np.fromiter((zlib.crc32(" ".join(tokens[i:i + k]).encode("utf-8")) for i in range(len(tokens) - k + 1)),
+                       dtype=np.uint64, count=len(tokens) - k + 1)
+
+
+def lsh_params(threshold, num_perm):
+    """Return (bands, rows) with bands * rows <= num_perm whose LSH threshold (1/b)^(1/r) is closest to threshold."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashLSH:
+    """
+    MinHash signatures plus LSH band tables with a fixed number of slots per band.
+
+    Each slot stores a band hash and the id of the record it came from; a record is a
+    candidate near-duplicate of every stored record that shares at least one band hash.
+    """
+
+    def __init__(self, threshold, num_perm=128, slots=1 << 20, seed=1):
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, PRIME, size=num_perm, dtype=np.uint64)
+        self.slots = slots
+        self.keys = np.zeros((self.bands, slots), dtype=np.uint64)
+        self.ids = np.full((self.bands, slots), EMPTY_SLOT, dtype=np.int64)
+
+    @classmethod
+    def bytes_per_slot(cls):
+        return np.dtype(np.uint64).itemsize + np.dtype(np.int64).itemsize
+
+    def signature(self, shingle_hashes):
+        # (a * x + b) mod p stays below 2**62, so uint64 arithmetic does not overflow
+        x = shingle_hashes % PRIME
+        return ((np.outer(self.a, x) + self.b[:, None]) % PRIME).min(axis=1)
+
+    def band_keys(self, signature):
+        bands = signature[:self.bands * self.rows].reshape(self.bands, self.rows)
+        return np.array([zlib.crc32(band.tobytes()) | (i << 32) for i, band in enumerate(bands)], dtype=np.uint64)
+
+    def candidates(self, keys):
+        """Return the ids of stored records sharing a band hash with keys."""
+        slots = keys % np.uint64(self.slots)
+        band_index = np.arange(self.bands)
+        hits = (self.keys[band_index, slots] == keys) & (self.ids[band_index, slots] != EMPTY_SLOT)
+        return set(self.ids[band_index, slots][hits].tolist())
+
+    def insert(self, keys, record_id):
+        slots = keys % np.uint64(self.slots)
+        band_index = np.arange(self.bands)
+        self.keys[band_index, slots] = keys
+        self.ids[band_index, slots] = record_id
+
+
+def record_texts(record, context_turns=4):
+    """Return (response, recent conversation) of a chat record; the system prompt is left out."""
+    messages = record.get("messages", [])
+    response = messages[-1]["content"] if messages else ""
+    turns = [m for m in messages[1:-1] if m.get("role") != "system"][-context_turns:]
+    conversation = "\n".join(f"{m.get('role')}: {m.get('content', '')}" for m in turns)
+    return response or "", conversation
+
+
+def dedup_records(records, response_threshold=0.9, conversation_threshold=0.8, max_per_task=None,
+                  num_perm=128, shingle_size=3, context_turns=4, memory_mb=512):
+    """
+    Yield the records to keep, in input order.
+
+    A record is dropped when an earlier kept record is an LSH candidate for both its response
+    (at response_threshold) and its conversation (at conversation_threshold), or when its
+    task already has max_per_task kept records. Set a threshold above 1 to ignore that part.
+    """
+    indexes = {}
+    thresholds = {"response": response_threshold, "conversation": conversation_threshold}
+    active = {name: t for name, t in thresholds.items() if t <= 1}
+    if active:
+        total_bands = sum(lsh_params(t, num_perm)[0] for t in active.values())
+        slots = max(1024, memory_mb * 1024 * 1024 // (total_bands * MinHashLSH.bytes_per_slot()))
+        indexes = {name: MinHashLSH(t, num_perm, slots) for name, t in active.items()}
+
+    kept_per_task = Counter()
+    for record_id, record in enumerate(records):
+        task_id = record.get("task_id")
+        if max_per_task is not None and kept_per_task[task_id] >= max_per_task:
+            continue
+        texts = dict(zip(("response", "conversation"), record_texts(record, context_turns)))
+        keys, matches = {}, None
+        for name, index in indexes.items():
+            keys[name] = index.band_keys(index.signature(shingles(texts[name], shingle_size)))
+            candidates = index.candidates(keys[name])
+            matches = candidates if matches is None else matches & candidates
+        if matches:
+            continue
+        for name, index in indexes.items():
+            index.insert(keys[name], record_id)
+        kept_per_task[task_id] += 1
+        yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove near-duplicate records from chat-format training shards")
+    parser.add_argument("inputs", nargs="+", help="JSONL or JSONL.gz shards (or glob patterns)")
+    parser.add_argument("--output_dir", required=True)
+    parser.add_argument("--response_threshold", type=float, default=0.9,
+                        help="Jaccard similarity above which responses count as duplicates (>1 to ignore responses)")
+    parser.add_argument("--conversation_threshold", type=float, default=0.8,
+                        help="Jaccard similarity above which conversations count as duplicates (>1 to ignore them)")
+    parser.add_argument("--max_per_task", type=int, default=None, help="Keep at most this many records per task_id")
+    parser.add_argument("--num_perm", type=int, default=128, help="Number of MinHash permutations")
+    parser.add_argument("--shingle_size", type=int, default=3, help="Tokens per shingle")
+    parser.add_argument("--context_turns", type=int, default=4, help="Conversation turns compared before the response")
+    parser.add_argument("--memory_mb", type=int, default=512, help="Memory for the LSH tables")
+    parser.add_argument("--max_shard_mb", type=int, default=DEFAULT_SHARD_BYTES // (1024 * 1024))
+    args = parser.parse_args()
+
+    paths = [p for pattern in args.inputs for p in (sorted(glob.glob(pattern)) or [pattern])]
+    counts = Counter()
+
+    def counted(records):
+        for record in records:
+            counts["read"] += 1
+            yield record
+
+    with ShardWriter(args.output_dir, prefix="dedup", max_bytes=args.max_shard_mb * 1024 * 1024) as writer:
+        for record in dedup_records(counted(iter_records(paths)), args.response_threshold,
+                                    args.conversation_threshold, args.max_per_task, args.num_perm,
+                                    args.shingle_size, args.context_turns, args.memory_mb):
+            writer.write(record)
+            counts["kept"] += 1
+
+    summary = {"read": counts["read"], "kept": counts["kept"], "shards": writer.shards, "settings": vars(args)}
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Kept {counts['kept']} of {counts['read']} records in {len(writer.shards)} shards under {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
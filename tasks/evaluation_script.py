@@ -15,6 +15,11 @@ import socket
 
 import boto3
 
+import task_linter
+import task_store
+from experiment_archive import is_archive, open_archive
+from task_outcomes import analyze_json_file, analyze_memory, extract_result, task_score
+
 BLOCKED_ACTIONS_COOKING = [
     '!activate', '!attackPlayer', '!checkBlueprint', '!checkBlueprintLevel',
     '!clearChat', '!clearFurnace', '!consume', '!craftable', '!discard',
@@ -39,61 +44,6 @@ BLOCKED_ACTIONS_CONSTRUCTION = [
     '!stop', '!takeFromChest', '!viewChest', '!craftRecipe', '!smeltItem'
 ]
 
-def analyze_json_file(file_path):
-    """
-    Analyzes a single JSON file to extract the task outcome.
-
-    Args:
-        file_path (str): Path to the JSON file.
-
-    Returns:
-        str or None: The task outcome string if found, otherwise None.
-    """
-    try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            if "turns" in data:
-                for turn in data["turns"]:
-                    if turn.get("role") == "system" and "content" in turn:
-                        if isinstance(turn["content"], str) and "Task ended with score : " in turn["content"]:
-                            if "Task ended with score : 1" in turn["content"]:
-                                return 1
-                            elif "Task ended with score : 0" in turn["content"]:
-                                return 0
-                            else:
-                                score = float(turn["content"].split(":")[-1].strip())
-                                return score
-                            
-                            
-        return None
-    except FileNotFoundError:
-        print(f"Error: File not found: {file_path}")
-        return None
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON format in: {file_path}")
-        return None
-    except Exception as e:
-        print(f"An unexpected error occurred while processing {file_path}: {e}")
-        return None
-    
-def extract_result(folder_path):
-    folder_name = os.path.basename(folder_path)
-    json_files = glob.glob(os.path.join(folder_path, "*.json"))
-    # assert len(json_files) == 2, f"Expected 2 json files in {folder_name}, found {len(json_files)}"
-
-    if not json_files:
-        return None
-    else: 
-        score = None
-        curr_score = 0
-        for json_file in json_files:
-            score = analyze_json_file(json_file)
-            if score is not None:
-                max_score = max(score, curr_score)
-                curr_score = max_score
-
-        return curr_score
-    
 def aggregate_results(local_folders):
     """
     Aggregates the analysis results for each folder.
@@ -161,7 +111,10 @@ def check_folder_results(folder_path):
     
     # Find all subfolders (task IDs) in the given folder
     if os.path.isdir(folder_path):
-        subfolders = [f for f in glob.glob(os.path.join(folder_path, "*")) if os.path.isdir(f)]
+        if is_archive(folder_path):
+            subfolders = [os.path.join(folder_path, task_id) for task_id in open_archive(folder_path).task_ids()]
+        else:
+            subfolders = [f for f in glob.glob(os.path.join(folder_path, "*")) if os.path.isdir(f)]
         if subfolders:
             # If there are subfolders, evaluate each subfolder
             print(f"Found {len(subfolders)} subfolders to evaluate")
@@ -241,33 +194,138 @@ def set_environment_variable_tmux_session(session_name, key, value):
     """Set an environment variable for the current process."""
     subprocess.run(["tmux", "send-keys", "-t", session_name, f"export {key}={value}", "C-m"])
 
-def launch_parallel_experiments(task_path, 
-                                num_exp, 
-                                exp_name, 
-                                num_agents=2, 
-                                model="gpt-4o-mini",
-                                api="openai",
-                                num_parallel=1,
-                                s3=False, 
-                                bucket_name="mindcraft-experiments", 
-                                template_profile="profiles/tasks/collab_profile.json", 
-                                insecure_coding=False, 
-                                url="http://127.0.0.1:8000/v1", 
-                                max_messages=15,
-                                num_examples=2, 
-                                no_pruning=False,
-                                block_conversation=False, 
-                                run_in_tmux=True):
-    
-    with open(task_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    json_data = json.loads(content)
+class ExperimentHandle:
+    """
+    An experiment started by start_experiment. Carries the experiment folder, live progress
+    (read from the agent memory files copied into experiments_folder/<task_id>/ after every
+    run) and the per-task results, so callers can run experiments in-process without
+    watching the experiments directory.
+    """
 
-    task_ids = json_data.keys()
+    def __init__(self, experiments_folder, exp_name, task_path, task_ids, num_exp, num_agents,
+                 server_indices, agent_names, info, s3=False, s3_path="", run_in_tmux=True):
+        self.experiments_folder = experiments_folder
+        self.exp_name = exp_name
+        self.task_path = task_path
+        self.task_ids = task_ids
+        self.num_exp = num_exp
+        self.num_agents = num_agents
+        self.server_indices = server_indices
+        self.agent_names = agent_names
+        self.info = info
+        self.s3 = s3
+        self.s3_path = s3_path
+        self.run_in_tmux = run_in_tmux
+
+    def task_folder(self, task_id):
+        return os.path.join(self.experiments_folder, str(task_id))
+
+    def completed_runs(self, task_id):
+        """Number of repetitions of a task whose memory files have been saved for every agent."""
+        files_per_rep = {}
+        for json_file in glob.glob(os.path.join(self.task_folder(task_id), "*.json")):
+            match = re.search(r"_(\d+)\.json$", json_file)
+            if match:
+                files_per_rep[match.group(1)] = files_per_rep.get(match.group(1), 0) + 1
+        return sum(1 for count in files_per_rep.values() if count >= self.num_agents)
+
+    def progress(self):
+        completed = sum(min(self.completed_runs(task_id), self.num_exp) for task_id in self.task_ids)
+        total = len(self.task_ids) * self.num_exp
+        return {"completed": completed, "total": total}
+
+    def is_done(self):
+        progress = self.progress()
+        return progress["completed"] >= progress["total"]
+
+    def task_results(self):
+        """Return {task_id: score} for the tasks with saved results so far."""
+        results = {}
+        for task_id in self.task_ids:
+            result = extract_result(self.task_folder(task_id))
+            if result is not None:
+                results[task_id] = result
+        return results
+
+    def results(self):
+        """Aggregated results plus the experiment settings, as written to results.txt."""
+        results = aggregate_results([self.task_folder(task_id) for task_id in self.task_ids])
+        results.update(self.info)
+        return results
 
-    task_type = json_data[list(task_ids)[0]]["type"]
+    def write_results(self):
+        results = self.results()
+        with open(f"{self.experiments_folder}/results.txt", "w") as file:
+            file.write(str(results))
+        if self.s3:
+            cmd = f"aws s3 cp {self.experiments_folder}/results.txt s3://{self.s3_path}/results.txt"
+            print(cmd)
+            subprocess.run(cmd.split())
+        return results
+
+    def wait(self, poll_interval=60, timeout=None):
+        """Block until every run has finished (or timeout seconds passed); returns the final results."""
+        start = time.time()
+        while True:
+            progress = self.progress()
+            results = self.write_results()
+            print(f"Total tasks run: {progress['completed']}/{progress['total']}")
+            print(results)
+            if progress["completed"] >= progress["total"]:
+                return results
+            if timeout is not None and time.time() - start > timeout:
+                raise TimeoutError(f"Experiment {self.exp_name} did not finish within {timeout} seconds")
+            time.sleep(poll_interval)
+
+    def stop(self):
+        """Stop the Minecraft servers and agent sessions of this experiment and delete its server copies."""
+        if not self.run_in_tmux:
+            return
+        for index in self.server_indices:
+            kill_world(f"server_{index}")
+            subprocess.run(["tmux", "kill-session", "-t", str(index)])
+            delete_server_files(f"./tasks/server_data_{index}/")
+
+
+def start_experiment(task_path,
+                     num_exp,
+                     exp_name,
+                     num_agents=2,
+                     model="gpt-4o-mini",
+                     api="openai",
+                     num_parallel=1,
+                     s3=False,
+                     bucket_name="mindcraft-experiments",
+                     template_profile="profiles/tasks/collab_profile.json",
+                     insecure_coding=False,
+                     url="http://127.0.0.1:8000/v1",
+                     max_messages=15,
+                     num_examples=2,
+                     no_pruning=False,
+                     block_conversation=False,
+                     run_in_tmux=True,
+                     lint=True,
+                     strict_lint=False,
+                     server_offset=0):
+    """
+    Launch the servers and agents for a task file and return an ExperimentHandle without
+    waiting for the runs. server_offset selects which server slots (ports, tmux sessions and
+    agent names) to use, so several experiments can run side by side.
+    """
+    # report broken tasks before any server is started; only strict_lint refuses to launch
+    if lint:
+        errors = [p for p in task_linter.lint_task_files([task_path]) if p["level"] == "error"]
+        if errors:
+            task_linter.print_problems(errors)
+            if strict_lint:
+                raise ValueError(f"{len(errors)} problems in {task_path}; fix them or run without --strict_lint")
+            print(f"Warning: {len(errors)} problems in {task_path}, launching anyway")
+
+    # read ids and the first task through the compiled store when there is one
+    task_ids = task_store.task_ids(task_path)
+
+    task_type = task_store.read_task(task_path, task_ids[0])["type"]
     # split the task_ids into num_parallel groups
-    task_ids = list(task_ids)
     task_ids_split = [task_ids[i::num_parallel] for i in range(num_parallel)]
 
     if task_type == "cooking":
@@ -278,12 +336,24 @@ def launch_parallel_experiments(task_path,
         world_name = "Superflat"
 
     if run_in_tmux:
-        servers = create_server_files("./tasks/server_data/", num_parallel, world_name=world_name)
+        servers = create_server_files("./tasks/server_data/", num_parallel, world_name=world_name, start=server_offset)
     else:
-        servers = [(f"./tasks/server_data_{i}/", 55916 + i) for i in range(num_parallel)]
+        servers = [(f"./tasks/server_data_{i}/", 55916 + i) for i in range(server_offset, server_offset + num_parallel)]
     date_time = datetime.now().strftime("%m-%d_%H-%M")
     experiments_folder = f"experiments/{exp_name}_{date_time}"
     exp_name = f"{exp_name}_{date_time}"
+    # experiments started in the same minute get their own folder; creating it claims the name,
+    # so concurrent runs cannot pick the same one
+    os.makedirs("experiments", exist_ok=True)
+    suffix = 1
+    while True:
+        try:
+            os.makedirs(experiments_folder)
+            break
+        except FileExistsError:
+            suffix += 1
+            experiments_folder = f"experiments/{exp_name}_{suffix}"
+    exp_name = os.path.basename(experiments_folder)
 
     split_task_path = task_path.split("/")
     if len(split_task_path) > 1:
@@ -294,7 +364,6 @@ def launch_parallel_experiments(task_path,
     s3_path = f"{bucket_name}/{task_type}/{model}/{task_path_name}/{exp_name}"
 
     # start wandb
-    os.makedirs(experiments_folder, exist_ok=True)
     for i, server in enumerate(servers):
         launch_server_experiment(task_path, 
                                  task_ids_split[i], 
@@ -318,32 +387,73 @@ def launch_parallel_experiments(task_path,
                                  block_conversation=block_conversation, 
                                  run_in_tmux=run_in_tmux)
         time.sleep(5)
-    
-    total_num_tasks = len(task_ids)
-    total_num_experiments = total_num_tasks * num_exp
-    total_run = 0
-    while total_run < total_num_experiments:
-        results = aggregate_results([f"{experiments_folder}/{task_id}" for task_id in task_ids])
-        total_run = results["total"]
-        print(f"Total tasks run: {total_run}/{total_num_experiments}")
-        print(results)
-        results["exp_name"] = exp_name
-        results["template_profile"] = template_profile
-        results["model"] = model
-        results["api"] = api
-        results["num_agents"] = num_agents
-        results["task_path"] = task_path
-        results["task_type"] = task_type
-        results["max_messages"] = max_messages
-        results["num_examples"] = num_examples
-        with open(f"{experiments_folder}/results.txt", "w") as file:
-            file.write(str(results))
-        if s3: 
-            cmd = f"aws s3 cp {experiments_folder}/results.txt s3://{s3_path}/results.txt"
-            print(cmd)
-            subprocess.run(cmd.split())
-        
-        time.sleep(60)
+
+    server_indices = [port - 55916 for _, port in servers]
+    agent_names = [name for index in server_indices for name in session_agent_names(num_agents, str(index))]
+    info = {
+        "exp_name": exp_name,
+        "template_profile": template_profile,
+        "model": model,
+        "api": api,
+        "num_agents": num_agents,
+        "task_path": task_path,
+        "task_type": task_type,
+        "max_messages": max_messages,
+        "num_examples": num_examples,
+    }
+    return ExperimentHandle(experiments_folder, exp_name, task_path, task_ids, num_exp, num_agents,
+                            server_indices, agent_names, info, s3=s3, s3_path=s3_path, run_in_tmux=run_in_tmux)
+
+def launch_parallel_experiments(task_path, 
+                                num_exp, 
+                                exp_name, 
+                                num_agents=2, 
+                                model="gpt-4o-mini",
+                                api="openai",
+                                num_parallel=1,
+                                s3=False, 
+                                bucket_name="mindcraft-experiments", 
+                                template_profile="profiles/tasks/collab_profile.json", 
+                                insecure_coding=False, 
+                                url="http://127.0.0.1:8000/v1", 
+                                max_messages=15,
+                                num_examples=2, 
+                                no_pruning=False,
+                                block_conversation=False, 
+                                run_in_tmux=True,
+                                lint=True,
+                                strict_lint=False):
+    """Run an experiment and block until all of its runs have finished; returns the final results."""
+    handle = start_experiment(task_path, 
+                              num_exp, 
+                              exp_name, 
+                              num_agents=num_agents, 
+                              model=model, 
+                              api=api, 
+                              num_parallel=num_parallel, 
+                              s3=s3, 
+                              bucket_name=bucket_name, 
+                              template_profile=template_profile, 
+                              insecure_coding=insecure_coding, 
+                              url=url, 
+                              max_messages=max_messages, 
+                              num_examples=num_examples, 
+                              no_pruning=no_pruning, 
+                              block_conversation=block_conversation, 
+                              run_in_tmux=run_in_tmux, 
+                              lint=lint,
+                              strict_lint=strict_lint)
+    return handle.wait()
+
+def session_agent_names(num_agents, session_name):
+    """Names of the agents on the server of a session, e.g. Andy_0 and Jill_0."""
+    if num_agents == 1:
+        return [f"Andy_{session_name}"]
+    if num_agents == 2:
+        return [f"Andy_{session_name}", f"Jill_{session_name}"]
+    # Lets use an ordered list of 10 human names.
+    human_names = ["Andy", "Jill", "Bob", "Sally", "Mike", "Laura", "John", "Emma", "Tom", "Kate"]
+    return [f"{human_names[i % len(human_names)]}_{session_name}" for i in range(num_agents)]
 
 def launch_server_experiment(task_path, 
                              task_ids, 
@@ -386,23 +496,9 @@ def launch_server_experiment(task_path,
     
     # set up server and agents 
     session_name = str(server_port - 55916)
-    if num_agents == 1: 
-        agent_names = [f"Andy_{session_name}"]
-        models = [model]
-        apis = [api]
-    elif num_agents == 2:
-        agent_names = [f"Andy_{session_name}", f"Jill_{session_name}"]
-        models = [model] * 2
-        apis = [api] * 2
-    else:
-        # Lets use an ordered list of 10 human names.
-        human_names = ["Andy", "Jill", "Bob", "Sally", "Mike", "Laura", "John", "Emma", "Tom", "Kate"]
-        agent_names = []
-        for i in range(num_agents):
-            name = human_names[i % len(human_names)]
-            agent_names.append(f"{name}_{session_name}")
-        models = [model] * num_agents
-        apis = [api] * num_agents
+    agent_names = session_agent_names(num_agents, session_name)
+    models = [model] * num_agents
+    apis = [api] * num_agents
         
     make_profiles(agent_names, models, apis, template_profile=template_profile, url=url)
 
@@ -582,12 +678,12 @@ def make_profiles(agent_names, models, apis, template_profile="profiles/collab_p
         with open(f"{agent_names[index]}.json", 'w') as f:
             json.dump(profile, f, indent=4)
 
-def create_server_files(source_path, num_copies, world_name="Forest"):
-    """Create multiple copies of server files for parallel experiments."""
+def create_server_files(source_path, num_copies, world_name="Forest", start=0):
+    """Create multiple copies of server files for parallel experiments, numbered from start."""
     print("Creating server files...")
     print(num_copies)
     servers = []
-    for i in range(num_copies):
+    for i in range(start, start + num_copies):
         dest_path = f"./tasks/server_data_{i}/"
         copy_server_files(source_path, dest_path)
         print(dest_path)
@@ -744,6 +840,8 @@ def main():
     parser.add_argument('--block_conversation', action='store_true', help='Block conversation actions')
     parser.add_argument('--check', metavar='FOLDER_PATH', help='Check and evaluate results in the specified folder without running experiments')
     parser.add_argument('--usernames', default="", help='Comma-separated list of usernames for the agents')
+    parser.add_argument('--no_lint', action='store_true', help='Do not validate the task file before launching')
+    parser.add_argument('--strict_lint', action='store_true', help='Refuse to launch when the task file has lint errors')
 
     args = parser.parse_args()
     print(args)
@@ -766,22 +864,23 @@ def main():
         update_keys_json()
 
     # change task file to include usernames
-    with open(args.task_path, 'r') as f:
-        content = f.read()
-        task = json.loads(content) 
+    first_task = task_store.read_task(args.task_path, task_store.task_ids(args.task_path)[0])
     # check if human count for first task is non zero
-    if "human_count" in task[list(task.keys())[0]]:
+    if "human_count" in first_task:
         # check if human count is non zero
-        human_count = task[list(task.keys())[0]]["human_count"]
+        human_count = first_task["human_count"]
         username_lst = args.usernames.replace(" ", "").split(",")
         if len(username_lst) != human_count:
             raise ValueError(f"Number of usernames provided ({len(username_lst)}) does not match human count ({human_count})")
         if human_count > 0:
+            with open(args.task_path, 'r') as f:
+                task = json.load(f)
             for task_id in task.keys():
                 task[task_id]["usernames"] = username_lst
-        # dump to task_path 
-        with open(args.task_path, 'w') as f:
-            json.dump(task, f, indent=4)
+            # dump to task_path 
+            with open(args.task_path, 'w') as f:
+                json.dump(task, f, indent=4)
+            task_store.refresh_store(args.task_path)
     
     launch_parallel_experiments(args.task_path, 
                                 num_exp=args.num_exp, 
@@ -799,7 +898,9 @@ def main():
                                 num_examples=args.num_examples, 
                                 no_pruning=args.no_pruning, 
                                 block_conversation=args.block_conversation,
-                                run_in_tmux=not args.no_launch_world)
+                                run_in_tmux=not args.no_launch_world,
+                                lint=not args.no_lint,
+                                strict_lint=args.strict_lint)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
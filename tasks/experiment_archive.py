@@ -0,0 +1,261 @@
+"""
+Pack finished experiment folders into a few zstd-compressed JSONL shards.
+
+An experiment folder (experiments/<exp>/<task_id>/<agent>_<rep>.json, results.txt, bot
+copies, ...) becomes <exp>.archive/ with shard-NNNNN.jsonl.zst files and an index.jsonl
+sidecar. Every file is one JSONL line {"path", "content"}; the files of one directory are
+compressed together into an independent zstd frame, so reading one task's logs
+decompresses only that frame. index.jsonl has one line per file with its path, task_id,
+agent and repetition and the shard, frame offset, frame length and line in the frame.
+
+evaluation_script.py, the analyzers and report_builder.py read archives directly: pass
+<exp>.archive wherever an experiment folder is expected, or <exp>.archive/<task_id> for a
+task folder. task_folders, task_json_files and read_task_file below work the same on
+plain folders and archives. pack --remove only deletes a folder once every file reads back
+from the archive byte for byte.
+
+Example usage:
+python tasks/experiment_archive.py pack experiments/exp_06-01_10-00 --remove
+python tasks/experiment_archive.py unpack experiments/exp_06-01_10-00.archive experiments/exp_06-01_10-00
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+from functools import lru_cache
+
+import zstandard
+
+ARCHIVE_SUFFIX = ".archive"
+INDEX_NAME = "index.jsonl"
+# memory files are saved as <agent>_<repetition>.json by run_script in evaluation_script.py
+MEMORY_FILE_PATTERN = re.compile(r"^(?P<agent>.+)_(?P<rep>\d+)\.json$")
+DEFAULT_SHARD_BYTES = 256 * 1024 * 1024
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+def is_archive(path):
+    return os.path.isfile(os.path.join(path, INDEX_NAME))
+
+
+def _file_entry(rel_path):
+    parts = rel_path.split("/")
+    entry = {"path": rel_path, "task_id": None, "agent": None, "rep": None}
+    if len(parts) == 2:
+        entry["task_id"] = parts[0]
+        match = MEMORY_FILE_PATTERN.match(parts[1])
+        if match:
+            entry["agent"], entry["rep"] = match.group("agent"), int(match.group("rep"))
+    return entry
+
+
+def pack_experiment(folder, archive_path=None, level=10, max_shard_bytes=DEFAULT_SHARD_BYTES):
+    """Pack an experiment folder into an archive directory; returns the archive path."""
+    folder = os.path.normpath(folder)
+    archive_path = archive_path or folder + ARCHIVE_SUFFIX
+    os.makedirs(archive_path, exist_ok=True)
+    compressor = zstandard.ZstdCompressor(level=level)
+    index = []
+    shard_id, shard, shard_size = -1, None, max_shard_bytes
+
+    def write_frame(lines, entries):
+        nonlocal shard_id, shard, shard_size
+        frame = compressor.compress("".join(lines).encode("utf-8", "surrogateescape"))
+        if shard is None or (shard_size and shard_size + len(frame) > max_shard_bytes):
+            if shard is not None:
+                shard.close()
+            shard_id += 1
+            shard = open(os.path.join(archive_path, f"shard-{shard_id:05d}.jsonl.zst"), "wb")
+            shard_size = 0
+        for line_no, entry in enumerate(entries):
+            index.append({**entry, "shard": shard_id, "offset": shard_size, "length": len(frame), "line": line_no})
+        shard.write(frame)
+        shard_size += len(frame)
+
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        lines, entries, frame_bytes = [], [], 0
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                content = f.read().decode("utf-8", "surrogateescape")
+            rel_path = os.path.relpath(path, folder).replace(os.sep, "/")
+            line = json.dumps({"path": rel_path, "content": content, "mtime": os.path.getmtime(path)}) + "\n"
+            if lines and frame_bytes + len(line) > MAX_FRAME_BYTES:
+                write_frame(lines, entries)
+                lines, entries, frame_bytes = [], [], 0
+            lines.append(line)
+            entries.append(_file_entry(rel_path))
+            frame_bytes += len(line)
+        if lines:
+            write_frame(lines, entries)
+    if shard is not None:
+        shard.close()
+
+    with open(os.path.join(archive_path, INDEX_NAME), "w") as f:
+        for entry in index:
+            f.write(json.dumps(entry) + "\n")
+    return archive_path
+
+
+class ExperimentArchive:
+    """Random access to the files of a packed experiment."""
+
+    def __init__(self, path):
+        self.path = os.path.normpath(path)
+        self.name = os.path.basename(self.path)
+        if self.name.endswith(ARCHIVE_SUFFIX):
+            self.name = self.name[:-len(ARCHIVE_SUFFIX)]
+        with open(os.path.join(self.path, INDEX_NAME), "r") as f:
+            self.entries = [json.loads(line) for line in f]
+        self.by_path = {entry["path"]: entry for entry in self.entries}
+        self.by_task = {}
+        for entry in self.entries:
+            if entry["task_id"] is not None:
+                self.by_task.setdefault(entry["task_id"], []).append(entry)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._frame_key = None
+        self._frame_lines = None
+
+    def task_ids(self):
+        return sorted(self.by_task)
+
+    def _frame(self, entry):
+        key = (entry["shard"], entry["offset"])
+        if key != self._frame_key:
+            with open(os.path.join(self.path, f"shard-{entry['shard']:05d}.jsonl.zst"), "rb") as f:
+                f.seek(entry["offset"])
+                data = self._decompressor.decompress(f.read(entry["length"]))
+            self._frame_lines = data.decode("utf-8", "surrogateescape").splitlines()
+            self._frame_key = key
+        return self._frame_lines
+
+    def read_record(self, path):
+        entry = self.by_path[path]
+        return json.loads(self._frame(entry)[entry["line"]])
+
+    def read_text(self, path):
+        return self.read_record(path)["content"]
+
+    def task_files(self, task_id, pattern=None):
+        """Return the index entries of a task's files (optionally only names matching a regex)."""
+        entries = self.by_task.get(task_id, [])
+        if pattern is not None:
+            entries = [e for e in entries if re.search(pattern, e["path"].split("/")[-1])]
+        return entries
+
+    def task_memories(self, task_id):
+        """Yield (entry, parsed JSON) for the .json files of a task; the JSON is None if it does not parse."""
+        for entry in self.task_files(task_id, r"\.json$"):
+            try:
+                yield entry, json.loads(self.read_text(entry["path"]))
+            except json.JSONDecodeError:
+                print(f"Error: Invalid JSON format in: {self.path}/{entry['path']}")
+                yield entry, None
+
+    def unpack(self, dest):
+        """Restore the original folder layout (contents and modification times) under dest."""
+        for entry in self.entries:
+            record = self.read_record(entry["path"])
+            path = os.path.join(dest, *entry["path"].split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(record["content"].encode("utf-8", "surrogateescape"))
+            if record.get("mtime") is not None:
+                os.utime(path, (record["mtime"], record["mtime"]))
+        return len(self.entries)
+
+
+@lru_cache(maxsize=16)
+def open_archive(path):
+    return ExperimentArchive(path)
+
+
+def archive_task(path):
+    """If path is <archive>/<task_id>, return (ExperimentArchive, task_id); otherwise None."""
+    parent, task_id = os.path.split(os.path.normpath(path))
+    if parent and is_archive(parent):
+        return open_archive(parent), task_id
+    return None
+
+
+def task_folders(experiment_dir):
+    """Task folders of an experiment folder, or <archive>/<task_id> paths of an archive."""
+    if is_archive(experiment_dir):
+        return [os.path.join(experiment_dir, task_id) for task_id in open_archive(experiment_dir).task_ids()]
+    return sorted(os.path.join(experiment_dir, name) for name in os.listdir(experiment_dir)
+                  if os.path.isdir(os.path.join(experiment_dir, name)))
+
+
+def task_json_files(folder_path):
+    """Paths of the .json files of a task folder (or of <archive>/<task_id>), for read_task_file."""
+    archived = archive_task(folder_path)
+    if archived is not None:
+        archive, task_id = archived
+        return [os.path.join(archive.path, *entry["path"].split("/")) for entry in archive.task_files(task_id, r"\.json$")]
+    return glob.glob(os.path.join(folder_path, "*.json"))
+
+
+def read_task_file(path):
+    """Text of a file in a task folder, read from the archive for <archive>/<task_id>/<name>."""
+    archived = archive_task(os.path.dirname(path))
+    if archived is None:
+        with open(path, "r") as f:
+            return f.read()
+    archive, task_id = archived
+    rel_path = f"{task_id}/{os.path.basename(path)}"
+    if rel_path not in archive.by_path:
+        raise FileNotFoundError(path)
+    return archive.read_text(rel_path)
+
+
+def verify_archive(archive, folder):
+    """Return the files of folder that are missing from the archive or differ from their archived copy."""
+    problems = []
+    for dirpath, _, filenames in os.walk(folder):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, folder).replace(os.sep, "/")
+            if rel_path not in archive.by_path:
+                problems.append(rel_path)
+                continue
+            with open(path, "rb") as f:
+                if archive.read_text(rel_path).encode("utf-8", "surrogateescape") != f.read():
+                    problems.append(rel_path)
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack experiment folders into zstd JSONL archives and back")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack = subparsers.add_parser("pack", help="Pack experiment folders")
+    pack.add_argument("folders", nargs="+")
+    pack.add_argument("--level", type=int, default=10, help="zstd compression level")
+    pack.add_argument("--max_shard_mb", type=int, default=DEFAULT_SHARD_BYTES // (1024 * 1024))
+    pack.add_argument("--remove", action="store_true", help="Delete each folder once it is packed and verified")
+    unpack = subparsers.add_parser("unpack", help="Restore an experiment folder from an archive")
+    unpack.add_argument("archive")
+    unpack.add_argument("dest")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        for folder in args.folders:
+            archive_path = pack_experiment(folder, level=args.level, max_shard_bytes=args.max_shard_mb * 1024 * 1024)
+            archive = ExperimentArchive(archive_path)
+            print(f"Packed {len(archive.entries)} files from {folder} into {archive_path}")
+            if args.remove:
+                problems = verify_archive(archive, folder)
+                if problems:
+                    print(f"Not removing {folder}: {len(problems)} files are missing from the archive or differ, "
+                          f"e.g. {problems[0]}")
+                    continue
+                shutil.rmtree(folder)
+    else:
+        count = ExperimentArchive(args.archive).unpack(args.dest)
+        print(f"Restored {count} files to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Memory-mapped reader for agent full-history files.
+
+History.appendFullHistory keeps bots/<agent>/histories/<timestamp>.json as one JSON array
+of {"role", "content"} turns that grows for the whole life of an agent. Instead of
+json.load-ing the array, HistoryFile memory-maps the file and indexes the byte offset,
+length and line number of every turn, so turns can be sliced, iterated and searched while
+only the turns actually used are decoded. Indexes are cached in tasks/history_index/ and
+keyed on the file's size and mtime; because the history file is rewritten with the old
+turns unchanged, a grown file is indexed from where the cached index stopped.
+
+appendFullHistory rewrites the file in place (truncate, then write), so the file of a live
+agent can be shorter than when it was opened. Touching a mapped page past the end of the
+file kills the process with SIGBUS, so single turns and newly appended turns are read with
+pread, and full scans and searches check the file size before they touch the map. A file
+rewritten in the middle of a scan or search can still fault, so when reading the history
+of a running agent prefer --range (or copy the file first); every read raises
+HistoryRewritten once the file has shrunk, after which the file has to be opened again.
+
+search() matches patterns against the raw bytes of the file, so anything a pattern has to
+match inside a turn's content must be written as it appears in JSON (a quote is \\", a
+newline \\n).
+
+Example usage:
+python tasks/history_reader.py bots/andy/histories/*.json --stats
+python tasks/history_reader.py bots/andy/histories/6-1-2025_10-00-00AM.json --range 100 120
+python tasks/history_reader.py bots/andy/histories/*.json --search '!craftRecipe' --role assistant
+python tasks/history_reader.py bots/andy/histories/*.json --commands
+"""
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history_index")
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u8"), ("line", "<u8")])
+# a JSON string (escapes included) or a bracket; brackets inside strings are consumed with the string
+TOKEN_PATTERN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+COMMAND_PATTERN = re.compile(r"!(\w+)")
+OPEN_BRACKETS = (ord("{"), ord("["))
+QUOTE = ord('"')
+
+
+class HistoryRewritten(RuntimeError):
+    """The history file became shorter than when it was opened (it is being rewritten)."""
+
+
+def scan_turns(buffer, start=0, depth=0, line=0):
+    """
+    Yield (offset, length, line) for each object directly inside the top-level array,
+    scanning buffer from start at the given bracket depth and line number. Objects that are
+    not closed yet (a file being rewritten) are not yielded.
+    """
+    turn_start = None
+    position = start
+    for match in TOKEN_PATTERN.finditer(buffer, start):
+        char = buffer[match.start()]
+        if char == QUOTE:
+            continue
+        if char in OPEN_BRACKETS:
+            depth += 1
+            if depth == 2 and char == OPEN_BRACKETS[0]:
+                turn_start = match.start()
+                line += buffer[position:turn_start].count(b"\n")
+                position = turn_start
+                turn_line = line
+        else:
+            depth -= 1
+            if depth == 1 and turn_start is not None:
+                yield turn_start, match.end() - turn_start, turn_line
+                turn_start = None
+
+
+class HistoryFile:
+    """Random access to the turns of one history file without loading the whole array."""
+
+    def __init__(self, path, cache_dir=DEFAULT_CACHE_DIR):
+        self.path = os.path.abspath(path)
+        self.cache_dir = cache_dir
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self.size, self.mtime_ns = stat.st_size, stat.st_mtime_ns
+        # mmap cannot map an empty file, and appendFullHistory starts every file empty
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.index = self._load_index()
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cache_paths(self):
+        key = hashlib.sha1(self.path.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npy"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def _check_size(self):
+        """Raise HistoryRewritten if the file is now shorter than the mapped size."""
+        if os.fstat(self._file.fileno()).st_size < self.size:
+            raise HistoryRewritten(f"{self.path} was rewritten while it was open; open it again")
+
+    def _read(self, offset, length):
+        """Read bytes with pread, which returns short instead of faulting like the map would."""
+        data = os.pread(self._file.fileno(), length, offset)
+        if len(data) < length:
+            raise HistoryRewritten(f"{self.path} was rewritten while it was open; open it again")
+        return data
+
+    def _tail_crc(self, index):
+        if not len(index):
+            return None
+        last = index[-1]
+        return zlib.crc32(self._read(int(last["offset"]), int(last["length"])))
+
+    def _load_index(self):
+        index_path, meta_path = self._cache_paths() if self.cache_dir else (None, None)
+        index = np.zeros(0, dtype=INDEX_DTYPE)
+        if index_path and os.path.exists(meta_path) and os.path.exists(index_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            cached = np.load(index_path)
+            if meta["size"] == self.size and meta["mtime_ns"] == self.mtime_ns:
+                return cached
+            end = int(cached[-1]["offset"] + cached[-1]["length"]) if len(cached) else 0
+            if len(cached) and self.size >= end and self._tail_crc(cached) == meta["tail_crc"]:
+                # the file was rewritten with more turns appended: index only the new part
+                index = cached
+
+        if len(index):
+            # only the new part is read, with pread, so a file being rewritten cannot fault
+            last = index[-1]
+            start, line = int(last["offset"] + last["length"]), int(last["line"])
+            line += self._read(int(last["offset"]), int(last["length"])).count(b"\n")
+            tail = self._read(start, self.size - start)
+            new = ((offset + start, length, turn_line)
+                   for offset, length, turn_line in scan_turns(tail, depth=1, line=line))
+        else:
+            self._check_size()
+            new = scan_turns(self._buffer)
+        index = np.concatenate([index, np.fromiter(new, dtype=INDEX_DTYPE)])
+
+        if index_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.save(index_path, index)
+            with open(meta_path, "w") as f:
+                json.dump({"path": self.path, "size": self.size, "mtime_ns": self.mtime_ns,
+                           "tail_crc": self._tail_crc(index)}, f)
+        return index
+
+    def __len__(self):
+        return len(self.index)
+
+    def raw(self, i):
+        """The JSON bytes of turn i."""
+        row = self.index[i]
+        return self._read(int(row["offset"]), int(row["length"]))
+
+    def line(self, i):
+        """Line number (0-based) at which turn i starts in the file."""
+        return int(self.index[i]["line"])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(self.iter_turns(*i.indices(len(self))))
+        return json.loads(self.raw(i))
+
+    def iter_turns(self, start=0, stop=None, step=1, role=None):
+        """Lazily yield the turns in range(start, stop, step), optionally only those of one role."""
+        for i in range(start, len(self) if stop is None else min(stop, len(self)), step):
+            turn = json.loads(self.raw(i))
+            if role is None or turn.get("role") == role:
+                yield turn
+
+    def __iter__(self):
+        return self.iter_turns()
+
+    def search(self, pattern, role=None):
+        """
+        Yield (turn index, turn, match) for the turns whose JSON text matches a regex (str or
+        bytes). The match is against the raw bytes, and only matching turns are decoded.
+        """
+        raw_pattern = re.compile(pattern.encode("utf-8") if isinstance(pattern, str) else pattern)
+        if not len(self):
+            return
+        starts = self.index["offset"]
+        ends = starts + self.index["length"]
+        position, end = int(starts[0]), int(ends[-1])
+        while True:
+            self._check_size()
+            match = raw_pattern.search(self._buffer, position, end)
+            if match is None:
+                return
+            i = int(np.searchsorted(starts, match.start(), side="right")) - 1
+            if match.start() >= ends[i]:
+                # between two turns
+                position = int(starts[i + 1])
+                continue
+            # one hit per turn: continue after it
+            position = int(ends[i])
+            turn = json.loads(self.raw(i))
+            if role is None or turn.get("role") == role:
+                yield i, turn, match
+
+    def command_counts(self, role="assistant"):
+        """Count the !commands used in turns of a role."""
+        counts = Counter()
+        for _, turn, _ in self.search(COMMAND_PATTERN.pattern, role=role):
+            if isinstance(turn.get("content"), str):
+                counts.update(COMMAND_PATTERN.findall(turn["content"]))
+        return counts
+
+
+def agent_histories(agent, bots_dir="bots", cache_dir=DEFAULT_CACHE_DIR):
+    """HistoryFiles of an agent, oldest first."""
+    paths = sorted(glob.glob(os.path.join(bots_dir, agent, "histories", "*.json")), key=os.path.getmtime)
+    return [HistoryFile(path, cache_dir) for path in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect agent history files without loading them")
+    parser.add_argument("paths", nargs="+", help="History files (or glob patterns)")
+    parser.add_argument("--cache_dir", default=DEFAULT_CACHE_DIR, help="Where turn indexes are cached")
+    parser.add_argument("--range", nargs=2, type=int, metavar=("START", "STOP"), help="Print turns START to STOP")
+    parser.add_argument("--search", default=None, help="Print turns whose content matches this regex")
+    parser.add_argument("--role", default=None, help="Only turns of this role")
+    parser.add_argument("--commands", action="store_true", help="Count the !commands used")
+    parser.add_argument("--stats", action="store_true", help="Print the number of turns per file")
+    args = parser.parse_args()
+
+    paths = [p for pattern in args.paths for p in (sorted(glob.glob(pattern)) or [pattern])]
+    command_counts = Counter()
+    for path in paths:
+        with HistoryFile(path, args.cache_dir) as history:
+            if args.stats:
+                print(f"{path}: {len(history)} turns, {history.size / (1024 * 1024):.1f} MB")
+            if args.range:
+                for i in range(max(0, args.range[0]), min(args.range[1], len(history))):
+                    turn = history[i]
+                    if args.role is None or turn.get("role") == args.role:
+                        print(f"[{path}:{i}] {turn.get('role')}: {turn.get('content')}")
+            if args.search:
+                for i, turn, _ in history.search(args.search, role=args.role):
+                    print(f"[{path}:{i} line {history.line(i) + 1}] {turn.get('role')}: {turn.get('content')}")
+            if args.commands:
+                command_counts.update(history.command_counts(args.role or "assistant"))
+    for command, count in command_counts.most_common():
+        print(f"!{command}: {count}")
+
+
+if __name__ == "__main__":
+    main()
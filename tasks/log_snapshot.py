@@ -0,0 +1,187 @@
+"""
+Content-addressed, hardlink-deduplicated snapshots of agent log directories.
+
+The data collector snapshots bots/<agent>/ after every run. Those directories keep growing
+across runs, so copying them in full re-copies every earlier run's logs. Instead, every
+file is stored once under <store>/objects/<sha256[:2]>/<sha256> and snapshots hardlink to
+it. The store remembers (size, mtime) per source file, so unchanged files are neither
+re-hashed nor re-linked: a snapshot only materializes files that are new or changed since
+the previous snapshot, and its manifest.json lists every file with its digest so the full
+tree can be restored. Stored objects are read-only; since a snapshot file is the same
+inode as its object, editing one in place would otherwise change every snapshot sharing it.
+
+Example usage:
+python tasks/log_snapshot.py restore tasks/full_run_logs_<ts>/run_003/manifest.json restored_run_003
+python tasks/log_snapshot.py stats tasks/log_store
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+MANIFEST_NAME = "manifest.json"
+STATE_NAME = "state.json"
+CHUNK_SIZE = 1 << 20
+READ_ONLY = 0o444
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _link_or_copy(source, dest):
+    """Hardlink source to dest, copying when linking is not possible (e.g. across file systems)."""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+        os.chmod(dest, READ_ONLY)
+
+
+class SnapshotStore:
+    """
+    A content-addressed file store plus the state of every source file snapshotted so far:
+    [size, mtime, digest, digest last linked by an only_new snapshot].
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.state_path = os.path.join(self.root, STATE_NAME)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r") as f:
+                self.state = json.load(f)
+        else:
+            self.state = {}
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def put(self, path):
+        """Add a file to the store (if its content is not there yet) and return its digest."""
+        digest = file_digest(path)
+        object_path = self.object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.{os.getpid()}.tmp"
+            shutil.copy2(path, tmp_path)
+            os.chmod(tmp_path, READ_ONLY)
+            os.replace(tmp_path, object_path)
+        return digest
+
+    def _save_state(self):
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def snapshot(self, sources, dest_dir, run_id=None, only_new=True):
+        """
+        Snapshot source directories into dest_dir.
+
+        Args:
+            sources: {name: directory}; files land under dest_dir/<name>/.
+            only_new: Only link files that are new or changed since the last only_new snapshot
+                of the same source path; the manifest still lists every file. Full snapshots
+                (only_new=False) link everything; they record the digests they compute, so
+                a following snapshot does not hash the same files again, but they do not
+                count as the last only_new snapshot.
+
+        Returns:
+            The manifest dict, also written to dest_dir/manifest.json.
+        """
+        files, new_files = {}, []
+        new_bytes = 0
+        for name, source_dir in sources.items():
+            if not os.path.isdir(source_dir):
+                continue
+            for dirpath, _, filenames in os.walk(source_dir):
+                for filename in sorted(filenames):
+                    path = os.path.join(dirpath, filename)
+                    rel_path = os.path.join(name, os.path.relpath(path, source_dir))
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    key = os.path.abspath(path)
+                    known = self.state.get(key)
+                    if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                        digest = known[2]
+                    else:
+                        digest = self.put(path)
+                    # state written before full snapshots were recorded has no linked digest
+                    linked = (known[3] if len(known) > 3 else known[2]) if known else None
+                    changed = linked != digest
+                    self.state[key] = [stat.st_size, stat.st_mtime_ns, digest, digest if only_new else linked]
+                    files[rel_path] = digest
+                    if changed:
+                        new_files.append(rel_path)
+                        new_bytes += stat.st_size
+                    if changed or not only_new:
+                        _link_or_copy(self.object_path(digest), os.path.join(dest_dir, rel_path))
+
+        manifest = {
+            "run_id": run_id,
+            "created": datetime.now().isoformat(),
+            "store": self.root,
+            "files": files,
+            "new_files": new_files,
+            "new_bytes": new_bytes,
+        }
+        os.makedirs(dest_dir, exist_ok=True)
+        with open(os.path.join(dest_dir, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+        self._save_state()
+        return manifest
+
+    def restore(self, manifest, dest_dir):
+        """Materialize every file of a manifest (dict or path) under dest_dir as hardlinks."""
+        if isinstance(manifest, str):
+            with open(manifest, "r") as f:
+                manifest = json.load(f)
+        for rel_path, digest in manifest["files"].items():
+            _link_or_copy(self.object_path(digest), os.path.join(dest_dir, rel_path))
+        return len(manifest["files"])
+
+    def stats(self):
+        """Return (number of objects, total bytes) in the store."""
+        count = size = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for filename in filenames:
+                count += 1
+                size += os.path.getsize(os.path.join(dirpath, filename))
+        return count, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and restore deduplicated log snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    restore = subparsers.add_parser("restore", help="Materialize a snapshot manifest into a directory")
+    restore.add_argument("manifest")
+    restore.add_argument("dest_dir")
+    stats = subparsers.add_parser("stats", help="Show the size of a snapshot store")
+    stats.add_argument("store")
+    args = parser.parse_args()
+
+    if args.command == "restore":
+        with open(args.manifest, "r") as f:
+            manifest = json.load(f)
+        count = SnapshotStore(manifest["store"]).restore(manifest, args.dest_dir)
+        print(f"Restored {count} files to {args.dest_dir}")
+    else:
+        count, size = SnapshotStore(args.store).stats()
+        print(f"{count} objects, {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
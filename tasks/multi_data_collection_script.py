@@ -5,10 +5,9 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 import time
-import json
-import tqdm
-from analyse_results import extract_result, get_immediate_subdirectories, analyze_json_file
-import glob
+from log_snapshot import SnapshotStore
+from evaluation_script import start_experiment, clean_up_server_files
+import results_index
 
 # Calculate project root directory
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -19,6 +18,8 @@ tasks_dir = os.path.dirname(os.path.abspath(__file__))
 LOGS_DIR = os.path.join(project_root, "logs")
 EXPERIMENTS_DIR = os.path.join(project_root, "experiments")
 BOTS_DIR = os.path.join(project_root, "bots")
+# Content-addressed store that all log snapshots hardlink into
+LOG_STORE_DIR = os.path.join(tasks_dir, "log_store")
 
 """
 This script is intended to run the evaluation script multiple times and then automatically aggregate the 
@@ -33,50 +34,48 @@ Meaning run those two tasks each 2 times, with num agents. The results will be i
 ./full_run_logs_{date}
 and ./successful_run_logs_{date}
 Use the successful run logs to train the next model.
+Log files are stored once in ./log_store and hardlinked into the run folders; each full run folder
+only holds the files that are new since the previous run, and its manifest.json lists them all
+(see log_snapshot.py to restore a complete run).
+Runs are started in-process with evaluation_script.start_experiment; --concurrent_runs N keeps N runs
+in flight, each on its own --num_parallel servers.
 
 """
 
 
-def extract_result_single_agent(folder_path):
-    folder_name = os.path.basename(folder_path)
-    json_files = glob.glob(os.path.join(folder_path, "*.json"))
-    if not json_files:
-        print(f"No JSON files found in {folder_name}")
-        return None
-    else:
-        outcome = False
-        for json_file in json_files:
-            outcome = analyze_json_file(json_file)
-            if outcome:
-                return True
-        return False
-
-
-def identify_success_folders(download_dir, num_agents):
-    folders = get_immediate_subdirectories(download_dir)
-    
-    if num_agents == 1:
-        extract_result_fn = extract_result_single_agent
-    else:
-        extract_result_fn = extract_result
-    
-    total = 0
-    successful = 0
-    successful_exp_list = []
-    
-    for folder_path in tqdm.tqdm(folders):
-        folder_name = os.path.basename(folder_path)
-
-        try: 
-            total += 1
-            success = int(extract_result_fn(folder_path))
-            successful += success
-            if success:
-                successful_exp_list.append(folder_path)
-        except Exception as e:
-            print(f"Error processing {folder_name}: {e}")
-    
-    return successful_exp_list
+def save_run_logs(handle, run_id, store, results_db, successful_dir, full_run_logs_dir):
+    """Record a finished experiment in the results table and snapshot its agents' logs."""
+    bots_dir_path = Path(BOTS_DIR)
+    bot_dirs = [bots_dir_path / agent for agent in handle.agent_names if (bots_dir_path / agent).exists()]
+
+    # Record the runs once; successful logs are then a query on the results table
+    results_index.record_experiment(results_db, handle.experiments_folder, handle.task_ids, bots_dir=BOTS_DIR,
+                                   task_type=handle.info.get("task_type"))
+    successful = results_index.successful_runs(results_db, experiment=handle.exp_name)
+
+    # Save successful logs and results (read from project_root/bots, write to tasks/successful_...)
+    success_output_dir = successful_dir / run_id
+    success_output_dir.mkdir(parents=True, exist_ok=True)
+    sources = {}
+    seen = set()
+    for row in successful:
+        if (row["agent"], row["task_id"]) in seen:
+            continue
+        seen.add((row["agent"], row["task_id"]))
+        # Add timestamp for uniqueness
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        sources[f"{row['agent']}_{timestamp}_{row['task_id']}"] = row["log_dir"]
+    # Hardlink the logs from the store instead of copying them
+    store.snapshot(sources, success_output_dir, run_id=run_id, only_new=False)
+    print(f"Saved {len(sources)} successful log directories to {success_output_dir}")
+
+    # Snapshot full logs into the full logs dir (read from project_root/bots, write to tasks/full_...);
+    # only files that changed since the previous run are linked, the manifest lists all of them
+    full_logs_dir = full_run_logs_dir / run_id
+    manifest = store.snapshot({bot_dir.name: str(bot_dir) for bot_dir in bot_dirs}, full_logs_dir, run_id=run_id)
+    print(f"Snapshot of {len(bot_dirs)} agent directories in {full_logs_dir}: "
+          f"{len(manifest['new_files'])} new of {len(manifest['files'])} files "
+          f"({manifest['new_bytes'] / 1e6:.1f} MB)")
 
 
 def run_data_collection(args):
@@ -86,12 +85,13 @@ def run_data_collection(args):
     FULL_RUN_LOGS_DIR = Path(os.path.join(tasks_dir, f"full_run_logs_{timestamp_str}"))
     # Input/state dirs (relative to project root)
     logs_dir_path = Path(LOGS_DIR)
-    experiments_dir_path = Path(EXPERIMENTS_DIR)
     bots_dir_path = Path(BOTS_DIR)
     
     logs_dir_path.mkdir(exist_ok=True) 
     SUCCESSFUL_DIR.mkdir(exist_ok=True)
     FULL_RUN_LOGS_DIR.mkdir(exist_ok=True)
+    store = SnapshotStore(args.log_store)
+    results_db = results_index.connect(args.results_db)
 
     # Parse tasks and repetitions, ensuring paths are relative to project root
     TASKS_TO_RUN = []
@@ -111,88 +111,73 @@ def run_data_collection(args):
         if bot_dir.name.startswith(("Andy_", "Jill_", "agent_")):
             shutil.rmtree(bot_dir)
 
-    # Resolve eval_script path
-    eval_script_path = args.eval_script
-    if not os.path.isabs(eval_script_path):
-        eval_script_path = os.path.join(project_root, eval_script_path)
+    # evaluation_script works with paths relative to the project root
+    os.chdir(project_root)
+    if not args.no_launch_world:
+        subprocess.run(["tmux", "kill-server"])
+        clean_up_server_files(args.num_parallel * args.concurrent_runs)
 
-    run_counter = 1
+    pending = []
     for task_path, repeats in TASKS_TO_RUN:
         for rep in range(repeats):
-            run_id = f"run_{run_counter:03d}"
+            pending.append((task_path, rep, repeats, f"run_{len(pending) + 1:03d}"))
+
+    # every concurrent run gets its own server slots (ports, tmux sessions and agents)
+    active = {}
+    while pending or active:
+        for slot in range(args.concurrent_runs):
+            if slot in active or not pending:
+                continue
+            task_path, rep, repeats, run_id = pending.pop(0)
             print(f"\n Starting {task_path} (rep {rep + 1}/{repeats}) -> {run_id}")
-
-            # Track start time to locate experiment folder
-            # Ensure EXPERIMENTS_DIR is treated as Path object if needed
-            before = set(experiments_dir_path.glob("*"))
-
-            # Run evaluation using the resolved eval_script_path
-            # Run from project root
-            subprocess.run([
-                "python", eval_script_path,
-                "--api", args.api,
-                "--model", args.model,
-                "--task_path", task_path, # task_path is already absolute or resolved
-                "--num_agents", str(args.num_agents),
-                "--num_parallel", str(args.num_parallel)
-            ], check=True, cwd=project_root)
-
-            # Wait for experiment folder to appear in project_root/experiments/
-            time.sleep(20)  # avoid race condition
-            after = set(experiments_dir_path.glob("*"))
-            new_experiments = list(after - before)
-            assert len(new_experiments) == 1, f"Expected one new experiment folder, found {len(new_experiments)}"
-            experiment_dir = new_experiments[0]
-
-            print(f"Found experiment folder: {experiment_dir}")
-            
-            # Identify successful experiments from project_root/experiments/...
-            successful_exp_list = identify_success_folders(experiment_dir, args.num_agents)
-            
-            # Save successful logs and results (read from project_root/bots, write to tasks/successful_...)
-            success_output_dir = SUCCESSFUL_DIR / run_id
-            success_output_dir.mkdir(parents=True, exist_ok=True)
-            # Identify the ones that are successful
-            for exp_path in successful_exp_list:
-                exp_name = os.path.basename(exp_path)
-                # For each agent, find and copy their logs for this successful experiment
-                for bot_dir in bots_dir_path.glob("*"):
-                    if bot_dir.name.startswith(("Andy_", "Jill_", "agent_")):
-                        agent_logs_dir = bot_dir / "logs"
-                        if agent_logs_dir.exists():
-                            # Look for the experiment directory directly under logs
-                            exp_dir = agent_logs_dir / exp_name
-                            if exp_dir.exists():
-                                # Add timestamp for uniqueness
-                                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                                dest_dir = success_output_dir / f"{bot_dir.name}_{timestamp}_{exp_name}"
-                                shutil.copytree(exp_dir, dest_dir)
-                                print(f"Copied successful log directory: {exp_dir} -> {dest_dir}")
-            
-            # Move full logs to the full logs dir (read from project_root/bots, write to tasks/full_...)
-            full_logs_dir = FULL_RUN_LOGS_DIR / run_id
-            full_logs_dir.mkdir(parents=True, exist_ok=True)
-            for bot_dir in bots_dir_path.glob("*"):
-                if bot_dir.name.startswith(("Andy_", "Jill_", "agent_")):
-                    # bot_dir is already the full path, no need for agent_dir
-                    dest_dir = full_logs_dir / bot_dir.name
-                    if bot_dir.exists():
-                        shutil.copytree(bot_dir, dest_dir, dirs_exist_ok=True)
-                        print(f"Copied full agent directory for {bot_dir.name} to {dest_dir}")
-
-            run_counter += 1
+            handle = start_experiment(task_path,
+                                      num_exp=1,
+                                      exp_name=args.exp_name,
+                                      num_agents=args.num_agents,
+                                      model=args.model,
+                                      api=args.api,
+                                      num_parallel=args.num_parallel,
+                                      template_profile=args.template_profile,
+                                      url=args.url,
+                                      run_in_tmux=not args.no_launch_world,
+                                      server_offset=slot * args.num_parallel)
+            print(f"Experiment folder: {handle.experiments_folder}")
+            active[slot] = (handle, run_id, time.time())
+
+        for slot, (handle, run_id, started) in list(active.items()):
+            timed_out = args.run_timeout is not None and time.time() - started > args.run_timeout
+            if not handle.is_done() and not timed_out:
+                continue
+            if timed_out:
+                print(f"{run_id} timed out after {args.run_timeout} seconds, collecting partial results")
+            print(f"{run_id} finished: {handle.write_results()}")
+            handle.stop()
+            save_run_logs(handle, run_id, store, results_db, SUCCESSFUL_DIR, FULL_RUN_LOGS_DIR)
+            del active[slot]
+
+        if active:
+            time.sleep(args.poll_interval)
 
     print("\nAll evaluations done and successful runs saved.")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run multiple evaluations and collect successful logs")
-    parser.add_argument("--eval_script", default="tasks/evaluation_script.py", help="Path to evaluation script relative to project root")
     parser.add_argument("--api", default="vllm", help="API to use")
     parser.add_argument("--model", default="meta-llama/Meta-Llama-3-8B-Instruct", help="Model to use")
     parser.add_argument("--num_agents", type=int, default=2, help="Number of agents")
     parser.add_argument("--num_parallel", type=int, default=2, help="Number of parallel runs")
     parser.add_argument("--tasks", nargs="+", default=["tasks/crafting_tasks/test_tasks/tasks_2_agents.json:2"], 
                         help="Tasks to run in format 'path:repeats'")
+    parser.add_argument("--log_store", default=LOG_STORE_DIR, help="Content-addressed store for log snapshots")
+    parser.add_argument("--results_db", default=results_index.DEFAULT_DB, help="Results table the runs are recorded in")
+    parser.add_argument("--concurrent_runs", type=int, default=1,
+                        help="Number of task file runs in flight at once, each on its own num_parallel servers")
+    parser.add_argument("--exp_name", default="exp", help="Name prefix of the experiment folders")
+    parser.add_argument("--template_profile", default="profiles/tasks/crafting_profile.json", help="Profile template for the agents")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/v1")
+    parser.add_argument("--no_launch_world", action="store_true", help="Use already running Minecraft servers")
+    parser.add_argument("--poll_interval", type=int, default=10, help="Seconds between progress checks")
+    parser.add_argument("--run_timeout", type=int, default=None, help="Give up on a run after this many seconds")
     
     args = parser.parse_args()
     run_data_collection(args)
@@ -0,0 +1,271 @@
+"""
+Run the tasks of a task file in parallel across several Minecraft servers.
+
+Each server (port) is a slot running one task at a time with its own copies of the agent
+profiles (agent names get a _<slot> suffix, so bots/<agent>/ folders do not clash).
+Tasks with human players are only started when every participant is free: usernames
+listed in a task are booked for the whole run, and tasks that need more humans than they
+list are filled from the --usernames pool. Every task gets a wall-clock timeout (its own
+timeout plus --grace, or --timeout), failures and timeouts are recorded and the runner
+moves on. Agent memories are saved to <output_dir>/<task_id>/<agent>_<n>.json as in
+evaluation_script.py, and per-task outcomes are written to <output_dir>/results.json after
+every task.
+
+Example usage:
+python tasks/parallel_task_runner.py --task_path tasks/construction_tasks/human_ai/2_agent_1_human.json \\
+    --servers 55916 55917 --profiles ./andy.json ./jill.json --usernames alice bob
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import task_store
+from results_index import is_success
+from task_outcomes import task_score
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# same mapping from server port to mindserver port as launch_server_experiment
+BASE_PORT = 55916
+BASE_MINDSERVER_PORT = 8080
+
+
+def parse_server(spec):
+    """Parse "port" or "port:mindserver_port"."""
+    port, _, mindserver_port = str(spec).partition(":")
+    port = int(port)
+    return port, int(mindserver_port) if mindserver_port else port - BASE_PORT + BASE_MINDSERVER_PORT
+
+
+def make_slot_profiles(profiles, slot, profile_dir):
+    """Copy agent profiles for one slot with the agent names suffixed by the slot; returns (paths, names)."""
+    os.makedirs(profile_dir, exist_ok=True)
+    paths, names = [], []
+    for profile_path in profiles:
+        with open(os.path.join(PROJECT_ROOT, profile_path), "r") as f:
+            profile = json.load(f)
+        profile["name"] = f"{profile['name']}_{slot}"
+        path = os.path.join(profile_dir, f"{profile['name']}.json")
+        with open(path, "w") as f:
+            json.dump(profile, f, indent=4)
+        paths.append(path)
+        names.append(profile["name"])
+    return paths, names
+
+
+class HumanScheduler:
+    """Hands out tasks so that no human participant is booked for two tasks at once."""
+
+    def __init__(self, tasks, pool=()):
+        self.pending = list(tasks)  # [(task_id, task)]
+        self.pool = list(pool)
+        self.busy = set()
+        self.running = 0
+        self.condition = threading.Condition()
+
+    def _humans_for(self, task):
+        """Return the usernames to book for a task, or None if they are not all free."""
+        required = list(task.get("usernames") or [])
+        if any(name in self.busy for name in required):
+            return None
+        missing = task.get("human_count", 0) - len(required)
+        if missing > 0:
+            free = [name for name in self.pool if name not in self.busy and name not in required]
+            if len(free) < missing:
+                return None
+            required += free[:missing]
+        return required
+
+    def next_task(self):
+        """Block until a task can start; returns (task_id, task, usernames) or None when no tasks are left."""
+        with self.condition:
+            while True:
+                for i, (task_id, task) in enumerate(self.pending):
+                    humans = self._humans_for(task)
+                    if humans is not None:
+                        del self.pending[i]
+                        self.busy.update(humans)
+                        self.running += 1
+                        return task_id, task, humans
+                if not self.pending or self.running == 0:
+                    # nothing can be scheduled anymore: either done or every remaining task lacks people
+                    return None
+                self.condition.wait()
+
+    def release(self, humans):
+        with self.condition:
+            self.busy.difference_update(humans)
+            self.running -= 1
+            self.condition.notify_all()
+
+
+class ParallelTaskRunner:
+    """Runs one task file on several servers, one worker thread per server."""
+
+    def __init__(self, task_path, servers, profiles, output_dir, usernames=(), timeout=None, grace=120,
+                 delay=2, env=None):
+        self.task_path = os.path.abspath(task_path)
+        self.servers = [parse_server(s) for s in servers]
+        self.profiles = profiles
+        self.output_dir = os.path.abspath(output_dir)
+        self.timeout = timeout
+        self.grace = grace
+        self.delay = delay
+        self.env = env or {}
+        self.results = []
+        self.results_lock = threading.Lock()
+        tasks = [(task_id, task_store.read_task(self.task_path, task_id)) for task_id in task_store.task_ids(self.task_path)]
+        self.scheduler = HumanScheduler(tasks, usernames)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def task_timeout(self, task):
+        if self.timeout is not None:
+            return self.timeout
+        return task.get("timeout", 300) + self.grace
+
+    def _write_task_file(self, task_id, task, humans, slot):
+        """Write a single-task file with the booked usernames for main.js."""
+        task = dict(task)
+        if humans:
+            task["usernames"] = humans
+        path = os.path.join(self.output_dir, "task_files", f"{task_id}_{slot}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({task_id: task}, f, indent=4)
+        return path
+
+    def run_task(self, slot, task_id, task, humans, profile_paths, agent_names):
+        port, mindserver_port = self.servers[slot]
+        task_file = self._write_task_file(task_id, task, humans, slot)
+        cmd = ["node", "main.js", "--task_path", task_file, "--task_id", task_id]
+        if profile_paths:
+            cmd += ["--profiles", *profile_paths]
+        env = {**os.environ, **self.env, "MINECRAFT_PORT": str(port), "MINDSERVER_PORT": str(mindserver_port)}
+        if humans:
+            print(f"[slot {slot}] {', '.join(humans)}: join the server on port {port} for task {task_id}")
+        print(f"[slot {slot}] Running task {task_id} on port {port}")
+
+        # memories left by the previous task on this slot must not be scored for this one
+        for agent in agent_names:
+            memory = os.path.join(PROJECT_ROOT, "bots", agent, "memory.json")
+            if os.path.exists(memory):
+                os.remove(memory)
+
+        started = time.time()
+        outcome = {"task_id": task_id, "slot": slot, "port": port, "usernames": humans,
+                   "started": datetime.now().isoformat()}
+        timeout = self.task_timeout(task)
+        # own process group, so a timeout also stops the agent processes main.js starts
+        process = subprocess.Popen(cmd, cwd=PROJECT_ROOT, env=env, start_new_session=True)
+        try:
+            outcome["returncode"] = process.wait(timeout=timeout)
+            outcome["timed_out"] = False
+        except subprocess.TimeoutExpired:
+            print(f"[slot {slot}] Task {task_id} timed out after {timeout} seconds")
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+            outcome["returncode"] = process.returncode
+            outcome["timed_out"] = True
+        outcome["duration"] = round(time.time() - started, 1)
+
+        # save agent memories the way run_script does, and score this attempt by the best
+        # score its agents reported (construction scores are percentages of the blueprint)
+        task_folder = os.path.join(self.output_dir, task_id)
+        os.makedirs(task_folder, exist_ok=True)
+        attempt = len([f for f in os.listdir(task_folder) if f.endswith(".json")]) // max(1, len(agent_names))
+        scores = []
+        for agent in agent_names:
+            memory = os.path.join(PROJECT_ROOT, "bots", agent, "memory.json")
+            if os.path.exists(memory):
+                saved = os.path.join(task_folder, f"{agent}_{attempt}.json")
+                shutil.copy(memory, saved)
+                try:
+                    with open(saved, "r") as f:
+                        scores.append(task_score(json.load(f)))
+                except json.JSONDecodeError:
+                    print(f"Error: Invalid JSON format in: {saved}")
+        scores = [score for score in scores if score is not None]
+        outcome["score"] = max(scores) if scores else None
+        outcome["success"] = is_success(outcome["score"], task.get("type"))
+        return outcome
+
+    def _record(self, outcome):
+        with self.results_lock:
+            self.results.append(outcome)
+            tmp_path = os.path.join(self.output_dir, "results.json.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"task_path": self.task_path, "results": self.results}, f, indent=4)
+            os.replace(tmp_path, os.path.join(self.output_dir, "results.json"))
+
+    def _worker(self, slot):
+        if self.profiles:
+            profile_paths, agent_names = make_slot_profiles(self.profiles, slot, os.path.join(self.output_dir, "profiles"))
+        else:
+            profile_paths, agent_names = [], []
+        while True:
+            scheduled = self.scheduler.next_task()
+            if scheduled is None:
+                return
+            task_id, task, humans = scheduled
+            try:
+                outcome = self.run_task(slot, task_id, task, humans, profile_paths, agent_names)
+            except Exception as e:
+                print(f"[slot {slot}] Task {task_id} failed: {e}")
+                outcome = {"task_id": task_id, "slot": slot, "usernames": humans, "error": str(e)}
+            finally:
+                self.scheduler.release(humans)
+            self._record(outcome)
+            time.sleep(self.delay)
+
+    def run(self):
+        threads = [threading.Thread(target=self._worker, args=(slot,), daemon=True) for slot in range(len(self.servers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for task_id, _ in self.scheduler.pending:
+            print(f"Not run: {task_id} needs more human players than are available")
+            self._record({"task_id": task_id, "error": "not enough human players available"})
+        return self.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the tasks of a task file in parallel across servers")
+    parser.add_argument("--task_path", required=True, help="Path to the task file")
+    parser.add_argument("--servers", nargs="+", default=[str(BASE_PORT)],
+                        help="Minecraft server ports, optionally port:mindserver_port, one task at a time each")
+    parser.add_argument("--profiles", nargs="+", help="Agent profile paths (copied per server with suffixed names)")
+    parser.add_argument("--usernames", nargs="*", default=[], help="Human players available for tasks that need more than they list")
+    parser.add_argument("--output_dir", default=None, help="Where agent memories and results.json go")
+    parser.add_argument("--timeout", type=int, default=None, help="Wall-clock seconds per task (default: task timeout + grace)")
+    parser.add_argument("--grace", type=int, default=120, help="Seconds added to a task's own timeout")
+    parser.add_argument("--delay", type=int, default=2, help="Delay in seconds between tasks on the same server")
+    parser.add_argument("--insecure_coding", action="store_true", help="Enable insecure coding")
+    args = parser.parse_args()
+
+    if len(args.servers) > 1 and not args.profiles:
+        parser.error("--profiles is required with more than one server, so every server gets its own agents")
+    output_dir = args.output_dir or os.path.join(
+        PROJECT_ROOT, "experiments", f"parallel_{datetime.now().strftime('%m-%d_%H-%M')}")
+    env = {"INSECURE_CODING": "true"} if args.insecure_coding else {}
+
+    runner = ParallelTaskRunner(args.task_path, args.servers, args.profiles, output_dir, args.usernames,
+                                args.timeout, args.grace, args.delay, env)
+    print(f"Running {len(runner.scheduler.pending)} tasks from {args.task_path} on {len(runner.servers)} servers")
+    results = runner.run()
+    completed = sum(1 for r in results if r.get("returncode") == 0 and not r.get("timed_out"))
+    successful = sum(1 for r in results if r.get("success"))
+    print(f"Completed {completed}/{len(results)} tasks, {successful} successful; results in {output_dir}/results.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Convert prompt logs into chat-format training data.
+
+With log_all_prompts enabled, Prompter._saveLog writes one <tag>_<timestamp>.txt per LLM
+call under bots/<agent>/logs/<task_id>/, in a "Prompt:/Conversation:/Response:" text layout
+(the data collector copies these folders to successful_run_logs_*/run_NNN/<agent>_<time>_<task_id>/).
+Each call becomes one JSONL record:
+
+{"messages": [{"role": "system", ...}, <conversation turns>, {"role": "assistant", ...}],
+ "tag": "conversation", "task_id": ..., "agent": ..., "timestamp": ..., "score": ..., "success": ...}
+
+score is the best result of the task over the given experiment folders (None when the
+task has no result there). Files are parsed in a process pool in bounded batches and the
+records are streamed into gzip-compressed shards of bounded size, so memory use does not
+depend on the number of log files.
+
+Example usage:
+python tasks/prompt_log_converter.py bots tasks/successful_run_logs_2025-01-01_120000 \\
+    --experiments experiments/crafting_* --output_dir training_data --tags conversation
+"""
+import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from record_io import DEFAULT_SHARD_BYTES, ShardWriter
+from task_outcomes import collect_outcomes
+
+ENTRY_PATTERN = re.compile(r"^\[(?P<timestamp>[^\]\n]*)\] ?(?:Task ID: (?P<task_id>[^\n]*))?\nPrompt:\n", re.MULTILINE)
+CONVERSATION_MARKER = "\n\nConversation:\n"
+RESPONSE_MARKER = "\n\nResponse:\n"
+FILE_PATTERN = re.compile(r"^(?P<tag>[A-Za-z]+)_\d{4}-\d{2}-\d{2}T[\d-]+Z\.txt$")
+# <agent>_<%Y%m%d_%H%M%S_%f>_<task_id>, as named by multi_data_collection_script.py
+COLLECTED_DIR_PATTERN = re.compile(r"^(?P<agent>.+?)_\d{8}_\d{6}_\d+_(?P<task_id>.+)$")
+
+_decoder = json.JSONDecoder()
+
+
+def parse_entry(text):
+    """Split the body of one log entry into (prompt, conversation turns, response), or None."""
+    start = 0
+    while True:
+        marker = text.find(CONVERSATION_MARKER, start)
+        if marker < 0:
+            return None
+        # the prompt is free text, so take the first marker followed by a valid JSON conversation
+        body = marker + len(CONVERSATION_MARKER)
+        try:
+            turns, end = _decoder.raw_decode(text, body)
+        except json.JSONDecodeError:
+            start = marker + 1
+            continue
+        if text.startswith(RESPONSE_MARKER, end):
+            response = text[end + len(RESPONSE_MARKER):]
+            if response.endswith("\n\n"):
+                response = response[:-2]
+            return text[:marker], turns, response
+        start = marker + 1
+
+
+def _path_info(path):
+    """Return (agent, task_id) from the location of a log file."""
+    folder = os.path.dirname(os.path.abspath(path))
+    parent = os.path.dirname(folder)
+    if os.path.basename(parent) == "logs":
+        return os.path.basename(os.path.dirname(parent)), os.path.basename(folder)
+    if os.path.basename(folder) == "logs":
+        return os.path.basename(parent), None
+    match = COLLECTED_DIR_PATTERN.match(os.path.basename(folder))
+    if match:
+        return match.group("agent"), match.group("task_id")
+    return None, os.path.basename(folder)
+
+
+def _to_message(turn):
+    if isinstance(turn, dict) and "role" in turn:
+        return {"role": turn["role"], "content": turn.get("content", "")}
+    return {"role": "user", "content": turn if isinstance(turn, str) else json.dumps(turn)}
+
+
+def parse_log_file(path):
+    """Return the chat records of one prompt log file (usually one, more if entries were appended)."""
+    match = FILE_PATTERN.match(os.path.basename(path))
+    tag = match.group("tag") if match else None
+    agent, folder_task_id = _path_info(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+
+    headers = list(ENTRY_PATTERN.finditer(text))
+    records = []
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        parsed = parse_entry(text[header.end():end])
+        if parsed is None:
+            continue
+        prompt, turns, response = parsed
+        if not isinstance(turns, list):
+            turns = [turns]
+        messages = [{"role": "system", "content": prompt}] + [_to_message(t) for t in turns]
+        messages.append({"role": "assistant", "content": response})
+        records.append({
+            "messages": messages,
+            "tag": tag,
+            "task_id": (header.group("task_id") or "").strip() or folder_task_id,
+            "agent": agent,
+            "timestamp": header.group("timestamp"),
+            "source": path,
+        })
+    return records
+
+
+def _parse_batch(paths):
+    records, failed = [], 0
+    for path in paths:
+        try:
+            records.extend(parse_log_file(path))
+        except (OSError, UnicodeError) as e:
+            print(f"Error reading {path}: {e}")
+            failed += 1
+    return records, failed
+
+
+def iter_log_files(roots, tags=None):
+    """Lazily yield prompt log files (<tag>_<timestamp>.txt) under the given directories."""
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                match = FILE_PATTERN.match(filename)
+                if match and (not tags or match.group("tag") in tags):
+                    yield os.path.join(dirpath, filename)
+
+
+def convert_logs(roots, output_dir, outcomes=None, tags=None, success_score=1.0, only_successful=False,
+                 max_shard_bytes=DEFAULT_SHARD_BYTES, workers=None, batch_size=256):
+    """
+    Convert every prompt log under roots into gzip JSONL shards in output_dir.
+
+    Args:
+        outcomes: {task_id: [score, ...]} from past experiments, used for the success label.
+        success_score: Minimum score counted as success (e.g. 100 for construction tasks).
+        only_successful: Drop records whose task was not successful.
+
+    Returns:
+        Summary dict, also written to output_dir/summary.json.
+    """
+    outcomes = outcomes or {}
+    files = iter_log_files(roots, tags)
+    batches = iter(lambda: list(islice(files, batch_size)), [])
+    stats = {"files": 0, "failed_files": 0, "records": 0, "skipped_records": 0}
+
+    workers = workers or os.cpu_count() or 1
+    # at most this many batches are parsed or waiting to be written at any time
+    max_in_flight = 2 * workers
+    with ShardWriter(output_dir, max_bytes=max_shard_bytes) as writer, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for batch in batches:
+            pending[executor.submit(_parse_batch, batch)] = len(batch)
+            while len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats["files"] += pending.pop(future)
+                    _write_records(future.result(), writer, outcomes, success_score, only_successful, stats)
+        for future in list(pending):
+            stats["files"] += pending.pop(future)
+            _write_records(future.result(), writer, outcomes, success_score, only_successful, stats)
+
+    summary = {**stats, "shards": writer.shards}
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def _write_records(result, writer, outcomes, success_score, only_successful, stats):
+    records, failed = result
+    stats["failed_files"] += failed
+    for record in records:
+        scores = outcomes.get(record["task_id"])
+        record["score"] = max(scores) if scores else None
+        record["success"] = None if record["score"] is None else record["score"] >= success_score
+        if only_successful and not record["success"]:
+            stats["skipped_records"] += 1
+            continue
+        writer.write(record)
+        stats["records"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert prompt logs into chat-format JSONL training shards")
+    parser.add_argument("roots", nargs="+", help="Directories with prompt logs (bots, successful_run_logs_*, ...)")
+    parser.add_argument("--output_dir", required=True)
+    parser.add_argument("--experiments", nargs="*", default=[], help="Experiment folders for the success labels")
+    parser.add_argument("--tags", nargs="*", default=None, help="Only convert these log tags (e.g. conversation coding)")
+    parser.add_argument("--success_score", type=float, default=1.0,
+                        help="Minimum task score counted as success (use 100 for construction tasks)")
+    parser.add_argument("--only_successful", action="store_true", help="Drop records of unsuccessful tasks")
+    parser.add_argument("--max_shard_mb", type=int, default=DEFAULT_SHARD_BYTES // (1024 * 1024))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    experiment_dirs = [d for pattern in args.experiments for d in sorted(glob.glob(pattern))]
+    outcomes = collect_outcomes(experiment_dirs)
+    summary = convert_logs(args.roots, args.output_dir, outcomes, args.tags, args.success_score,
+                           args.only_successful, args.max_shard_mb * 1024 * 1024, args.workers)
+    print(f"Converted {summary['files']} log files into {summary['records']} records "
+          f"({summary['skipped_records']} skipped, {summary['failed_files']} unreadable) "
+          f"in {len(summary['shards'])} shards under {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Reading and writing the JSONL training record shards.
+
+prompt_log_converter.py and dedup_training_data.py write records with ShardWriter, and
+dedup_training_data.py and dataset_writer.py read them back with iter_records. Only the
+standard library is used, so the offline stages do not pull in the experiment runner's
+dependencies.
+"""
+import gzip
+import json
+import os
+
+DEFAULT_SHARD_BYTES = 256 * 1024 * 1024
+
+
+def iter_records(paths):
+    """Lazily yield the records of JSONL files (gzip-compressed if the name ends in .gz)."""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class ShardWriter:
+    """Write JSONL records into gzip shards of at most max_bytes (uncompressed) each."""
+
+    def __init__(self, output_dir, prefix="prompts", max_bytes=DEFAULT_SHARD_BYTES):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.shards = []
+        self._file = None
+        self._size = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        if self._file is None or (self._size and self._size + len(line) > self.max_bytes):
+            self._open_next()
+        self._file.write(line)
+        self._size += len(line)
+        self.shards[-1]["records"] += 1
+
+    def _open_next(self):
+        self.close()
+        path = os.path.join(self.output_dir, f"{self.prefix}-{len(self.shards):05d}.jsonl.gz")
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._size = 0
+        self.shards.append({"path": path, "records": 0})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,270 @@
+"""
+Incrementally rebuild the analysis reports for the whole experiments/ tree.
+
+analyze_crafting_tasks.py re-reads every agent file on every run; analyze_cooking_tasks.py
+runs this builder. The builder caches the outcome of each task folder together with a
+fingerprint of the folder's .json files (names, sizes and mtimes, or content hashes with
+--hash), and the aggregates of each experiment together with a digest of its task folders'
+fingerprints.
+On a rebuild only task folders whose fingerprint changed are re-analyzed, only experiments
+whose digest changed are re-aggregated, and only reports whose inputs changed are
+rewritten (a report that was changed by something else since is rewritten as well):
+
+    crafting_analysis_<experiment>_results.txt / _tables.txt   one pair per crafting experiment
+    cooking_analysis.csv                                         success by experiment, item and blocked agents
+
+Experiments are the folders directly under --experiments_dir, including experiments packed
+by experiment_archive.py (<exp>.archive is reported as <exp>, and read from <exp> as long
+as that folder still exists); an experiment is a cooking experiment if it has
+multiagent_cooking_* task folders, construction experiments are skipped and everything
+else is analyzed as crafting. The cache is kept in <output_dir>/report_cache.json.
+
+Example usage:
+python tasks/report_builder.py --experiments_dir experiments
+python tasks/report_builder.py --experiments_dir experiments --only crafting_06-01_10-00 --hash
+"""
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+
+import pandas as pd
+
+import analyze_cooking_tasks as cooking
+from analyze_crafting_tasks import (aggregate_outcomes as aggregate_crafting, analysis_output_dir,
+                                    create_pretty_tables, extract_result as crafting_result, project_root)
+from experiment_archive import ARCHIVE_SUFFIX, INDEX_NAME, archive_task, is_archive, task_folders
+
+CACHE_NAME = "report_cache.json"
+CACHE_VERSION = 2
+
+
+def fingerprint(folder, use_hash=False):
+    """Fingerprint of the .json files of a task folder (the only files the analyzers read)."""
+    archived = archive_task(folder)
+    if archived is not None:
+        # packed files do not change: their place in the archive (and when it was packed) identifies them
+        archive, task_id = archived
+        files = [os.stat(os.path.join(archive.path, INDEX_NAME)).st_mtime_ns]
+        files += [[e["path"], e["shard"], e["offset"], e["line"]] for e in archive.task_files(task_id, r"\.json$")]
+        return hashlib.sha1(json.dumps(files).encode("utf-8")).hexdigest()
+    files = []
+    with os.scandir(folder) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_file() and entry.name.endswith(".json"):
+                if use_hash:
+                    with open(entry.path, "rb") as f:
+                        files.append([entry.name, hashlib.sha1(f.read()).hexdigest()])
+                else:
+                    stat = entry.stat()
+                    files.append([entry.name, stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha1(json.dumps(files).encode("utf-8")).hexdigest()
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def digest(items):
+    return hashlib.sha1(json.dumps(sorted(items)).encode("utf-8")).hexdigest()
+
+
+def experiment_kind(experiment_name, task_names):
+    if any(name.startswith("multiagent_cooking_") for name in task_names):
+        return "cooking"
+    if "construction" in experiment_name:
+        return None
+    return "crafting"
+
+
+class ReportBuilder:
+    """Keeps per-folder outcomes and per-experiment aggregates cached between runs."""
+
+    def __init__(self, experiments_dir, output_dir=analysis_output_dir, use_hash=False, force=False):
+        self.experiments_dir = os.path.abspath(experiments_dir)
+        self.output_dir = output_dir
+        self.use_hash = use_hash
+        self.cache_path = os.path.join(output_dir, CACHE_NAME)
+        os.makedirs(output_dir, exist_ok=True)
+        self.cache = {"version": CACHE_VERSION, "hash": use_hash, "folders": {}, "experiments": {}, "outputs": {}}
+        if not force and os.path.exists(self.cache_path):
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+            # fingerprints made with a different method never match, so start over
+            if cache.get("version") == CACHE_VERSION and cache.get("hash") == use_hash:
+                self.cache = cache
+        self.stats = Counter()
+
+    def folder_outcome(self, path, kind):
+        """Return (fingerprint, outcome) of a task folder, analyzing it only if it changed."""
+        folder_fingerprint = fingerprint(path, self.use_hash)
+        cached = self.cache["folders"].get(path)
+        if cached and cached["fingerprint"] == folder_fingerprint and cached["kind"] == kind:
+            self.stats["folders_cached"] += 1
+            return folder_fingerprint, cached["outcome"]
+        if kind == "cooking":
+            outcome = list(cooking.task_outcome(path))
+        else:
+            outcome = crafting_result(path)
+        self.cache["folders"][path] = {"fingerprint": folder_fingerprint, "kind": kind, "outcome": outcome}
+        self.stats["folders_analyzed"] += 1
+        return folder_fingerprint, outcome
+
+    def update_experiment(self, name, folder=None):
+        """
+        Bring the cached aggregate of one experiment up to date; returns its cache entry or None.
+        folder is the experiment's folder or archive under experiments_dir (default: name).
+        """
+        experiment_path = os.path.join(self.experiments_dir, folder or name)
+        task_names = [os.path.basename(path) for path in task_folders(experiment_path)]
+        kind = experiment_kind(name, task_names)
+        if kind == "cooking":
+            task_names = [d for d in task_names if d.startswith("multiagent_cooking_")]
+        if kind is None or not task_names:
+            return None
+
+        fingerprints, outcomes = [], {}
+        for task_name in task_names:
+            task_path = os.path.join(experiment_path, task_name)
+            folder_fingerprint, outcomes[task_path] = self.folder_outcome(task_path, kind)
+            fingerprints.append([task_name, folder_fingerprint])
+        # task folders removed since the last run
+        prefix = experiment_path + os.sep
+        for path in [p for p in self.cache["folders"] if p.startswith(prefix) and p not in outcomes]:
+            del self.cache["folders"][path]
+
+        experiment_digest = digest(fingerprints)
+        cached = self.cache["experiments"].get(name)
+        if cached and cached["digest"] == experiment_digest:
+            return cached
+
+        if kind == "cooking":
+            outcomes = {os.path.basename(path): outcome for path, outcome in outcomes.items()}
+            blocked_access, items, _, ignored = cooking.aggregate_outcomes(outcomes, name)
+            item_blocked, _ = cooking.aggregate_item_blocked(outcomes)
+            aggregate = {"blocked_access": dict(blocked_access), "items": dict(items),
+                         "item_blocked": {item: dict(groups) for item, groups in item_blocked.items()},
+                         "ignored": ignored}
+        else:
+            aggregate = aggregate_crafting(outcomes)
+        entry = {"kind": kind, "digest": experiment_digest, "aggregate": aggregate}
+        self.cache["experiments"][name] = entry
+        self.stats["experiments_updated"] += 1
+        return entry
+
+    def _write(self, path, inputs_digest, write):
+        """
+        Run write(path) unless path was last written from the same inputs and still holds what
+        was written then (another script may have overwritten it since).
+        """
+        cached = self.cache["outputs"].get(path)
+        if cached and cached["inputs"] == inputs_digest and os.path.exists(path) and file_digest(path) == cached["sha1"]:
+            return
+        write(path)
+        self.cache["outputs"][path] = {"inputs": inputs_digest, "sha1": file_digest(path)}
+        self.stats["reports_written"] += 1
+
+    def write_crafting_reports(self, name, entry):
+        results = entry["aggregate"]
+        base = os.path.join(self.output_dir, f"crafting_analysis_{name}")
+
+        def write_results(path):
+            with open(path, "w") as file:
+                file.write("Results\n")
+                for key, value in results.items():
+                    file.write(f"{key}: {value}\n")
+
+        def write_tables(path):
+            with open(path, "w") as file:
+                file.write(create_pretty_tables(results))
+
+        self._write(f"{base}_results.txt", entry["digest"], write_results)
+        self._write(f"{base}_tables.txt", entry["digest"], write_tables)
+
+    def write_cooking_csv(self, entries):
+        rows = []
+        for name, entry in sorted(entries.items()):
+            for item, groups in sorted(entry["aggregate"]["item_blocked"].items()):
+                for blocked_key, counts in sorted(groups.items()):
+                    rows.append({"experiment": name, "cooking_item": item, "blocked_agents": blocked_key,
+                                 "success": counts["success"], "total": counts["total"],
+                                 "success_rate": counts["success"] / counts["total"] if counts["total"] else 0})
+
+        def write_csv(path):
+            pd.DataFrame(rows, columns=["experiment", "cooking_item", "blocked_agents", "success", "total",
+                                        "success_rate"]).to_csv(path, index=False)
+
+        self._write(os.path.join(self.output_dir, "cooking_analysis.csv"),
+                    digest([[name, entry["digest"]] for name, entry in entries.items()]), write_csv)
+
+    def experiment_folders(self):
+        """{experiment name: folder or archive under experiments_dir}; a folder wins over its archive."""
+        dirs = sorted(d for d in os.listdir(self.experiments_dir)
+                      if os.path.isdir(os.path.join(self.experiments_dir, d))
+                      and os.path.join(self.experiments_dir, d) != os.path.abspath(self.output_dir))
+        folders = {}
+        for d in dirs:
+            if d.endswith(ARCHIVE_SUFFIX) and is_archive(os.path.join(self.experiments_dir, d)):
+                name = d[:-len(ARCHIVE_SUFFIX)]
+                if name not in dirs:
+                    folders[name] = d
+            else:
+                folders[d] = d
+        return folders
+
+    def build(self, only=None):
+        folders = self.experiment_folders()
+        names = sorted(folders)
+        if only is None:
+            # experiments deleted since the last run
+            for name in [n for n in self.cache["experiments"] if n not in folders]:
+                del self.cache["experiments"][name]
+        for name in names:
+            if only is not None and name not in only:
+                continue
+            entry = self.update_experiment(name, folders[name])
+            if entry is None:
+                self.cache["experiments"].pop(name, None)
+            elif entry["kind"] == "crafting":
+                self.write_crafting_reports(name, entry)
+        if only is None:
+            # task folders of experiments that were deleted, or packed into an archive
+            current = {os.path.join(self.experiments_dir, folder) for folder in folders.values()}
+            for path in [p for p in self.cache["folders"] if os.path.dirname(p) not in current]:
+                del self.cache["folders"][path]
+
+        cooking_entries = {name: entry for name, entry in self.cache["experiments"].items() if entry["kind"] == "cooking"}
+        if cooking_entries:
+            self.write_cooking_csv(cooking_entries)
+
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.cache, f)
+        os.replace(tmp_path, self.cache_path)
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally rebuild the crafting and cooking analysis reports")
+    parser.add_argument("--experiments_dir", default="experiments",
+                        help="Folder of experiment folders (relative to project root)")
+    parser.add_argument("--output_dir", default=analysis_output_dir, help="Where reports and the cache are written")
+    parser.add_argument("--only", nargs="+", default=None, help="Only update these experiments")
+    parser.add_argument("--hash", action="store_true", help="Fingerprint agent files by content instead of size and mtime")
+    parser.add_argument("--force", action="store_true", help="Ignore the cache and rebuild everything")
+    args = parser.parse_args()
+
+    experiments_dir = args.experiments_dir
+    if not os.path.isabs(experiments_dir):
+        experiments_dir = os.path.join(project_root, experiments_dir)
+
+    stats = ReportBuilder(experiments_dir, args.output_dir, args.hash, args.force).build(args.only)
+    print(f"Analyzed {stats['folders_analyzed']} task folders ({stats['folders_cached']} unchanged), "
+          f"updated {stats['experiments_updated']} experiments, wrote {stats['reports_written']} report files "
+          f"to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
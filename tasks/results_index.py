@@ -0,0 +1,180 @@
+"""
+Persisted results table for experiment runs.
+
+Every (experiment, task_id, repetition, agent) gets one row in a SQLite table with the
+score the agent reported (construction scores are percentages of the blueprint), whether
+the repetition succeeded, the agent's saved memory file and the log
+directory it wrote to. The data collector records a run's rows as soon as the run has
+finished, so selecting successful trajectories later is an indexed query instead of
+re-parsing every experiment folder and walking every bot's logs/ directory.
+
+Example usage:
+python tasks/results_index.py record experiments/exp_06-01_10-00 --bots_dir bots --task_type techtree
+python tasks/results_index.py export --output_dir successful_logs --experiment exp_06-01_10-00
+python tasks/results_index.py summary
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+from task_outcomes import task_score
+from log_snapshot import SnapshotStore
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results_index.sqlite")
+# memory files are saved as <agent>_<repetition>.json by run_script in evaluation_script.py
+MEMORY_FILE_PATTERN = re.compile(r"^(?P<agent>.+)_(?P<rep>\d+)\.json$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    experiment TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    rep INTEGER NOT NULL,
+    agent TEXT NOT NULL,
+    score REAL,
+    success INTEGER NOT NULL,
+    memory_path TEXT NOT NULL,
+    log_dir TEXT,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (experiment, task_id, rep, agent)
+);
+CREATE INDEX IF NOT EXISTS runs_success ON runs (success, experiment);
+CREATE INDEX IF NOT EXISTS runs_task ON runs (task_id);
+"""
+
+
+def connect(db_path=DEFAULT_DB):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def memory_score(memory_path):
+    """Return the score reported in a saved agent memory, or None."""
+    try:
+        with open(memory_path, "r") as f:
+            return task_score(json.load(f))
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error reading {memory_path}: {e}")
+        return None
+
+
+def infer_task_type(name):
+    """Guess the task type from an experiment or task file name, as aggregate_results does."""
+    for task_type in ("cooking", "techtree", "construction"):
+        if task_type in name:
+            return task_type
+    return None
+
+
+def is_success(score, task_type):
+    """Construction tasks report the percentage of the blueprint built; other tasks report 0 or 1."""
+    if score is None:
+        return False
+    return score >= 100 if task_type == "construction" else score >= 1
+
+
+def record_experiment(conn, experiments_folder, task_ids=None, bots_dir="bots", task_type=None):
+    """
+    Record every saved run of an experiment folder. A repetition succeeds when any of its
+    agents reports a successful score for the task type (inferred from the folder name when
+    not given). Returns the number of rows written.
+    """
+    experiment = os.path.basename(os.path.normpath(experiments_folder))
+    task_type = task_type or infer_task_type(experiment)
+    if task_ids is None:
+        task_ids = [os.path.basename(f) for f in glob.glob(os.path.join(experiments_folder, "*")) if os.path.isdir(f)]
+    recorded_at = datetime.now().isoformat()
+
+    rows = []
+    for task_id in task_ids:
+        reps = {}
+        for memory_path in glob.glob(os.path.join(experiments_folder, str(task_id), "*.json")):
+            match = MEMORY_FILE_PATTERN.match(os.path.basename(memory_path))
+            if match:
+                reps.setdefault(int(match.group("rep")), []).append(
+                    (match.group("agent"), memory_score(memory_path), memory_path))
+        for rep, agents in reps.items():
+            success = int(any(is_success(score, task_type) for _, score, _ in agents))
+            for agent, score, memory_path in agents:
+                log_dir = os.path.join(bots_dir, agent, "logs", str(task_id))
+                rows.append((experiment, str(task_id), rep, agent, score, success, os.path.abspath(memory_path),
+                             os.path.abspath(log_dir) if os.path.isdir(log_dir) else None, recorded_at))
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def successful_runs(conn, experiment=None, task_id=None):
+    """Return the rows of successful repetitions that have a log directory."""
+    query = "SELECT * FROM runs WHERE success = 1 AND log_dir IS NOT NULL"
+    params = []
+    if experiment is not None:
+        query += " AND experiment = ?"
+        params.append(experiment)
+    if task_id is not None:
+        query += " AND task_id = ?"
+        params.append(task_id)
+    return conn.execute(query + " ORDER BY experiment, task_id, rep, agent", params).fetchall()
+
+
+def log_sources(rows):
+    """
+    Map successful rows to {<agent>_<experiment>_<task_id>: log_dir}. An agent's log
+    directory for a task holds all of its repetitions, so it is exported once.
+    """
+    sources = {}
+    for row in rows:
+        sources.setdefault(f"{row['agent']}_{row['experiment']}_{row['task_id']}", row["log_dir"])
+    return sources
+
+
+def export_successful(conn, output_dir, store_dir, experiment=None, task_id=None):
+    """Hardlink the logs of successful runs into output_dir through a snapshot store; returns the manifest."""
+    sources = log_sources(successful_runs(conn, experiment, task_id))
+    return SnapshotStore(store_dir).snapshot(sources, output_dir, run_id=experiment, only_new=False)
+
+
+def summary(conn):
+    return conn.execute(
+        "SELECT experiment, COUNT(DISTINCT task_id || ':' || rep) AS runs, "
+        "COUNT(DISTINCT CASE WHEN success = 1 THEN task_id || ':' || rep END) AS successful "
+        "FROM runs GROUP BY experiment ORDER BY experiment").fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record experiment results and export successful logs")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Results table (SQLite)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record = subparsers.add_parser("record", help="Record the runs of experiment folders")
+    record.add_argument("experiments", nargs="+")
+    record.add_argument("--bots_dir", default="bots")
+    record.add_argument("--task_type", choices=["techtree", "cooking", "construction"], default=None,
+                        help="Task type of the experiments (default: guessed from the folder name)")
+    export = subparsers.add_parser("export", help="Export the logs of successful runs")
+    export.add_argument("--output_dir", required=True)
+    export.add_argument("--experiment", default=None)
+    export.add_argument("--task_id", default=None)
+    export.add_argument("--log_store", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "log_store"))
+    subparsers.add_parser("summary", help="Show runs and successes per experiment")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.command == "record":
+        for experiments_folder in args.experiments:
+            count = record_experiment(conn, experiments_folder, bots_dir=args.bots_dir, task_type=args.task_type)
+            print(f"Recorded {count} agent runs from {experiments_folder}")
+    elif args.command == "export":
+        manifest = export_successful(conn, args.output_dir, args.log_store, args.experiment, args.task_id)
+        print(f"Exported {len(manifest['files'])} log files to {args.output_dir}")
+    else:
+        for row in summary(conn):
+            print(f"{row['experiment']}: {row['successful']}/{row['runs']} successful")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Lint task files before spending server time on them.
+
+Every task is checked against the task schema used by src/agent/tasks/tasks.js
+(initial_inventory and blocked_actions keyed by agent index for agent_count + human_count
+players, usernames for humans, per-type fields such as techtree targets and construction
+blueprints), and item and block names are checked against minecraft-data. Files are
+linted in a process pool and results are cached by file content hash, so re-linting an
+unchanged file is a lookup (the key also covers minecraft-data and the command
+definitions). launch_parallel_experiments runs the linter before it starts any servers and
+prints what it finds; with --strict_lint errors stop the launch.
+
+Example usage:
+python tasks/task_linter.py tasks/crafting_tasks/test_tasks/*.json
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from construction_tasks.blueprint_store import get_blueprint
+from crafting_tasks.tech_tree_generator import DEFAULT_DATA_DIR, DEFAULT_VERSION, REPO_ROOT
+
+# bump when checks change, so cached results are not reused
+LINT_VERSION = 1
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".task_lint_cache.json")
+COMMANDS_DIR = os.path.join(REPO_ROOT, "src", "agent", "commands")
+TASK_TYPES = {"techtree", "cooking", "construction", "debug"}
+COMMAND_PATTERN = re.compile(r"""name:\s*['"](![A-Za-z]+)['"]""")
+
+_names = None
+
+
+def load_names(version=DEFAULT_VERSION, data_dir=DEFAULT_DATA_DIR):
+    """
+    Return {"items", "blocks", "commands"} name sets. Name sets whose source is missing
+    are None and their checks are skipped.
+    """
+    names = {"items": None, "blocks": None, "commands": None}
+    data_paths_file = os.path.join(data_dir, "dataPaths.json")
+    if os.path.exists(data_paths_file):
+        with open(data_paths_file, "r") as f:
+            paths = json.load(f)["pc"].get(version)
+        if paths:
+            for key in ("items", "blocks"):
+                with open(os.path.join(data_dir, paths[key], f"{key}.json"), "r") as f:
+                    names[key] = {entry["name"] for entry in json.load(f)}
+    if os.path.isdir(COMMANDS_DIR):
+        commands = set()
+        for path in glob.glob(os.path.join(COMMANDS_DIR, "*.js")):
+            with open(path, "r") as f:
+                commands.update(COMMAND_PATTERN.findall(f.read()))
+        names["commands"] = commands
+    return names
+
+
+def _init_worker(version, data_dir):
+    global _names
+    _names = load_names(version, data_dir)
+
+
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def lint_task(task, names):
+    """Return [(level, message)] for one task; level is "error" or "warning"."""
+    problems = []
+
+    def error(message):
+        problems.append(("error", message))
+
+    def warning(message):
+        problems.append(("warning", message))
+
+    if not isinstance(task, dict):
+        return [("error", "task is not an object")]
+    if "goal" not in task:
+        error("missing goal")
+    task_type = task.get("type")
+    if task_type not in TASK_TYPES:
+        warning(f"unknown task type {task_type!r}")
+    if "timeout" in task and not (isinstance(task["timeout"], (int, float)) and task["timeout"] > 0):
+        error(f"timeout must be a positive number, got {task['timeout']!r}")
+
+    agent_count = task.get("agent_count")
+    if agent_count is None:
+        warning("missing agent_count")
+        agent_count = 1
+    elif not _is_count(agent_count):
+        error(f"agent_count must be a positive integer, got {agent_count!r}")
+        agent_count = 1
+    human_count = task.get("human_count", 0)
+    if not isinstance(human_count, int) or human_count < 0:
+        error(f"human_count must be a non-negative integer, got {human_count!r}")
+        human_count = 0
+    players = agent_count + human_count
+    player_keys = {str(i) for i in range(players)}
+
+    if human_count > 0:
+        usernames = task.get("usernames")
+        if not isinstance(usernames, list) or len(usernames) != human_count:
+            error(f"human_count is {human_count} but usernames is {usernames!r}")
+
+    items = names.get("items")
+    inventory = task.get("initial_inventory")
+    if inventory is not None:
+        if not isinstance(inventory, dict):
+            error("initial_inventory must map agent indices to inventories")
+        else:
+            bad_keys = [key for key in inventory if key not in player_keys]
+            if bad_keys:
+                error(f"initial_inventory keys {bad_keys} are not agent indices below {players} "
+                      f"(agent_count + human_count)")
+            for key, agent_inventory in inventory.items():
+                if key not in player_keys:
+                    continue
+                if not isinstance(agent_inventory, dict):
+                    error(f"initial_inventory[{key!r}] must be an object")
+                    continue
+                for item, count in agent_inventory.items():
+                    if items is not None and item.lower() not in items:
+                        error(f"initial_inventory[{key!r}] has unknown item {item!r}")
+                    if count == 0:
+                        warning(f"initial_inventory[{key!r}][{item!r}] is 0")
+                    elif not _is_count(count):
+                        error(f"initial_inventory[{key!r}][{item!r}] must be a positive integer, got {count!r}")
+            missing = sorted(player_keys - set(inventory), key=int)
+            if missing and not bad_keys:
+                warning(f"no initial_inventory for agents {', '.join(missing)}")
+
+    blocked = task.get("blocked_actions")
+    if blocked is not None:
+        commands = names.get("commands")
+        if not isinstance(blocked, dict):
+            error("blocked_actions must map agent indices to lists of commands")
+        else:
+            for key, actions in blocked.items():
+                if key not in player_keys:
+                    warning(f"blocked_actions key {key!r} is not an agent index below {players}")
+                if not isinstance(actions, list):
+                    error(f"blocked_actions[{key!r}] must be a list")
+                    continue
+                for action in actions:
+                    if commands is not None and action not in commands:
+                        warning(f"blocked_actions[{key!r}] has unknown command {action!r}")
+
+    if task_type == "techtree":
+        target = task.get("target")
+        if not isinstance(target, str):
+            error(f"techtree target must be an item name, got {target!r}")
+        elif items is not None and target not in items:
+            error(f"unknown target item {target!r}")
+        if "number_of_target" in task and not _is_count(task["number_of_target"]):
+            error(f"number_of_target must be a positive integer, got {task['number_of_target']!r}")
+    elif task_type == "cooking":
+        target = task.get("target")
+        targets = list(target) if isinstance(target, (dict, list)) else [target]
+        for name in targets:
+            if not isinstance(name, str):
+                error(f"cooking target must name items, got {target!r}")
+            elif items is not None and name not in items:
+                warning(f"unknown target item {name!r}")
+    elif task_type == "construction":
+        problems.extend(_lint_blueprint(task.get("blueprint"), names.get("blocks")))
+    return problems
+
+
+def _lint_blueprint(blueprint, blocks):
+    if blueprint is None:
+        return [("error", "construction task has no blueprint")]
+    try:
+        blueprint = get_blueprint(blueprint)
+    except FileNotFoundError as e:
+        return [("error", str(e))]
+    levels = blueprint.get("levels") if isinstance(blueprint, dict) else None
+    if not levels:
+        return [("error", "blueprint has no levels")]
+    problems = []
+    unknown = set()
+    for i, level in enumerate(levels):
+        coordinates = level.get("coordinates")
+        if not (isinstance(coordinates, list) and len(coordinates) == 3 and all(isinstance(c, int) for c in coordinates)):
+            problems.append(("error", f"blueprint level {i} coordinates must be [x, y, z], got {coordinates!r}"))
+        placement = level.get("placement")
+        if not placement or not all(isinstance(row, list) for row in placement):
+            problems.append(("error", f"blueprint level {i} has no placement grid"))
+            continue
+        if len({len(row) for row in placement}) > 1:
+            problems.append(("error", f"blueprint level {i} placement rows have different lengths"))
+        if blocks is not None:
+            unknown.update(block for row in placement for block in row if block not in blocks)
+    if unknown:
+        problems.append(("error", f"blueprint uses unknown blocks {sorted(unknown)}"))
+    return problems
+
+
+def lint_file(task_path):
+    """Return the problems in one task file as dicts with file, task_id, level and message."""
+    names = _names if _names is not None else load_names()
+    try:
+        with open(task_path, "r") as f:
+            tasks = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        return [{"file": task_path, "task_id": None, "level": "error", "message": f"cannot read task file: {e}"}]
+    if not isinstance(tasks, dict):
+        return [{"file": task_path, "task_id": None, "level": "error", "message": "task file must map task ids to tasks"}]
+    return [{"file": task_path, "task_id": task_id, "level": level, "message": message}
+            for task_id, task in tasks.items()
+            for level, message in lint_task(task, names)]
+
+
+def _commands_digest():
+    """Hash of the command definitions, which decide what blocked_actions may contain."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(COMMANDS_DIR, "*.js"))):
+        with open(path, "rb") as f:
+            digest.update(os.path.basename(path).encode("utf-8") + b"\0" + f.read() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _file_key(task_path, version, data_dir, commands_digest):
+    with open(task_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    # results without minecraft-data skip name checks, so they must not be reused once it is installed
+    has_data = os.path.exists(os.path.join(data_dir, "dataPaths.json"))
+    return f"{LINT_VERSION}:{version}:{int(has_data)}:{commands_digest}:{digest}"
+
+
+def _load_cache(cache_path):
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def lint_task_files(paths, workers=None, cache_path=DEFAULT_CACHE, version=DEFAULT_VERSION, data_dir=DEFAULT_DATA_DIR):
+    """Lint task files (or glob patterns) in a process pool, reusing cached results for unchanged files."""
+    task_paths = []
+    for pattern in paths:
+        task_paths.extend(sorted(glob.glob(pattern, recursive=True)) or [pattern])
+
+    cache = _load_cache(cache_path)
+    commands_digest = _commands_digest()
+    keys, todo, problems = {}, [], []
+    for task_path in task_paths:
+        try:
+            keys[task_path] = _file_key(task_path, version, data_dir, commands_digest)
+        except OSError as e:
+            problems.append({"file": task_path, "task_id": None, "level": "error", "message": f"cannot read task file: {e}"})
+            continue
+        if keys[task_path] in cache:
+            problems.extend({**p, "file": task_path} for p in cache[keys[task_path]])
+        else:
+            todo.append(task_path)
+
+    if len(todo) == 1:
+        _init_worker(version, data_dir)
+        results = [lint_file(todo[0])]
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version, data_dir)) as executor:
+            results = list(executor.map(lint_file, todo))
+    else:
+        results = []
+    for task_path, file_problems in zip(todo, results):
+        cache[keys[task_path]] = file_problems
+        problems.extend(file_problems)
+
+    if cache_path and todo:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    return problems
+
+
+def print_problems(problems):
+    for p in problems:
+        where = p["file"] if p["task_id"] is None else f"{p['file']} [{p['task_id']}]"
+        print(f"{p['level'].upper()}: {where}: {p['message']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate task files against the task schema and minecraft-data")
+    parser.add_argument("paths", nargs="+", help="Task files or glob patterns")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--version", default=DEFAULT_VERSION, help="Minecraft version for item and block names")
+    parser.add_argument("--data_dir", default=DEFAULT_DATA_DIR, help="minecraft-data data directory (with dataPaths.json)")
+    parser.add_argument("--no_cache", action="store_true", help="Ignore and do not update the result cache")
+    parser.add_argument("--errors_only", action="store_true", help="Only print errors")
+    args = parser.parse_args()
+
+    problems = lint_task_files(args.paths, args.workers, None if args.no_cache else DEFAULT_CACHE,
+                               args.version, args.data_dir)
+    errors = [p for p in problems if p["level"] == "error"]
+    print_problems(errors if args.errors_only else problems)
+    print(f"{len(errors)} errors, {len(problems) - len(errors)} warnings")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Task outcomes read from the agents' memory files.
+
+An agent's memory (<agent>_<rep>.json in a task folder, or the same file inside an
+experiment archive) ends with a "Task ended with score : X" system turn. These helpers
+turn that into scores per agent, per task folder and per task over several experiment
+folders. They only need the experiment archive reader, so the analysis and training data
+scripts can use them without the experiment runner's dependencies.
+"""
+import glob
+import json
+import os
+from collections import defaultdict
+
+from experiment_archive import archive_task, is_archive, open_archive
+
+
+def analyze_memory(data):
+    """
+    Extracts the task outcome from a parsed agent memory.
+
+    Args:
+        data (dict): Contents of an agent's memory JSON file.
+
+    Returns:
+        float or None: The task score if found, otherwise None.
+    """
+    if "turns" in data:
+        for turn in data["turns"]:
+            if turn.get("role") == "system" and "content" in turn:
+                if isinstance(turn["content"], str) and "Task ended with score : " in turn["content"]:
+                    if "Task ended with score : 1" in turn["content"]:
+                        return 1
+                    elif "Task ended with score : 0" in turn["content"]:
+                        return 0
+                    else:
+                        score = float(turn["content"].split(":")[-1].strip())
+                        return score
+    return None
+
+def task_score(data):
+    """
+    Extracts the exact score reported in a parsed agent memory.
+
+    Unlike analyze_memory, which maps any score starting with "1" to 1, this returns the
+    number as reported, e.g. 87.5 for a construction task that matched 87.5% of its blueprint.
+
+    Args:
+        data (dict): Contents of an agent's memory JSON file.
+
+    Returns:
+        float or None: The reported score if found, otherwise None.
+    """
+    for turn in data.get("turns", []):
+        content = turn.get("content")
+        if turn.get("role") == "system" and isinstance(content, str) and "Task ended with score : " in content:
+            try:
+                return float(content.split("Task ended with score : ")[-1].strip())
+            except ValueError:
+                return None
+    return None
+
+def analyze_json_file(file_path):
+    """
+    Analyzes a single JSON file to extract the task outcome.
+
+    Args:
+        file_path (str): Path to the JSON file.
+
+    Returns:
+        str or None: The task outcome string if found, otherwise None.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+            return analyze_memory(data)
+    except FileNotFoundError:
+        print(f"Error: File not found: {file_path}")
+        return None
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON format in: {file_path}")
+        return None
+    except Exception as e:
+        print(f"An unexpected error occurred while processing {file_path}: {e}")
+        return None
+    
+def extract_result(folder_path):
+    folder_name = os.path.basename(folder_path)
+    archived = archive_task(folder_path)
+    if archived is not None:
+        # <experiment>.archive/<task_id>: read the task's memories from the packed shards
+        archive, task_id = archived
+        scores = [analyze_memory(data) if data is not None else None for _, data in archive.task_memories(task_id)]
+    else:
+        json_files = glob.glob(os.path.join(folder_path, "*.json"))
+        # assert len(json_files) == 2, f"Expected 2 json files in {folder_name}, found {len(json_files)}"
+        scores = [analyze_json_file(json_file) for json_file in json_files]
+
+    if not scores:
+        return None
+    else: 
+        curr_score = 0
+        for score in scores:
+            if score is not None:
+                max_score = max(score, curr_score)
+                curr_score = max_score
+
+        return curr_score
+
+
+def best_score(folder_path):
+    """
+    Return the highest score the agents of a task folder (or <archive>/<task_id>) reported,
+    as reported (see task_score); 0 if none of them reported one, None if there are no
+    memory files. Unlike extract_result, construction scores stay percentages.
+    """
+    archived = archive_task(folder_path)
+    if archived is not None:
+        archive, task_id = archived
+        memories = [data for _, data in archive.task_memories(task_id)]
+    else:
+        memories = []
+        for json_file in glob.glob(os.path.join(folder_path, "*.json")):
+            try:
+                with open(json_file, "r") as f:
+                    memories.append(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error reading {json_file}: {e}")
+                memories.append(None)
+    if not memories:
+        return None
+    scores = [task_score(data) for data in memories if isinstance(data, dict)]
+    return max([score for score in scores if score is not None], default=0)
+
+
+def collect_outcomes(experiment_dirs):
+    """Return {task_id: [best score, ...]} over every task folder of the given experiment folders."""
+    outcomes = defaultdict(list)
+    for experiment_dir in experiment_dirs:
+        if is_archive(experiment_dir):
+            task_folders = [os.path.join(experiment_dir, task_id) for task_id in open_archive(experiment_dir).task_ids()]
+        else:
+            task_folders = [f for f in glob.glob(os.path.join(experiment_dir, "*")) if os.path.isdir(f)]
+        for task_folder in task_folders:
+            score = best_score(task_folder)
+            if score is not None:
+                outcomes[os.path.basename(task_folder)].append(score)
+    return dict(outcomes)
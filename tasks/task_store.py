@@ -0,0 +1,106 @@
+"""
+Compiled task store: a task file foo.json is compiled into foo.tasks.jsonl (one task per
+line) plus foo.tasks.idx, a small JSON index mapping each task_id to the byte offset and
+length of its line. main.js and evaluation_script.py use the index to read a single task
+without parsing the whole file. The index records the size and mtime of the source file,
+so a store is ignored (and the source parsed as before) once the source has been edited.
+
+Example usage:
+python tasks/task_store.py "tasks/**/*.json"
+"""
+import argparse
+import glob
+import json
+import os
+
+DATA_SUFFIX = ".tasks.jsonl"
+INDEX_SUFFIX = ".tasks.idx"
+
+
+def store_paths(task_path):
+    """Return the (data, index) paths of the compiled store for a task file."""
+    base = task_path[:-len(DATA_SUFFIX)] if task_path.endswith(DATA_SUFFIX) else os.path.splitext(task_path)[0]
+    return base + DATA_SUFFIX, base + INDEX_SUFFIX
+
+
+def _source_stamp(task_path):
+    stat = os.stat(task_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": str(stat.st_mtime_ns)}
+
+
+def compile_task_file(task_path):
+    """Compile a task JSON file into a JSONL store and byte-offset index."""
+    with open(task_path, "r") as f:
+        tasks = json.load(f)
+    data_path, index_path = store_paths(task_path)
+    index = {}
+    offset = 0
+    with open(data_path, "wb") as f:
+        for task_id, task in tasks.items():
+            line = json.dumps(task, separators=(",", ":")).encode("utf-8")
+            f.write(line + b"\n")
+            index[task_id] = [offset, len(line)]
+            offset += len(line) + 1
+    with open(index_path, "w") as f:
+        json.dump({**_source_stamp(task_path), "tasks": index}, f)
+    return data_path, index_path
+
+
+def load_index(task_path):
+    """Return the task index for a task file, or None if there is no up-to-date store."""
+    data_path, index_path = store_paths(task_path)
+    if not (os.path.exists(data_path) and os.path.exists(index_path)):
+        return None
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    if task_path != data_path and os.path.exists(task_path):
+        stamp = _source_stamp(task_path)
+        if stamp["source_size"] != index.get("source_size") or stamp["source_mtime_ns"] != index.get("source_mtime_ns"):
+            return None
+    return index["tasks"]
+
+
+def task_ids(task_path):
+    """List the task ids in a task file, through the index when possible."""
+    index = load_index(task_path)
+    if index is not None:
+        return list(index.keys())
+    with open(task_path, "r") as f:
+        return list(json.load(f).keys())
+
+
+def read_task(task_path, task_id):
+    """Read a single task by id, through the index when possible."""
+    index = load_index(task_path)
+    if index is None:
+        with open(task_path, "r") as f:
+            return json.load(f)[task_id]
+    offset, length = index[task_id]
+    with open(store_paths(task_path)[0], "rb") as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+
+def refresh_store(task_path):
+    """Recompile the store of a task file that was rewritten in place, if it has one."""
+    data_path, index_path = store_paths(task_path)
+    if os.path.exists(data_path) or os.path.exists(index_path):
+        compile_task_file(task_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile task JSON files into indexed task stores")
+    parser.add_argument("patterns", nargs="+", help="Task files or glob patterns, e.g. 'tasks/**/*.json'")
+    args = parser.parse_args()
+
+    for pattern in args.patterns:
+        for task_path in sorted(glob.glob(pattern, recursive=True)):
+            try:
+                data_path, _ = compile_task_file(task_path)
+                print(f"Compiled {task_path} -> {data_path}")
+            except (json.JSONDecodeError, AttributeError) as e:
+                print(f"Skipping {task_path}: not a task file ({e})")
+
+
+if __name__ == "__main__":
+    main()